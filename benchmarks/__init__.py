@@ -0,0 +1 @@
+"""Benchmarks of :mod:`pushover_complete` against a local stand-in for the Pushover API."""
@@ -0,0 +1,414 @@
+"""
+Measure the throughput, latency and memory use of :mod:`pushover_complete` against a fake Pushover API on localhost.
+
+Run from the root of the repository with ``python -m benchmarks.run``; see ``python -m benchmarks.run --help`` for the
+options.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import ssl
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pushover_complete import Instrumentation, PushoverAPI, PushoverCompleteError
+from pushover_complete.testing import FakePushoverServer
+
+try:
+    import httpx
+
+    from pushover_complete import AsyncPushoverAPI
+except ImportError:  # pragma: no cover -- httpx is an optional dependency
+    httpx = None
+
+TOKEN = "azGDORePK8gMaC0QOYAMyEEuzJnyUi"  # noqa: S105 -- the fake server accepts any well-formed token
+USER = "uQiRzpo4DXghDmr9QzzfQu27cmVRsG"
+GROUP = "gznej3rKEVAvPUxu9vvNnqpmZpokzF"
+
+SCENARIOS = ("message", "attachment", "group")
+BACKENDS = ("sync", "threaded", "async")
+GROUP_ACTIONS = ("group_add_user", "group_disable_user", "group_enable_user", "group_delete_user")
+
+
+class Result(
+    namedtuple(  # noqa: PYI024 -- documented below
+        "Result",
+        ["scenario", "backend", "operations", "failures", "elapsed", "latencies", "peak_memory"],
+    )
+):
+    """
+    The measurements of one scenario run with one backend.
+
+    .. attribute:: latencies
+
+        The duration of every request, in seconds, as reported to the API instance's :class:`Instrumentation`
+
+    .. attribute:: peak_memory
+
+        The most memory allocated by Python during the run, in bytes, or ``None`` if it wasn't traced
+    """
+
+    __slots__ = ()
+
+    @property
+    def rate(self):
+        """
+        The number of operations completed per second.
+
+        :rtype: float
+        """
+        return self.operations / self.elapsed
+
+    def percentile(self, percent):
+        """
+        Get a percentile of the request latencies, by the nearest-rank method.
+
+        :param percent: The percentile, from 0 to 100
+        :type percent: float
+
+        :returns: The latency, in seconds, or ``nan`` if there were no requests
+        :rtype: float
+        """
+        if not self.latencies:
+            return math.nan
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def serve(connection, options):
+    """
+    Run a fake Pushover API in a child process, calling its methods for the parent until it is told to stop.
+
+    :param connection: The end of the pipe to the parent. The server's URL is sent first, then each ``(method name,
+        arguments)`` received is answered with the method's result, until ``None`` is received.
+    :param options: The keyword arguments of the :class:`FakePushoverServer`
+    :type connection: multiprocessing.connection.Connection
+    :type options: dict
+    """
+    # nothing reads the messages accepted, so don't keep them, e.g. with the attachment scenario's images
+    with FakePushoverServer(history=0, **options) as server:
+        connection.send(server.url)
+        for name, arguments in iter(connection.recv, None):
+            connection.send(getattr(server, name)(*arguments))
+
+
+class ServerProcess:
+    """
+    A fake Pushover API run in a child process.
+
+    The server doesn't share the GIL with the client being measured, so it doesn't slow the client down, nor are its
+    allocations traced along with the client's.
+
+    :param options: The keyword arguments of the :class:`FakePushoverServer`
+    """
+
+    def __init__(self, **options):
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=serve, args=(child_connection, options), daemon=True)
+        self.url = None
+
+    def __enter__(self):
+        """Start the server, returning this instance."""
+        self._process.start()
+        self.url = self._connection.recv()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the server."""
+        self._connection.send(None)
+        self._process.join()
+        self._connection.close()
+
+    def add_group(self, *args):
+        """
+        Create a delivery group. See :meth:`FakePushoverServer.add_group`.
+
+        :param args: The arguments of :meth:`FakePushoverServer.add_group`
+
+        :returns: The group key
+        :rtype: str
+        """
+        self._connection.send(("add_group", args))
+        return self._connection.recv()
+
+
+class LatencyRecorder(Instrumentation):
+    """Keep the duration of every request."""
+
+    def __init__(self):
+        self.latencies = []
+
+    def request_finished(self, metrics):
+        """
+        Keep the duration of an attempt at a request.
+
+        :param metrics: The measurements of the attempt
+        :type metrics: RequestMetrics
+        """
+        self.latencies.append(metrics.duration)
+
+
+def operations(scenario, count, attachment):
+    """
+    Build the calls making up a scenario.
+
+    :param scenario: One of :data:`SCENARIOS`
+    :param count: The number of calls
+    :param attachment: The image attached to each message of the ``"attachment"`` scenario
+    :type scenario: str
+    :type count: int
+    :type attachment: bytes
+
+    :returns: The name of the API method and its keyword arguments, for each call
+    :rtype: list[tuple(str, dict)]
+    """
+    if scenario == "group":
+        # a new user is added by every fourth call, and the other calls change existing members, one per call, so that
+        # the calls succeed in any order
+        return [
+            (GROUP_ACTIONS[i % len(GROUP_ACTIONS)], {"group_key": GROUP, "user": f"u{i:029d}"}) for i in range(count)
+        ]
+    calls = []
+    for i in range(count):
+        message = {"user": USER, "message": f"Benchmark message {i}"}
+        if scenario == "attachment":
+            message["image"] = attachment
+        calls.append(("send_message", message))
+    return calls
+
+
+def run_sync(api, calls, workers):  # noqa: ARG001 -- every backend takes the same arguments
+    """
+    Make the calls one after another, as a single thread sending messages would.
+
+    :param api: The API instance
+    :param calls: The calls to make
+    :param workers: Unused
+    :type api: PushoverAPI
+    :type calls: list[tuple(str, dict)]
+    :type workers: int
+
+    :returns: The number of failed calls
+    :rtype: int
+    """
+    failures = 0
+    for name, kwargs in calls:
+        try:
+            getattr(api, name)(**kwargs)
+        except PushoverCompleteError:  # noqa: PERF203 -- failures are expected and counted
+            failures += 1
+    return failures
+
+
+def run_threaded(api, calls, workers):
+    """
+    Make the calls from a pool of threads, with :meth:`PushoverAPI.send_messages` for messages.
+
+    :param api: The API instance
+    :param calls: The calls to make
+    :param workers: The number of threads
+    :type api: PushoverAPI
+    :type calls: list[tuple(str, dict)]
+    :type workers: int
+
+    :returns: The number of failed calls
+    :rtype: int
+    """
+    if all(name == "send_message" for name, _ in calls):
+        results = api.send_messages([kwargs for _, kwargs in calls], max_workers=workers, return_exceptions=True)
+        return sum(isinstance(result, Exception) for result in results)
+
+    def call(name_and_kwargs):
+        name, kwargs = name_and_kwargs
+        try:
+            getattr(api, name)(**kwargs)
+        except PushoverCompleteError:
+            return 1
+        return 0
+
+    with ThreadPoolExecutor(workers) as executor:
+        return sum(executor.map(call, calls))
+
+
+async def run_async(api, calls, workers):
+    """
+    Make the calls from the event loop, with :meth:`AsyncPushoverAPI.send_messages` for messages.
+
+    :param api: The API instance
+    :param calls: The calls to make
+    :param workers: The maximum number of calls in flight at once
+    :type api: AsyncPushoverAPI
+    :type calls: list[tuple(str, dict)]
+    :type workers: int
+
+    :returns: The number of failed calls
+    :rtype: int
+    """
+    if all(name == "send_message" for name, _ in calls):
+        results = await api.send_messages(
+            [kwargs for _, kwargs in calls], max_in_flight=workers, return_exceptions=True
+        )
+        return sum(isinstance(result, Exception) for result in results)
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def call(name, kwargs):
+        async with semaphore:
+            await getattr(api, name)(**kwargs)
+
+    results = await asyncio.gather(*(call(name, kwargs) for name, kwargs in calls), return_exceptions=True)
+    return sum(isinstance(result, Exception) for result in results)
+
+
+def measure(scenario, backend, server, args):
+    """
+    Run a scenario with a backend against the fake Pushover API.
+
+    :param scenario: One of :data:`SCENARIOS`
+    :param backend: One of :data:`BACKENDS`
+    :param server: The running fake Pushover API, in its own process
+    :param args: The command-line arguments
+    :type scenario: str
+    :type backend: str
+    :type server: ServerProcess
+    :type args: argparse.Namespace
+
+    :returns: The measurements
+    :rtype: Result
+    """
+    calls = operations(scenario, args.count, os.urandom(args.attachment_size))
+    members = [kwargs["user"] for name, kwargs in calls if name not in {"send_message", "group_add_user"}]
+    server.add_group(GROUP, "Benchmark", members)
+    recorder = LatencyRecorder()
+    workers = 1 if backend == "sync" else args.workers
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+
+    if backend == "async":
+
+        async def main():
+            verify = True if args.certfile is None else ssl.create_default_context(cafile=args.certfile)
+            # don't let proxy settings or a CA bundle from the environment get in the way of the local server
+            limits = httpx.Limits(max_connections=workers)
+            async with httpx.AsyncClient(limits=limits, verify=verify, trust_env=False) as client:
+                api = AsyncPushoverAPI(TOKEN, client=client, instrumentation=recorder, api_url=server.url)
+                return await run_async(api, calls, workers)
+
+        failures = asyncio.run(main())
+    else:
+        with PushoverAPI(TOKEN, pool_maxsize=workers, instrumentation=recorder, api_url=server.url) as api:
+            api.session.trust_env = False
+            if args.certfile is not None:
+                api.session.verify = args.certfile
+            run = run_sync if backend == "sync" else run_threaded
+            failures = run(api, calls, workers)
+
+    elapsed = time.perf_counter() - start
+    peak_memory = None
+    if args.memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return Result(scenario, backend, len(calls), failures, elapsed, recorder.latencies, peak_memory)
+
+
+def report(results, out):
+    """
+    Write a table of measurements.
+
+    :param results: The measurements
+    :param out: The stream to write to
+    :type results: list[Result]
+    :type out: file-like
+    """
+    header = f"{'scenario':<12}{'backend':<10}{'ops':>8}{'failed':>8}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+    out.write(f"{header}{'peak KiB':>10}\n")
+    for result in results:
+        memory = "-" if result.peak_memory is None else f"{result.peak_memory / 1024:.0f}"
+        out.write(
+            f"{result.scenario:<12}{result.backend:<10}{result.operations:>8}{result.failures:>8}"
+            f"{result.rate:>10.1f}{result.percentile(50) * 1000:>10.2f}{result.percentile(99) * 1000:>10.2f}"
+            f"{memory:>10}\n"
+        )
+
+
+def parse_args(argv=None):
+    """
+    Parse the command-line arguments.
+
+    :param argv: (optional) The arguments. Defaults to those the program was run with.
+    :type argv: list[str]
+
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="a scenario to run (default: all)")
+    parser.add_argument("--backend", choices=BACKENDS, action="append", help="a backend to run (default: all)")
+    parser.add_argument("--count", type=int, default=1000, help="the number of operations per run (default: 1000)")
+    parser.add_argument("--workers", type=int, default=16, help="threads or requests in flight (default: 16)")
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency in seconds (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing (default: 0)")
+    parser.add_argument("--quota", type=int, default=10_000_000, help="messages allowed by the server")
+    parser.add_argument("--attachment-size", type=int, default=100 * 1024, help="attachment size in bytes")
+    parser.add_argument("--certfile", help="PEM file with a certificate and key, to benchmark over HTTPS")
+    parser.add_argument("--memory", action="store_true", help="trace peak memory use (slows every run down)")
+    parser.add_argument("--seed", type=int, help="seed for the failing requests, for repeatable runs")
+    parser.add_argument("--json", metavar="PATH", help="also write the measurements to a JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Run the benchmarks and report the measurements.
+
+    :param argv: (optional) The command-line arguments. Defaults to those the program was run with.
+    :type argv: list[str]
+
+    :returns: The measurements
+    :rtype: list[Result]
+    """
+    args = parse_args(argv)
+    backends = args.backend or BACKENDS
+    if "async" in backends and httpx is None:
+        sys.stderr.write("skipping the async backend: install pushover_complete[async] to run it\n")
+        backends = [backend for backend in backends if backend != "async"]
+
+    results = []
+    for scenario in args.scenario or SCENARIOS:
+        for backend in backends:
+            # a fresh server for each run, so the quota and groups don't carry over
+            with ServerProcess(
+                quota=args.quota,
+                latency=args.latency,
+                error_rate=args.error_rate,
+                certfile=args.certfile,
+                seed=args.seed,
+            ) as server:
+                results.append(measure(scenario, backend, server, args))
+    report(results, sys.stdout)
+
+    if args.json is not None:
+        summaries = [
+            {
+                **{field: value for field, value in result._asdict().items() if field != "latencies"},
+                "rate": result.rate,
+                "p50": result.percentile(50),
+                "p99": result.percentile(99),
+            }
+            for result in results
+        ]
+        with Path(args.json).open("w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,64 @@
 """A Python package for interacting with *all* aspects of the Pushover API."""
 
-from .error import BadAPIRequestError, PushoverCompleteError
+from .async_pushover_api import AsyncPushoverAPI
+from .attachments import AttachmentCache
+from .callback_receiver import CallbackReceiver
+from .coalescing import MessageCoalescer
+from .dispatcher import Dispatcher
+from .error import (
+    BadAPIRequestError,
+    MessageValidationError,
+    PushoverCompleteError,
+    QueueFullError,
+    QuotaExceededError,
+)
+from .groups import GroupCache, GroupChange
+from .images import ImageShrinker
+from .instrumentation import (
+    Instrumentation,
+    OpenTelemetryInstrumentation,
+    PrometheusInstrumentation,
+    RequestMetrics,
+)
+from .outbox import Outbox
 from .pushover_api import PushoverAPI
+from .rate_limit import QuotaThrottle, RateLimit
+from .receipts import ReceiptTracker
+from .response_cache import ResponseCache
+from .results import GroupInfo, MessageResult, ReceiptStatus, ValidationResult
+from .retry import RetryPolicy
+from .validation import MessageValidator
 
 __all__ = [
+    "AsyncPushoverAPI",
+    "AttachmentCache",
     "BadAPIRequestError",
+    "CallbackReceiver",
+    "Dispatcher",
+    "GroupCache",
+    "GroupChange",
+    "GroupInfo",
+    "ImageShrinker",
+    "Instrumentation",
+    "MessageCoalescer",
+    "MessageResult",
+    "MessageValidationError",
+    "MessageValidator",
+    "OpenTelemetryInstrumentation",
+    "Outbox",
+    "PrometheusInstrumentation",
     "PushoverAPI",
     "PushoverCompleteError",
+    "QueueFullError",
+    "QuotaExceededError",
+    "QuotaThrottle",
+    "RateLimit",
+    "ReceiptStatus",
+    "ReceiptTracker",
+    "RequestMetrics",
+    "ResponseCache",
+    "RetryPolicy",
+    "ValidationResult",
 ]
 
 __version__ = "2.0.0"
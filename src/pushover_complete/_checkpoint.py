@@ -0,0 +1,93 @@
+"""A record on disk of the items of a bulk operation that have been completed, so the operation can be resumed."""
+
+import json
+import threading
+from pathlib import Path
+
+
+class Checkpoint:
+    """
+    A JSON-lines file recording the result of each completed item of a bulk operation.
+
+    Each line holds one item and its result. Items are compared by their JSON serialization, so they must be
+    JSON-serializable, as must their results.
+    A line left incomplete by a crash is removed when the file is opened, so the item is simply done again.
+
+    :param path: The path of the file. Created if it doesn't exist.
+    :type path: str or pathlib.Path
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._done = {}
+        if self.path.exists():
+            with self.path.open("r+b") as f:
+                data = f.read()
+                # cut off a line left incomplete by a crash, so the next record doesn't run into it
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    f.truncate(end)
+            for line in data[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._done[self._key(record["item"])] = record["result"]
+        self._lock = threading.Lock()
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def __enter__(self):
+        """Enter the context manager, returning this instance."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, closing the file."""
+        self.close()
+
+    @staticmethod
+    def _key(item):
+        """
+        Get the key identifying an item.
+
+        :param item: The item
+        :type item: JSON-serializable
+
+        :rtype: str
+        """
+        return json.dumps(item, sort_keys=True)
+
+    def lookup(self, item):
+        """
+        Look up the result of an item that has already been completed.
+
+        :param item: The item
+        :type item: JSON-serializable
+
+        :returns: ``(True, result)`` if the item has been completed, or ``(False, None)`` if it hasn't
+        :rtype: tuple
+        """
+        key = self._key(item)
+        with self._lock:
+            if key in self._done:
+                return True, self._done[key]
+        return False, None
+
+    def record(self, item, result):
+        """
+        Record that an item has been completed. The record is flushed to disk right away.
+
+        :param item: The item
+        :param result: The result of the item
+        :type item: JSON-serializable
+        :type result: JSON-serializable
+        """
+        line = json.dumps({"item": item, "result": result}, sort_keys=True)
+        with self._lock:
+            self._done[self._key(item)] = result
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Close the file."""
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,130 @@
+"""Helpers for running many API calls at once, shared by the bulk methods of :class:`PushoverAPI`."""
+
+import itertools
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def _call(func, item, return_exceptions):
+    """
+    Call ``func(item)``, optionally capturing an exception as the result.
+
+    :param func: The callable to invoke
+    :param item: The single argument to pass to ``func``
+    :param return_exceptions: If true, an :class:`Exception` raised by ``func`` is returned instead of raised
+    :type func: callable
+    :type return_exceptions: bool
+
+    :returns: The return value of ``func`` or the exception it raised
+    """
+    if not return_exceptions:
+        return func(item)
+    try:
+        return func(item)
+    except Exception as e:  # noqa: BLE001 -- the caller asked for every exception to be collected
+        return e
+
+
+def iter_concurrently(func, items, max_workers=None, return_exceptions=False):  # noqa: FBT002
+    """
+    Lazily apply ``func`` to every item of ``items``, optionally spread across a pool of worker threads.
+
+    Items are taken from ``items`` only as workers become free, so at most about twice ``max_workers`` items are held
+    at once however long ``items`` is.
+
+    :param func: A callable taking a single item
+    :param items: An iterable of items to pass to ``func``
+    :param max_workers: The maximum number of calls in flight at once. ``None`` or ``1`` runs the calls one after
+        another in the calling thread.
+    :param return_exceptions: If true, exceptions raised by ``func`` are yielded in the position of the item that caused
+        them, instead of being raised
+    :type func: callable
+    :type items: iterable
+    :type max_workers: int
+    :type return_exceptions: bool
+
+    :returns: A generator of the results of ``func``, in the same order as ``items``
+    :rtype: generator
+    """
+    if max_workers is None or max_workers <= 1:
+        for item in items:
+            yield _call(func, item, return_exceptions)
+        return
+
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight = deque()
+    try:
+        # keep the workers busy while the oldest result is waited for
+        for item in itertools.islice(items, 2 * max_workers):
+            in_flight.append(executor.submit(_call, func, item, return_exceptions))
+        while in_flight:
+            result = in_flight.popleft().result()
+            for item in itertools.islice(items, 1):
+                in_flight.append(executor.submit(_call, func, item, return_exceptions))
+            yield result
+    finally:
+        # don't start any queued calls once one has raised or the caller has stopped iterating
+        executor.shutdown(cancel_futures=True)
+
+
+def iter_as_completed(func, items, max_workers=None):
+    """
+    Lazily apply ``func`` to every item of ``items``, yielding each item with its result as soon as it is ready.
+
+    Like :func:`iter_concurrently`, items are taken from ``items`` only as workers become free, but results are yielded
+    in the order they finish, so a slow call doesn't hold up the results behind it. Exceptions raised by ``func`` are
+    always yielded in place of the result.
+
+    :param func: A callable taking a single item
+    :param items: An iterable of items to pass to ``func``
+    :param max_workers: The maximum number of calls in flight at once. ``None`` or ``1`` runs the calls one after
+        another in the calling thread.
+    :type func: callable
+    :type items: iterable
+    :type max_workers: int
+
+    :returns: A generator of ``(item, result)`` tuples, where ``result`` is the return value of ``func`` or the
+        exception it raised
+    :rtype: generator
+    """
+    if max_workers is None or max_workers <= 1:
+        for item in items:
+            yield item, _call(func, item, return_exceptions=True)
+        return
+
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight = {}
+    try:
+        for item in itertools.islice(items, 2 * max_workers):
+            in_flight[executor.submit(_call, func, item, return_exceptions=True)] = item
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for item in itertools.islice(items, len(done)):
+                in_flight[executor.submit(_call, func, item, return_exceptions=True)] = item
+            for future in done:
+                yield in_flight.pop(future), future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def map_concurrently(func, items, max_workers=None, return_exceptions=False):  # noqa: FBT002
+    """
+    Apply ``func`` to every item of ``items``, optionally spread across a pool of worker threads.
+
+    :param func: A callable taking a single item
+    :param items: An iterable of items to pass to ``func``
+    :param max_workers: The maximum number of calls in flight at once. ``None`` or ``1`` runs the calls one after
+        another in the calling thread.
+    :param return_exceptions: If true, exceptions raised by ``func`` are placed in the result list in the position of
+        the item that caused them, instead of being raised
+    :type func: callable
+    :type items: iterable
+    :type max_workers: int
+    :type return_exceptions: bool
+
+    :returns: The results of ``func``, in the same order as ``items``
+    :rtype: list
+    """
+    return list(iter_concurrently(func, items, max_workers, return_exceptions))
@@ -0,0 +1,12 @@
+"""The fastest JSON decoder installed, used to decode the responses of the Pushover API."""
+
+# all of these accept the raw bytes of a response, so the text encoding never has to be detected
+try:
+    from orjson import loads
+except ImportError:  # pragma: no cover -- orjson is an optional dependency
+    try:
+        from ujson import loads  # type: ignore[no-redef]
+    except ImportError:
+        from json import loads  # type: ignore[assignment]
+
+__all__ = ["loads"]
@@ -0,0 +1,1039 @@
+"""The AsyncPushoverAPI class, an :mod:`asyncio` counterpart to :class:`pushover_complete.PushoverAPI`."""
+
+import asyncio
+import mmap
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover -- httpx is an optional dependency
+    httpx = None  # type: ignore[assignment]
+
+from ._checkpoint import Checkpoint
+from ._json import loads
+from .error import BadAPIRequestError
+from .groups import ADD, DELETE, DISABLE, ENABLE, GroupChange, plan_group_changes
+from .instrumentation import RequestMetrics
+from .pushover_api import PUSHOVER_API_URL, _file_object
+from .rate_limit import RateLimit
+from .response_cache import SOUNDS, VALIDATE
+from .results import GroupInfo, MessageResult, ReceiptStatus, ValidationResult
+from .retry import IDEMPOTENT_METHODS
+
+
+async def _async_iter(iterable):
+    """
+    Wrap an iterable in an asynchronous generator.
+
+    :param iterable: The iterable
+    :type iterable: iterable
+
+    :rtype: async generator
+    """
+    for item in iterable:
+        yield item
+
+
+class _Unlimited:
+    """An asynchronous context manager doing nothing, standing in for a semaphore when concurrency isn't limited."""
+
+    async def __aenter__(self):
+        """Enter without waiting."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Exit, letting any exception propagate."""
+        return False
+
+
+def _limiter(max_in_flight):
+    """
+    Make an asynchronous context manager limiting how many calls are in flight at once.
+
+    :class:`contextlib.nullcontext` can't be used asynchronously before Python 3.10, so no limit is stood in for by a
+    context manager of our own.
+
+    :param max_in_flight: The maximum number of calls in flight at once, or ``None`` for no limit
+    :type max_in_flight: int
+
+    :rtype: asyncio.Semaphore
+    """
+    if max_in_flight is None:
+        return _Unlimited()
+    return asyncio.Semaphore(max_in_flight)
+
+
+class AsyncPushoverAPI:
+    """
+    The object representing an application interacting with the Pushover API from :mod:`asyncio` code.
+
+    Every public method of :class:`PushoverAPI` has a coroutine counterpart here taking the same arguments.
+    All requests made by an instance share one pooled :class:`httpx.AsyncClient`, so many notifications can be in flight
+    at once without blocking the event loop.
+
+    Requires the optional :mod:`httpx` dependency, installable with ``pip install pushover_complete[async]``.
+
+    Use as an async context manager or call :meth:`AsyncPushoverAPI.aclose` when finished to release the connection
+    pool.
+
+    :param token: A Pushover application token
+    :param client: (optional) An :class:`httpx.AsyncClient` to use for sending HTTP requests. If omitted, one is created
+        and owned by this instance.
+    :param limits: (optional) The :class:`httpx.Limits` (pool size, keep-alive connections and expiry) for a client
+        created by this instance. Ignored if ``client`` is given.
+    :param throttle: (optional) A :class:`QuotaThrottle` consulted before every message is sent. See
+        :class:`PushoverAPI`.
+    :param retry: (optional) A :class:`RetryPolicy` for retrying requests that fail for transient reasons. See
+        :class:`PushoverAPI`.
+    :param attachment_cache: (optional) An :class:`AttachmentCache` keeping images given as paths in memory. See
+        :class:`PushoverAPI`.
+    :param response_cache: (optional) A :class:`ResponseCache` answering repeated calls to
+        :meth:`AsyncPushoverAPI.get_sounds` and :meth:`AsyncPushoverAPI.validate` without a request
+    :param compact_results: If true, return compact result objects instead of dicts. See :class:`PushoverAPI`.
+    :param json_loads: (optional) A callable decoding the raw bytes of a response body from JSON. See
+        :class:`PushoverAPI`.
+    :param instrumentation: (optional) An :class:`Instrumentation` receiving the measurements of every request. See
+        :class:`PushoverAPI`.
+    :param api_url: The base URL of the Pushover API. See :class:`PushoverAPI`.
+    :param validator: (optional) A :class:`MessageValidator` checking every message before it is sent. See
+        :class:`PushoverAPI`.
+    :param coalescer: (optional) A :class:`MessageCoalescer` holding back duplicates of messages sent recently. See
+        :class:`PushoverAPI`.
+    :type token: str
+    :type client: httpx.AsyncClient
+    :type limits: httpx.Limits
+    :type throttle: QuotaThrottle
+    :type retry: RetryPolicy
+    :type attachment_cache: AttachmentCache
+    :type response_cache: ResponseCache
+    :type compact_results: bool
+    :type json_loads: callable
+    :type instrumentation: Instrumentation
+    :type api_url: str
+    :type validator: MessageValidator
+    :type coalescer: MessageCoalescer
+
+    .. attribute:: rate_limit
+
+        The application's message quota as a :class:`RateLimit`. See :attr:`PushoverAPI.rate_limit`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        token,
+        client=None,
+        *,
+        limits=None,
+        throttle=None,
+        retry=None,
+        attachment_cache=None,
+        response_cache=None,
+        compact_results=False,
+        json_loads=None,
+        instrumentation=None,
+        api_url=PUSHOVER_API_URL,
+        validator=None,
+        coalescer=None,
+    ):
+        if httpx is None:  # pragma: no cover -- httpx is an optional dependency
+            msg = "AsyncPushoverAPI requires httpx. Install it with `pip install pushover_complete[async]`."
+            raise ImportError(msg)
+        self.token = token
+        self.api_url = api_url
+        self.throttle = throttle
+        self.retry = retry
+        self.attachment_cache = attachment_cache
+        self.response_cache = response_cache
+        self.compact_results = compact_results
+        self.json_loads = loads if json_loads is None else json_loads
+        self.instrumentation = instrumentation
+        self.validator = validator
+        self.coalescer = coalescer
+        self.rate_limit = None
+        self._owns_client = client is None
+        if client is None:
+            client = httpx.AsyncClient() if limits is None else httpx.AsyncClient(limits=limits)
+        self.client = client
+
+    async def __aenter__(self):
+        """Enter the async context manager, returning this instance."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Exit the async context manager, closing the underlying client."""
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the underlying :class:`httpx.AsyncClient`, if it was created by this instance.
+
+        The summaries of every duplicate held back by the instance's :class:`MessageCoalescer` are sent first.
+        """
+        if self.coalescer is not None:
+            await self.send_coalesced(flush=True)
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _generic_request(self, method, endpoint, url_parameter=None, payload=None, files=None, result_class=None):
+        """
+        Make a request to the Pushover API.
+
+        The coroutine equivalent of :meth:`PushoverAPI._generic_get` and :meth:`PushoverAPI._generic_post`.
+
+        :param method: The HTTP method to use, e.g. "GET" or "POST"
+        :param endpoint: The endpoint of the API to hit. Will be joined with "https://api.pushover.net/1/". Example
+            value: "groups/{}.json"
+        :param url_parameter: A parameter to replace in the endpoint string provided
+        :param payload: A dict of parameters to be sent with the request. Do not include the application token in this
+            dict, as it is added by the function.
+        :param files: (optional) A dict of ``'attachment': value`` for attachment to the message
+        :param result_class: (optional) The class of the compact result to return if the instance was created with
+            ``compact_results``
+        :type method: str
+        :type endpoint: str
+        :type url_parameter: str
+        :type payload: dict
+        :type files: dict
+        :type result_class: type
+
+        :returns: Response body interpreted as JSON, or an instance of ``result_class``
+        :rtype: dict
+        :raises BadAPIRequestError: Raised when the Pushover response body contains a status code other than 1.
+        """
+        if payload is None:
+            payload = {}
+        payload["token"] = self.token
+        # mirror requests, which silently drops parameters whose value is None
+        payload = {key: value for key, value in payload.items() if value is not None}
+
+        resp = await self._request(
+            method,
+            urljoin(self.api_url, endpoint.format(url_parameter)),
+            endpoint=endpoint,
+            data=payload,
+            files=files,
+        )
+        rate_limit = RateLimit.from_headers(resp.headers)
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+            if self.instrumentation is not None:
+                self.instrumentation.quota_updated(rate_limit)
+
+        try:
+            resp_body = self.json_loads(resp.content)
+        except ValueError:
+            msg = f"{resp.status_code}: {resp.reason_phrase}"
+            raise BadAPIRequestError(msg, resp.status_code) from None
+        if resp_body.get("status", None) != 1:
+            msg = "{}: {}".format(resp.status_code, ": ".join(resp_body.get("errors")))
+            raise BadAPIRequestError(msg, resp.status_code)
+        if result_class is not None and self.compact_results:
+            return result_class(resp.content, resp_body, rate_limit)
+        return resp_body
+
+    async def _request(self, method, url, endpoint=None, **kwargs):
+        """
+        Send an HTTP request, retrying it according to the instance's :class:`RetryPolicy`.
+
+        :param method: The HTTP method to use, e.g. "GET" or "POST"
+        :param url: The URL to request
+        :param endpoint: (optional) The endpoint requested, before any parameter is filled in, reported to the
+            instance's :class:`Instrumentation`. Defaults to ``url``.
+        :param kwargs: Further arguments for :meth:`httpx.AsyncClient.request`
+        :type method: str
+        :type url: str
+        :type endpoint: str
+
+        :returns: The final response
+        :rtype: httpx.Response
+        :raises httpx.TransportError: Raised when the request could not be sent, even after any retries.
+        """
+        if endpoint is None:
+            endpoint = url
+        if self.retry is None:
+            return await self._attempt(method, url, endpoint, **kwargs)
+
+        attachments = [_file_object(value) for value in (kwargs.get("files") or {}).values()]
+        positions = [(f, f.tell()) for f in attachments if hasattr(f, "seek")]
+
+        self.retry.record_request()
+        attempt = 1
+        while True:
+            try:
+                resp = await self._attempt(method, url, endpoint, **kwargs)
+            except httpx.TransportError as e:
+                # a request which got as far as being sent may have taken effect, so only repeat it if that's harmless
+                not_sent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not (method in IDEMPOTENT_METHODS or not_sent) or not self.retry.should_retry(attempt):
+                    raise
+                retry_after = None
+            else:
+                if not self.retry.should_retry(attempt, resp.status_code):
+                    return resp
+                retry_after = resp.headers.get("Retry-After")
+
+            await asyncio.sleep(self._retry_delay(endpoint, method, attempt, retry_after))
+            for f, position in positions:
+                f.seek(position)
+            attempt += 1
+
+    def _retry_delay(self, endpoint, method, attempt, retry_after):
+        """
+        Work out how long to wait before retrying a request, and report the retry. See :meth:`PushoverAPI._retry_delay`.
+
+        :param endpoint: The endpoint requested, before any parameter is filled in
+        :param method: The HTTP method used
+        :param attempt: The number of the attempt that failed, starting at 1
+        :param retry_after: The value of the ``Retry-After`` header of the failed response, if any
+        :type endpoint: str
+        :type method: str
+        :type attempt: int
+        :type retry_after: str
+
+        :returns: The delay, in seconds
+        :rtype: float
+        """
+        delay = self.retry.delay(attempt, retry_after)
+        if self.instrumentation is not None:
+            self.instrumentation.request_retried(endpoint, method, attempt, delay)
+        return delay
+
+    async def _attempt(self, method, url, endpoint, **kwargs):
+        """
+        Send an HTTP request once, reporting its measurements to the instance's :class:`Instrumentation`.
+
+        :param method: The HTTP method to use
+        :param url: The URL to request
+        :param endpoint: The endpoint requested, before any parameter is filled in
+        :param kwargs: Further arguments for :meth:`httpx.AsyncClient.request`
+        :type method: str
+        :type url: str
+        :type endpoint: str
+
+        :returns: The response
+        :rtype: httpx.Response
+        :raises httpx.TransportError: Raised when the request could not be sent.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return await self.client.request(method, url, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            instrumentation.request_finished(
+                RequestMetrics(endpoint, method, time.perf_counter() - start, None, None, 0, None, e)
+            )
+            raise
+        instrumentation.request_finished(
+            RequestMetrics(
+                endpoint,
+                method,
+                time.perf_counter() - start,
+                resp.status_code,
+                int(resp.request.headers.get("Content-Length", 0)),
+                len(resp.content),
+                resp.headers,
+                None,
+            )
+        )
+        return resp
+
+    async def _generic_get(self, endpoint, url_parameter=None, payload=None, result_class=None):
+        """
+        Make a GET request to the Pushover API. See :meth:`PushoverAPI._generic_get`.
+
+        :param endpoint: The endpoint of the API to hit
+        :param url_parameter: A parameter to replace in the endpoint string provided
+        :param payload: A dict of parameters to be sent with the request
+        :param result_class: (optional) The class of the compact result to return if the instance was created with
+            ``compact_results``
+        :type endpoint: str
+        :type url_parameter: str
+        :type payload: dict
+        :type result_class: type
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        return await self._generic_request("GET", endpoint, url_parameter, payload, result_class=result_class)
+
+    async def _generic_post(self, endpoint, url_parameter=None, payload=None, files=None, result_class=None):
+        """
+        Make a POST request to the Pushover API. See :meth:`PushoverAPI._generic_post`.
+
+        :param endpoint: The endpoint of the API to hit
+        :param url_parameter: A parameter to replace in the endpoint string provided
+        :param payload: A dict of parameters to be sent with the request
+        :param files: (optional) A dict of ``'attachment': value`` for attachment to the message
+        :param result_class: (optional) The class of the compact result to return if the instance was created with
+            ``compact_results``
+        :type endpoint: str
+        :type url_parameter: str
+        :type payload: dict
+        :type files: dict
+        :type result_class: type
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        return await self._generic_request("POST", endpoint, url_parameter, payload, files, result_class)
+
+    # yeah, it's a lot of arguments, but I'd rather do this than create a type for the request
+    async def send_message(  # noqa: PLR0913
+        self,
+        user,
+        message,
+        *,
+        device=None,
+        title=None,
+        url=None,
+        url_title=None,
+        image=None,
+        priority=None,
+        retry=None,
+        expire=None,
+        callback_url=None,
+        timestamp=None,
+        sound=None,
+        html=False,
+        ttl=None,
+        attachment_base64=None,
+        attachment_type=None,
+    ):
+        """
+        Send a message via the Pushover API. See :meth:`PushoverAPI.send_message` for a description of the parameters.
+
+        Every parameter but ``user`` and ``message`` must be given by keyword.
+
+        :param user: A Pushover user token representing the user or group to whom the message will be sent
+        :param message: The message to be sent
+        :param device: A string or iterable representing the device(s) to which the message will be sent
+        :param title: The title of the message
+        :param url: A URL to be included with the message
+        :param url_title: The link text to be displayed for the URL
+        :param image: The file path pointing to the image to be attached to the message, a file-like object
+            representing the image data, or the image data itself as a bytes-like object or :class:`mmap.mmap`.
+            :mod:`httpx` only accepts :class:`bytes`, so other bytes-like objects are copied.
+        :param priority: An integer representing the priority of the message, from -2 to 2
+        :param retry: How often the Pushover server will re-send an emergency-priority message in seconds
+        :param expire: How long an emergency-priority message will be re-sent for in seconds
+        :param callback_url: A url to be visited by the Pushover servers upon acknowledgement of an emergency-priority
+            message
+        :param timestamp: A Unix timestamp of the message's date and time
+        :param sound: A string representing the sound to be played with the message
+        :param html: An integer representing if HTML formatting will be enabled for the message text
+        :param ttl: An integer representing Time to Live in seconds
+        :param attachment_base64: The base64-encoded data of an image to be attached to the message, instead of
+            ``image``
+        :param attachment_type: The MIME type of ``attachment_base64``
+        :type user: str
+        :type message: str
+        :type device: str or list
+        :type title: str
+        :type url: str
+        :type url_title: str
+        :type image: str, pathlib.Path, file-like, bytes, bytearray, memoryview, or mmap.mmap
+        :type priority: int
+        :type retry: int
+        :type expire: int
+        :type callback_url: str
+        :type timestamp: int
+        :type sound: str
+        :type html: int
+        :type ttl: int
+        :type attachment_base64: str
+        :type attachment_type: str
+
+        :returns: Response body interpreted as JSON, or ``None`` if the instance's :class:`MessageCoalescer` held the
+            message back as a duplicate
+        :rtype: dict or MessageResult
+        :raises MessageValidationError: Raised when the instance's :class:`MessageValidator` finds problems with the
+            message.
+        :raises QuotaExceededError: Raised when the instance's :class:`QuotaThrottle` refuses to send the message.
+        :raises ValueError: Raised when both ``image`` and ``attachment_base64`` are given.
+        """
+        if image is not None and attachment_base64 is not None:
+            msg = "only one of image and attachment_base64 can be given"
+            raise ValueError(msg)
+
+        payload = {
+            "user": user,
+            "message": message,
+            "device": device,
+            "title": title,
+            "url": url,
+            "url_title": url_title,
+            "priority": priority,
+            "retry": retry,
+            "expire": expire,
+            "callback": callback_url,
+            "timestamp": timestamp,
+            "sound": sound,
+            "html": html,
+            "ttl": ttl,
+            "attachment_base64": attachment_base64,
+            "attachment_type": attachment_type,
+        }
+
+        if not await self._screen_message(payload):
+            return None
+
+        try:
+            return await self._post_message(payload, image)
+        except BaseException:
+            # a duplicate of a message which wasn't sent mustn't be held back
+            if self.coalescer is not None:
+                self.coalescer.forget(payload)
+            raise
+
+    async def _post_message(self, payload, image):
+        """
+        Send a message which has been screened by :meth:`AsyncPushoverAPI._screen_message`.
+
+        :param payload: The fields of the message, named as in a request to the Pushover API
+        :param image: The image to be attached to the message, as taken by :meth:`AsyncPushoverAPI.send_message`
+        :type payload: dict
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict or MessageResult
+        :raises QuotaExceededError: Raised when the instance's :class:`QuotaThrottle` refuses to send the message.
+        """
+        if self.throttle is not None:
+            await asyncio.sleep(self.throttle.delay(self.rate_limit))
+
+        if image is not None:
+            # if it's a str or a Path, read it without blocking the event loop
+            if isinstance(image, (str, Path)):
+                if self.attachment_cache is not None:
+                    attachment = {"attachment": await asyncio.to_thread(self.attachment_cache.get, image)}
+                else:
+                    image_path = Path(image)
+                    image_bytes = await asyncio.to_thread(image_path.read_bytes)
+                    attachment = {"attachment": (image_path.name, image_bytes)}
+                return await self._generic_post(
+                    "messages.json", payload=payload, files=attachment, result_class=MessageResult
+                )
+            if isinstance(image, (bytearray, memoryview, mmap.mmap)):
+                image = bytes(image)
+            # otherwise, it's bytes or a file-like
+            return await self._generic_post(
+                "messages.json", payload=payload, files={"attachment": image}, result_class=MessageResult
+            )
+
+        return await self._generic_post("messages.json", payload=payload, result_class=MessageResult)
+
+    async def _screen_message(self, payload):
+        """
+        Check a message with the instance's :class:`MessageValidator` and :class:`MessageCoalescer` before it is sent.
+
+        Any summaries of duplicates due from the coalescer are sent first.
+
+        :param payload: The fields of the message, named as in a request to the Pushover API
+        :type payload: dict
+
+        :returns: Whether to send the message, or hold it back as a duplicate
+        :rtype: bool
+        :raises MessageValidationError: Raised when the validator finds problems with the message.
+        """
+        if self.validator is not None:
+            if self.validator.needs_sounds(payload):
+                self.validator.update_sounds(await self.get_sounds())
+            self.validator.validate(payload)
+
+        if self.coalescer is None:
+            return True
+        await self.send_coalesced()
+        return self.coalescer.admit(payload)
+
+    async def send_coalesced(self, flush=False):  # noqa: FBT002
+        """
+        Send the summaries of the duplicates merged by the instance's :class:`MessageCoalescer`.
+
+        See :meth:`PushoverAPI.send_coalesced`.
+
+        :param flush: If true, send the summaries of every duplicate held back, without waiting for the window to close
+        :type flush: bool
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each summary sent
+        :rtype: list
+        """
+        if self.coalescer is None:
+            return []
+        summaries = self.coalescer.drain() if flush else self.coalescer.pop_due()
+        results = []
+        for summary in summaries:
+            try:
+                if self.throttle is not None:
+                    await asyncio.sleep(self.throttle.delay(self.rate_limit))
+                results.append(await self._generic_post("messages.json", payload=summary, result_class=MessageResult))
+            except Exception as e:  # noqa: BLE001, PERF203 -- handed to the caller instead of failing an unrelated message
+                results.append(e)
+        return results
+
+    async def send_messages(self, messages, max_in_flight=None, return_exceptions=False):  # noqa: FBT002
+        """
+        Send multiple messages concurrently over the shared connection pool.
+
+        :param messages: An iterable of messages to be sent. Each item in the iterable must be expandable using the
+            ``**kwargs`` syntax with the keys matching the parameters of :meth:`AsyncPushoverAPI.send_message`.
+        :param max_in_flight: The maximum number of messages to have in flight at once. Unlimited if omitted.
+        :param return_exceptions: If true, the exception raised for a message (usually a :class:`BadAPIRequestError`)
+            is placed in the returned list in that message's position instead of being raised
+        :type max_in_flight: int
+        :type return_exceptions: bool
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each message, in the same order as
+            ``messages``
+        :rtype: list[dict]
+        """
+        if max_in_flight is None:
+            send = self.send_message
+        else:
+            semaphore = asyncio.Semaphore(max_in_flight)
+
+            async def send(**message):
+                """Send a message once fewer than ``max_in_flight`` are in flight."""
+                async with semaphore:
+                    return await self.send_message(**message)
+
+        return await asyncio.gather(
+            *(send(**message) for message in messages),
+            return_exceptions=return_exceptions,
+        )
+
+    async def iter_send_messages(self, messages, max_in_flight=1):
+        """
+        Send a stream of messages, yielding the outcome of each one as soon as it is known.
+
+        See :meth:`PushoverAPI.iter_send_messages`. ``messages`` may also be an asynchronous iterable, such as an
+        asynchronous database cursor.
+        Sending stops when the generator is closed; messages still in flight are cancelled.
+
+        :param messages: An iterable or asynchronous iterable of messages to be sent. Each item must be expandable
+            using the ``**kwargs`` syntax with the keys matching the parameters of
+            :meth:`AsyncPushoverAPI.send_message`.
+        :param max_in_flight: The maximum number of messages to have in flight at once
+        :type messages: iterable or async iterable
+        :type max_in_flight: int
+
+        :returns: An asynchronous generator of ``(message, result)`` tuples, in the order the messages finish sending,
+            where ``result`` is the response body interpreted as JSON or the exception raised for the message (usually
+            a :class:`BadAPIRequestError`)
+        :rtype: async generator
+        """
+        messages = messages.__aiter__() if hasattr(messages, "__aiter__") else _async_iter(messages)
+        exhausted = False
+        in_flight = {}
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        message = await messages.__anext__()
+                    except StopAsyncIteration:  # noqa: PERF203 -- the end of the messages, once
+                        exhausted = True
+                    else:
+                        in_flight[asyncio.ensure_future(self.send_message(**message))] = message
+                if not in_flight:
+                    return
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    message = in_flight.pop(task)
+                    yield message, task.exception() or task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _cached(self, key, request, *args, **kwargs):
+        """
+        Make a request, or answer it from :attr:`AsyncPushoverAPI.response_cache` if it is cached.
+
+        :param key: The key of the response in the cache
+        :param request: The coroutine function making the request
+        :param args: Positional arguments for ``request``
+        :param kwargs: Keyword arguments for ``request``
+        :type key: tuple
+        :type request: callable
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        :raises BadAPIRequestError: Raised when the Pushover response body contains a status code other than 1.
+        """
+        if self.response_cache is None:
+            return await request(*args, **kwargs)
+        cached, response = self.response_cache.lookup(key)
+        if cached:
+            if isinstance(response, BadAPIRequestError):
+                raise response
+            return response
+
+        try:
+            response = await request(*args, **kwargs)
+        except BadAPIRequestError as e:
+            # a request rejected as invalid will be rejected again, unlike one that failed for a transient reason
+            if e.status_code == 400:  # noqa: PLR2004
+                self.response_cache.store(key, e)
+            raise
+        self.response_cache.store(key, response)
+        return response
+
+    async def get_sounds(self):
+        """
+        Get the current list of supported sounds from the Pushover servers.
+
+        :return: A :class:`dict` of sounds, with keys representing the identifier and values a human-readable name.
+        :rtype: dict
+        """
+        return (await self._cached((SOUNDS,), self._generic_get, "sounds.json")).get("sounds")
+
+    async def get_limits(self):
+        """
+        Get the application's current message quota from the Pushover servers.
+
+        Also updates :attr:`AsyncPushoverAPI.rate_limit`.
+
+        :returns: The application's quota
+        :rtype: RateLimit
+        """
+        resp_body = await self._generic_get("apps/limits.json")
+        self.rate_limit = RateLimit(resp_body["limit"], resp_body["remaining"], resp_body["reset"])
+        if self.instrumentation is not None:
+            self.instrumentation.quota_updated(self.rate_limit)
+        return self.rate_limit
+
+    async def validate(self, user, device=None):
+        """
+        Validate a user or group token or a user device.
+
+        :param user: A Pushover user or group token to validate
+        :param device: A string representing a device name to validate
+        :type user: str
+        :type device: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict or ValidationResult
+        """
+        payload = {"user": user, "device": device}
+        return await self._cached(
+            (VALIDATE, user, device),
+            self._generic_post,
+            "users/validate.json",
+            payload=payload,
+            result_class=ValidationResult,
+        )
+
+    async def check_receipt(self, receipt):
+        """
+        Check a receipt issued after sending an emergency-priority message.
+
+        :param receipt: The receipt id
+        :type receipt: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict or ReceiptStatus
+        """
+        return await self._generic_get("receipts/{}.json", receipt, result_class=ReceiptStatus)
+
+    async def cancel_receipt(self, receipt):
+        """
+        Cancel a receipt (and thus further re-sends of the message).
+
+        :param receipt: The id of the receipt id to be cancelled
+        :type receipt: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        return await self._generic_post("receipts/{}/cancel.json", receipt)
+
+    async def migrate_to_subscription(self, user, subscription_code, device=None, sound=None):
+        """
+        Migrate a user key to a subscription key.
+
+        :param user: The user key to migrate
+        :param subscription_code: The subscription code to migrate the user to
+        :param device: The user's device that the subscription will be limited to
+        :param sound: The user's preferred sound
+        :type user: str
+        :type subscription_code: str
+        :type device: str
+        :type sound: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {
+            "user": user,
+            "subscription": subscription_code,
+            "device_name": device,
+            "sound": sound,
+        }
+        return await self._generic_post("subscriptions/migrate.json", payload=payload)
+
+    async def migrate_multiple_to_subscription(
+        self,
+        users,
+        subscription_code,
+        max_in_flight=None,
+        return_exceptions=False,  # noqa: FBT002
+        checkpoint=None,
+    ):
+        """
+        Migrate multiple users to subscriptions concurrently over the shared connection pool.
+
+        See :meth:`PushoverAPI.migrate_multiple_to_subscription` for how a ``checkpoint`` file makes a long migration
+        resumable.
+
+        :param users: An iterable of users to be migrated. Each item in the iterable must be expandable using the
+            ``**kwargs`` syntax with keys matching ``user`` and, optionally, ``device`` and ``sound``. Compare to
+            :meth:`AsyncPushoverAPI.migrate_to_subscription`.
+        :param subscription_code: The subscription code to migrate the user to
+        :param max_in_flight: The maximum number of migrations to have in flight at once. Unlimited if omitted.
+        :param return_exceptions: If true, the exception raised for a user (usually a :class:`BadAPIRequestError`) is
+            placed in the returned list in that user's position instead of being raised
+        :param checkpoint: (optional) The path of a file recording the completed migrations, in JSON lines format.
+            Created if it doesn't exist.
+        :type users: iterable
+        :type subscription_code: str
+        :type max_in_flight: int
+        :type return_exceptions: bool
+        :type checkpoint: str or pathlib.Path
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each user, in the same order as
+            ``users``
+        :rtype: list[dict]
+        """
+        limiter = _limiter(max_in_flight)
+        if checkpoint is None:
+
+            async def migrate(user):
+                """Migrate a user within the limit on calls in flight."""
+                async with limiter:
+                    return await self.migrate_to_subscription(subscription_code=subscription_code, **user)
+
+            return await asyncio.gather(*(migrate(user) for user in users), return_exceptions=return_exceptions)
+
+        done = await asyncio.to_thread(Checkpoint, checkpoint)
+        stopping = asyncio.Event()
+
+        async def migrate_once(user):
+            """Migrate a user unless the checkpoint shows it was already done, recording it when it is."""
+            item = dict(user, subscription_code=subscription_code)
+            found, resp = done.lookup(item)
+            if found:
+                return resp
+            async with limiter:
+                if stopping.is_set():
+                    raise asyncio.CancelledError
+                resp = await self.migrate_to_subscription(**item)
+            done.record(item, resp)
+            return resp
+
+        tasks = [asyncio.ensure_future(migrate_once(user)) for user in users]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            # let the migrations already in flight finish and be recorded, but don't start any more
+            stopping.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            done.close()
+
+    async def group_info(self, group_key):
+        """
+        Retrieve information about a delivery group.
+
+        :param group_key: A Pushover group key
+        :type group_key: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict or GroupInfo
+        """
+        return await self._generic_get("groups/{}.json", group_key, result_class=GroupInfo)
+
+    async def group_add_user(self, group_key, user, device=None, memo=None):
+        """
+        Add a user to a group.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to be added to the group
+        :param device: A string representing the device name to add to the group
+        :param memo: A memo to store with the user's group membership (max 200 characters)
+        :type group_key: str
+        :type user: str
+        :type device: str
+        :type memo: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {"user": user, "device": device, "memo": memo}
+        return await self._generic_post("groups/{}/add_user.json", group_key, payload)
+
+    async def group_delete_user(self, group_key, user):
+        """
+        Remove user from a group.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to remove from the group
+        :type group_key: str
+        :type user: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {"user": user}
+        return await self._generic_post("groups/{}/delete_user.json", group_key, payload)
+
+    async def group_disable_user(self, group_key, user):
+        """
+        Temporarily disable a user in a group.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to disable
+        :type group_key: str
+        :type user: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {"user": user}
+        return await self._generic_post("groups/{}/disable_user.json", group_key, payload)
+
+    async def group_enable_user(self, group_key, user):
+        """
+        Re-enable a user in a group.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to enable
+        :type group_key: str
+        :type user: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {"user": user}
+        return await self._generic_post("groups/{}/enable_user.json", group_key, payload)
+
+    async def reconcile_group(self, group_key, members, disabled=(), max_in_flight=None):
+        """
+        Change a group's membership to match the desired membership. See :meth:`PushoverAPI.reconcile_group`.
+
+        :param group_key: A Pushover group key
+        :param members: The user keys that should be enabled members of the group
+        :param disabled: The user keys that should be disabled members of the group
+        :param max_in_flight: The maximum number of users to change at once. Unlimited if omitted.
+        :type group_key: str
+        :type members: iterable
+        :type disabled: iterable
+        :type max_in_flight: int
+
+        :returns: The changes made for each user that needed changing, in order of user key
+        :rtype: list[GroupChange]
+        :raises ValueError: Raised when a user is in both ``members`` and ``disabled``.
+        :raises BadAPIRequestError: Raised when the group can't be fetched.
+        """
+        plan = plan_group_changes(await self.group_info(group_key), members, disabled)
+        operations = {
+            ADD: self.group_add_user,
+            DELETE: self.group_delete_user,
+            DISABLE: self.group_disable_user,
+            ENABLE: self.group_enable_user,
+        }
+        limiter = _limiter(max_in_flight)
+
+        async def change(user):
+            """Apply the planned changes to one member, stopping at the first that fails."""
+            done = []
+            async with limiter:
+                for action in plan[user]:
+                    try:
+                        await operations[action](group_key, user)
+                    except Exception as e:  # noqa: BLE001 -- reported to the caller
+                        return GroupChange(user, tuple(done), e)
+                    done.append(action)
+            return GroupChange(user, tuple(done), None)
+
+        return await asyncio.gather(*(change(user) for user in sorted(plan)))
+
+    async def group_rename(self, group_key, new_name):
+        """
+        Change the name of a group.
+
+        :param group_key: A Pushover group key
+        :param new_name: The new name for the group
+        :type group_key: str
+        :type new_name: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {"name": new_name}
+        return await self._generic_post("groups/{}/rename.json", group_key, payload)
+
+    async def assign_license(self, user_identifier, os=None):
+        """
+        Assign a Pushover license to a user.
+
+        :param user_identifier: A Pushover user key or email identifying the user to assign the license to
+        :param os: An OS to limit the license. Available options are :code:`Android`, :code:`iOS`, or :code:`Desktop`
+        :type user_identifier: str
+        :type os: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        payload = {"os": os}
+        if "@" in user_identifier:
+            payload["email"] = user_identifier
+        else:
+            payload["user"] = user_identifier
+        return await self._generic_post("licenses/assign.json", payload=payload)
+
+    async def assign_licenses(self, user_identifiers, os=None, max_in_flight=None, return_exceptions=False):  # noqa: FBT002
+        """
+        Assign Pushover licenses to multiple users concurrently over the shared connection pool.
+
+        Like :meth:`PushoverAPI.assign_licenses`, ``user_identifiers`` is consumed only as assignments finish, so it may
+        be a generator over a large directory: a fixed number of workers each take the next identifier once their last
+        assignment is done.
+
+        :param user_identifiers: An iterable of Pushover user keys or emails identifying the users to assign licenses to
+        :param os: An OS to limit the licenses. Available options are :code:`Android`, :code:`iOS`, or :code:`Desktop`
+        :param max_in_flight: The maximum number of assignments to have in flight at once. One at a time if omitted.
+        :param return_exceptions: If true, the exception raised for a user (usually a :class:`BadAPIRequestError`) is
+            placed in the returned list in that user's position instead of being raised
+        :type user_identifiers: iterable
+        :type os: str
+        :type max_in_flight: int
+        :type return_exceptions: bool
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each user, in the same order as
+            ``user_identifiers``
+        :rtype: list[dict]
+        """
+        identifiers = enumerate(user_identifiers)
+        results = {}
+
+        async def worker():
+            """Assign licenses to the next user identifiers until none are left."""
+            # the workers share the iterator, so each identifier is taken by the first worker to become free
+            for index, user_identifier in identifiers:
+                try:
+                    results[index] = await self.assign_license(user_identifier, os)
+                except Exception as e:  # noqa: PERF203 -- each assignment fails on its own
+                    if not return_exceptions:
+                        raise
+                    results[index] = e
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max_in_flight or 1)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # after a failure, stop the other workers rather than carrying on with the rest of the identifiers
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return [results[index] for index in range(len(results))]
@@ -0,0 +1,126 @@
+"""An in-memory cache of image attachments read from disk."""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+#: The default maximum total size of the images kept by an :class:`AttachmentCache`, in bytes
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class AttachmentCache:
+    """
+    A size-bounded, least-recently-used cache of the contents of image files attached to messages.
+
+    When the same image is attached to many messages, give an :class:`AttachmentCache` to :class:`PushoverAPI` (or
+    :class:`AsyncPushoverAPI`) so the file is read from disk once instead of for every message.
+    Images given as paths are then looked up by their resolved path, modification time and size, so a file that changes
+    on disk is read again.
+    Images given as file-like objects are never cached.
+
+    Once the cached images take up more than ``max_bytes``, the least recently used ones are evicted. Images larger than
+    ``max_bytes`` on their own are read every time and not cached.
+
+    Images can be processed before they are cached, e.g. shrunk to fit the size limit on attachments by an
+    :class:`ImageShrinker`, in which case the processed image is what is cached and sent.
+
+    The cache is safe to share between threads and between API instances.
+
+    :param max_bytes: The maximum total size of the cached images, in bytes
+    :param max_entries: (optional) The maximum number of cached images
+    :param transform: (optional) A callable taking the ``filename`` and ``contents`` of an image read from disk and
+        returning the ``(filename, contents)`` to cache and send in its place
+    :type max_bytes: int
+    :type max_entries: int
+    :type transform: callable
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=None, transform=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.transform = transform
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Count the cached images.
+
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        The total size of the cached images, in bytes.
+
+        :rtype: int
+        """
+        with self._lock:
+            return self._size
+
+    def get(self, path):
+        """
+        Get an image to attach to a message, reading it from disk unless it is cached.
+
+        :param path: The path of the image
+        :type path: str or pathlib.Path
+
+        :returns: A ``(filename, contents)`` tuple, as accepted in the ``files`` argument of
+            :meth:`requests.Session.request`
+        :rtype: tuple(str, bytes)
+        :raises OSError: Raised when the image can't be read.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = (path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = (path.name, path.read_bytes())
+        if self.transform is not None:
+            entry = self.transform(*entry)
+        if len(entry[1]) <= self.max_bytes:
+            with self._lock:
+                self._store(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        """
+        Add an image to the cache, evicting others to make space. Must be called with the lock held.
+
+        :param key: The ``(path, mtime, size)`` key of the image
+        :param entry: The ``(filename, contents)`` of the image
+        :type key: tuple
+        :type entry: tuple(str, bytes)
+        """
+        if key in self._entries:
+            # another thread read it at the same time
+            return
+        # an older version of the file is never going to be asked for again
+        for stale in [other for other in self._entries if other[0] == key[0]]:
+            self._size -= len(self._entries.pop(stale)[1])
+
+        self._entries[key] = entry
+        self._size += len(entry[1])
+        while self._size > self.max_bytes or (self.max_entries is not None and len(self._entries) > self.max_entries):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self):
+        """Remove every image from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,170 @@
+"""An embeddable HTTP server receiving the acknowledgement callbacks of emergency-priority messages."""
+
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+#: The largest request body accepted, in bytes. Acknowledgement callbacks are only a few hundred bytes.
+MAX_BODY_SIZE = 4096
+
+_INTEGER_FIELDS = ("acknowledged", "acknowledged_at")
+
+
+def parse_callback(body):
+    """
+    Parse the body of an acknowledgement callback into the status of its receipt.
+
+    The status has the same keys as the acknowledgement part of the response to :meth:`PushoverAPI.check_receipt`.
+
+    :param body: The form-encoded body of the callback request
+    :type body: bytes or str
+
+    :returns: The status of the receipt, including its id as ``receipt``
+    :rtype: dict
+    :raises ValueError: Raised when the body is not an acknowledgement callback.
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    status = {key: values[0] for key, values in parse_qs(body).items()}
+    if "receipt" not in status:
+        msg = "the callback has no receipt"
+        raise ValueError(msg)
+    for field in _INTEGER_FIELDS:
+        if field in status:
+            status[field] = int(status[field])
+    status.setdefault("acknowledged", 1)
+    return status
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    """Handle acknowledgement callbacks for a :class:`CallbackReceiver`."""
+
+    server_version = "pushover_complete"
+
+    def do_POST(self):
+        """Resolve the receipt of an acknowledgement callback."""
+        receiver = self.server.receiver
+        if self.path.split("?")[0] != receiver.path:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        # a negative length would make the read below wait for the client to close the connection
+        if length < 0:
+            self.send_error(HTTPStatus.BAD_REQUEST)
+            return
+        if length > MAX_BODY_SIZE:
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            return
+        try:
+            receiver.handle(self.rfile.read(length))
+        except ValueError:
+            self.send_error(HTTPStatus.BAD_REQUEST)
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):  # noqa: A002 -- name required by BaseHTTPRequestHandler
+        """Don't log requests to stderr."""
+
+
+class CallbackReceiver:
+    """
+    Receive the acknowledgement callbacks of emergency-priority messages and resolve their receipts.
+
+    When an emergency-priority message is sent with a ``callback_url``, Pushover POSTs to that URL as soon as the
+    message is acknowledged, so the receipt no longer needs to be polled to learn of it. Run the receiver with
+    :meth:`CallbackReceiver.start` (or by using it as a context manager) and send messages with
+    :attr:`CallbackReceiver.url`, or the URL at which a reverse proxy exposes it, as their ``callback_url``.
+    To receive callbacks in an existing web application instead, pass request bodies to :meth:`CallbackReceiver.handle`.
+
+    Pushover doesn't sign callbacks, so anyone who knows the URL can resolve receipts. Use a hard-to-guess ``path``.
+    Callbacks aren't sent when a message expires, so keep the tracker polling, e.g. with a long ``max_interval``, to
+    learn of expired receipts.
+
+    :param tracker: The tracker whose receipts are resolved
+    :param host: The address to listen on
+    :param port: The port to listen on. A free port is picked if ``0``.
+    :param path: The URL path at which callbacks are accepted
+    :param on_unknown: (optional) A callable to be called with the status from a callback for a receipt that isn't
+        being tracked
+    :type tracker: ReceiptTracker
+    :type host: str
+    :type port: int
+    :type path: str
+    :type on_unknown: callable
+    """
+
+    def __init__(self, tracker, host="127.0.0.1", port=0, path="/", on_unknown=None):
+        self.tracker = tracker
+        self.path = path
+        self.on_unknown = on_unknown
+
+        self._server = ThreadingHTTPServer((host, port), _CallbackHandler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        self._worker = None
+
+    def __enter__(self):
+        """Enter the context manager, starting the server."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, shutting down the server."""
+        self.close()
+
+    @property
+    def url(self):
+        """
+        The URL at which the server accepts callbacks.
+
+        :rtype: str
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def handle(self, body):
+        """
+        Resolve the receipt of an acknowledgement callback.
+
+        :param body: The form-encoded body of the callback request
+        :type body: bytes or str
+
+        :returns: Whether the receipt was being tracked
+        :rtype: bool
+        :raises ValueError: Raised when the body is not an acknowledgement callback.
+        """
+        status = parse_callback(body)
+        if self.tracker.resolve(status["receipt"], status):
+            return True
+        if self.on_unknown is not None:
+            self.on_unknown(status)
+        return False
+
+    def start(self):
+        """Start serving callbacks from a background thread. Does nothing if it is already running."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(
+            target=self._server.serve_forever,
+            name="pushover_complete-callbacks",
+            daemon=True,
+        )
+        self._worker.start()
+
+    def stop(self):
+        """Stop serving callbacks. The server can be started again."""
+        if self._worker is not None:
+            self._server.shutdown()
+            self._worker.join()
+            self._worker = None
+
+    def close(self):
+        """Stop serving callbacks and close the listening socket."""
+        self.stop()
+        self._server.server_close()
@@ -0,0 +1,181 @@
+"""Collapsing of duplicate messages sent in quick succession, e.g. by an alert firing over and over."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .validation import MAX_MESSAGE_LENGTH
+
+# attachments are dropped from summaries rather than kept in memory for the whole window
+_SUMMARY_DROPPED_FIELDS = ("attachment_base64", "attachment_type")
+
+
+def summary_message(message, duplicates):
+    """
+    Make the text of a message summarizing the duplicates of another, cut short to fit the Pushover API's limit.
+
+    :param message: The text of the duplicated message
+    :param duplicates: The number of duplicates held back
+    :type message: str
+    :type duplicates: int
+
+    :rtype: str
+    """
+    suffix = f" ({duplicates} more occurrence{'' if duplicates == 1 else 's'})"
+    message = str(message)
+    if len(message) + len(suffix) > MAX_MESSAGE_LENGTH:
+        message = message[: MAX_MESSAGE_LENGTH - len(suffix) - 3] + "..."
+    return message + suffix
+
+
+class MessageCoalescer:
+    """
+    Collapse duplicate messages sent within a window of time, so a flood of identical alerts costs a single message.
+
+    Give a :class:`MessageCoalescer` to :class:`PushoverAPI` (or :class:`AsyncPushoverAPI`) as its ``coalescer`` to
+    check every message it sends, including those of :meth:`PushoverAPI.send_messages` and :meth:`PushoverAPI.submit`.
+    Messages with the same user, title and text are duplicates: the first is sent as usual, and the others sent within
+    ``window`` seconds of it are held back, returning ``None`` instead of a response. A message which fails to be sent
+    is forgotten, so that retrying it sends it again.
+
+    By default duplicates are dropped. With ``merge``, a single summary is sent once the window closes instead, with
+    the fields of the latest duplicate (without any attachment) and its text followed by the number of duplicates, e.g.
+    "Disk full (4 more occurrences)". Summaries are sent by :meth:`PushoverAPI.send_coalesced`, which is called before
+    each message is sent and when the API instance is closed. An application which may go quiet for a long time should
+    also call it every so often, so that summaries aren't left waiting for the next message.
+
+    At most ``maxsize`` messages are remembered. Beyond that, the oldest is forgotten (its summary becoming due early),
+    and a duplicate of it would be sent again.
+
+    The coalescer is safe to share between threads and between API instances.
+
+    :param window: How long, in seconds, after a message is sent to hold back its duplicates
+    :param merge: If true, send a summary of the duplicates held back once the window closes, instead of dropping them
+    :param maxsize: The most messages to remember at once
+    :type window: float
+    :type merge: bool
+    :type maxsize: int
+    """
+
+    def __init__(self, window=60.0, merge=False, maxsize=10000):  # noqa: FBT002
+        if maxsize < 1:
+            msg = "maxsize must be at least 1"
+            raise ValueError(msg)
+        self.window = window
+        self.merge = merge
+        self.maxsize = maxsize
+
+        # (user, title, message) -> [window closing time, fields of the latest duplicate, number of duplicates,
+        #                            fields of the message admitted]
+        # every window is as long, so the oldest entry is always the first to expire
+        self._entries = OrderedDict()
+        self._due = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of messages remembered."""
+        with self._lock:
+            return len(self._entries)
+
+    def _retire(self, entry):
+        """
+        Queue the summary of a forgotten message, if it has any duplicates to merge. Must be called with the lock held.
+
+        :param entry: The forgotten entry
+        :type entry: list
+        """
+        _, fields, duplicates, _ = entry
+        if self.merge and duplicates:
+            summary = {key: value for key, value in fields.items() if key not in _SUMMARY_DROPPED_FIELDS}
+            summary["message"] = summary_message(fields["message"], duplicates)
+            self._due.append(summary)
+
+    def _expire(self, now):
+        """
+        Forget the messages whose window has closed. Must be called with the lock held.
+
+        :param now: The current time, from :func:`time.monotonic`
+        :type now: float
+        """
+        entries = self._entries
+        while entries:
+            entry = next(iter(entries.values()))
+            if entry[0] > now:
+                return
+            entries.popitem(last=False)
+            self._retire(entry)
+
+    def admit(self, fields, now=None):
+        """
+        Check whether a message should be sent, or held back as a duplicate of one sent recently.
+
+        :param fields: The fields of the message, named as in a request to the Pushover API
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type fields: dict
+        :type now: float
+
+        :returns: Whether to send the message
+        :rtype: bool
+        """
+        if now is None:
+            now = time.monotonic()
+        key = (fields.get("user"), fields.get("title"), fields.get("message"))
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = fields
+                entry[2] += 1
+                return False
+            if len(self._entries) >= self.maxsize:
+                self._retire(self._entries.popitem(last=False)[1])
+            self._entries[key] = [now + self.window, fields, 0, fields]
+            return True
+
+    def forget(self, fields):
+        """
+        Forget a message admitted by :meth:`MessageCoalescer.admit` which then failed to be sent.
+
+        A duplicate of it, such as the same message retried, is then sent rather than held back. Duplicates already
+        held back are merged into a summary as usual.
+
+        :param fields: The fields of the message, the same object as was given to :meth:`MessageCoalescer.admit`
+        :type fields: dict
+        """
+        key = (fields.get("user"), fields.get("title"), fields.get("message"))
+        with self._lock:
+            entry = self._entries.get(key)
+            # the window may have closed and a later duplicate been admitted in its place
+            if entry is not None and entry[3] is fields:
+                del self._entries[key]
+                self._retire(entry)
+
+    def pop_due(self, now=None):
+        """
+        Take the summaries of the messages whose window has closed, ready to be sent.
+
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type now: float
+
+        :returns: The fields of each summary, named as in a request to the Pushover API
+        :rtype: list[dict]
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            due, self._due = self._due, []
+        return due
+
+    def drain(self):
+        """
+        Forget every message, taking the summaries of all of them without waiting for their window to close.
+
+        :returns: The fields of each summary, named as in a request to the Pushover API
+        :rtype: list[dict]
+        """
+        with self._lock:
+            while self._entries:
+                self._retire(self._entries.popitem(last=False)[1])
+            due, self._due = self._due, []
+        return due
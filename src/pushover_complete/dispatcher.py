@@ -0,0 +1,193 @@
+"""Fire-and-forget sending of messages from a pool of background threads."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from .error import QueueFullError
+
+#: Wait for space in the queue when it is full
+BLOCK = "block"
+#: Cancel the oldest queued message to make space when the queue is full
+DROP_OLDEST = "drop_oldest"
+#: Raise a :class:`QueueFullError` when the queue is full
+RAISE = "raise"
+
+_BACKPRESSURE_POLICIES = (BLOCK, DROP_OLDEST, RAISE)
+
+
+class Dispatcher:
+    """
+    A bounded in-memory queue of messages sent by a pool of worker threads.
+
+    :meth:`Dispatcher.submit` returns a :class:`concurrent.futures.Future` for the message right away; the message is
+    sent by one of the worker threads, all of which share the connection pool of ``api``.
+    The worker threads are started with the first submitted message.
+
+    When ``max_queue`` messages are already waiting to be sent, ``backpressure`` decides what happens to a new one:
+
+    - ``"block"`` waits for space, for up to ``block_timeout`` seconds (forever if ``None``), and then raises a
+      :class:`QueueFullError`
+    - ``"drop_oldest"`` cancels the future of the oldest waiting message and queues the new one in its place
+    - ``"raise"`` raises a :class:`QueueFullError` immediately
+
+    Messages still queued when the process exits are lost, so call :meth:`Dispatcher.shutdown` (or
+    :meth:`PushoverAPI.close`) before exiting.
+
+    :param api: The :class:`PushoverAPI` used to send messages
+    :param max_workers: The number of worker threads. Should not exceed the ``pool_maxsize`` of ``api``.
+    :param max_queue: The maximum number of messages waiting to be sent
+    :param backpressure: What to do when the queue is full: ``"block"``, ``"drop_oldest"`` or ``"raise"``
+    :param block_timeout: (optional) The maximum number of seconds to wait for space with ``"block"``
+    :type api: PushoverAPI
+    :type max_workers: int
+    :type max_queue: int
+    :type backpressure: str
+    :type block_timeout: float
+    """
+
+    def __init__(self, api, max_workers=4, max_queue=1000, backpressure=BLOCK, block_timeout=None):
+        if backpressure not in _BACKPRESSURE_POLICIES:
+            msg = f"backpressure must be one of {', '.join(_BACKPRESSURE_POLICIES)}, not {backpressure!r}"
+            raise ValueError(msg)
+        # there would be no message to drop in favour of a new one, nor space to wait for
+        if max_queue < 1:
+            msg = "max_queue must be at least 1"
+            raise ValueError(msg)
+        self.api = api
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+
+        self._queue = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._workers = []
+        self._shutdown = False
+
+    def submit(self, user, message, **kwargs):
+        """
+        Queue a message to be sent in the background.
+
+        :param user: A Pushover user token representing the user or group to whom the message will be sent
+        :param message: The message to be sent
+        :param kwargs: Any other parameters of :meth:`PushoverAPI.send_message`
+        :type user: str
+        :type message: str
+
+        :returns: A future resolving to the response body interpreted as JSON, or to the exception raised while sending
+        :rtype: concurrent.futures.Future
+        :raises QueueFullError: Raised when the queue is full and the backpressure policy doesn't allow waiting.
+        :raises RuntimeError: Raised when the dispatcher has been shut down.
+        """
+        future = Future()
+        kwargs.update(user=user, message=message)
+        with self._condition:
+            if self._shutdown:
+                msg = "cannot submit messages after shutdown"
+                raise RuntimeError(msg)
+            if len(self._queue) >= self.max_queue:
+                self._make_space()
+            self._queue.append((future, kwargs))
+            if len(self._workers) < self.max_workers:
+                self._start_worker()
+            self._condition.notify_all()
+        return future
+
+    def _make_space(self):
+        """
+        Apply the backpressure policy to a full queue. Must be called with the condition held.
+
+        :raises QueueFullError: Raised when no space could be made.
+        """
+        if self.backpressure == DROP_OLDEST:
+            dropped, _ = self._queue.popleft()
+            dropped.cancel()
+            return
+        if self.backpressure == BLOCK and self._condition.wait_for(
+            lambda: len(self._queue) < self.max_queue or self._shutdown,
+            self.block_timeout,
+        ):
+            if self._shutdown:
+                msg = "cannot submit messages after shutdown"
+                raise RuntimeError(msg)
+            return
+        msg = f"{len(self._queue)} messages are already waiting to be sent"
+        raise QueueFullError(msg)
+
+    def _start_worker(self):
+        """Start another worker thread. Must be called with the condition held."""
+        worker = threading.Thread(
+            target=self._work,
+            name=f"pushover_complete-dispatcher-{len(self._workers)}",
+            daemon=True,
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self):
+        """Send queued messages until shut down. The body of each worker thread."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._shutdown)
+                if not self._queue:
+                    return
+                future, message = self._queue.popleft()
+                self._in_flight += 1
+                # wake up anyone blocked waiting for space
+                self._condition.notify_all()
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = self.api._send_message(**message)  # noqa: SLF001 -- meant to be used this way
+                    except Exception as e:  # noqa: BLE001 -- handed to the caller via the future
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message has been sent.
+
+        :param timeout: (optional) The maximum number of seconds to wait
+        :type timeout: float
+
+        :returns: Whether all messages were sent before the timeout
+        :rtype: bool
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def shutdown(self, timeout=None, cancel_pending=False):  # noqa: FBT002
+        """
+        Stop accepting messages and stop the worker threads once the queued messages have been sent.
+
+        :param timeout: (optional) The maximum number of seconds to wait for the worker threads to finish
+        :param cancel_pending: Whether to cancel messages that are queued but not yet being sent, instead of sending
+            them
+        :type timeout: float
+        :type cancel_pending: bool
+
+        :returns: Whether all worker threads finished before the timeout
+        :rtype: bool
+        """
+        with self._condition:
+            self._shutdown = True
+            if cancel_pending:
+                while self._queue:
+                    future, _ = self._queue.popleft()
+                    future.cancel()
+            self._condition.notify_all()
+            workers = list(self._workers)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(worker.is_alive() for worker in workers)
@@ -10,4 +10,58 @@ class PushoverCompleteError(Exception):
 
 
 class BadAPIRequestError(PushoverCompleteError):
-    """An exception raised when Pushover's API responds to a request with an error."""
+    """
+    An exception raised when Pushover's API responds to a request with an error.
+
+    :param message: A description of the error
+    :param status_code: (optional) The HTTP status code of the response
+    :type message: str
+    :type status_code: int
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class QuotaExceededError(PushoverCompleteError):
+    """
+    An exception raised when a :class:`QuotaThrottle` refuses to send a message to protect the app's quota.
+
+    :param message: A description of the error
+    :param retry_at: (optional) The Unix time from which the throttle expects to allow the message
+    :type message: str
+    :type retry_at: float
+
+    .. attribute:: retry_at
+
+        The Unix time from which the throttle expects to allow the message, or ``None`` if unknown
+    """
+
+    def __init__(self, message, retry_at=None):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+class QueueFullError(PushoverCompleteError):
+    """An exception raised when a message can't be queued for sending because the queue is full."""
+
+
+class MessageValidationError(BadAPIRequestError):
+    """
+    An exception raised when a :class:`MessageValidator` finds that a message breaks the rules of the Pushover API.
+
+    The message isn't sent. It is a :class:`BadAPIRequestError`, as the Pushover API would have rejected the message,
+    but its ``status_code`` is ``None``.
+
+    :param problems: The descriptions of every problem found with the message
+    :type problems: list[str]
+
+    .. attribute:: problems
+
+        The descriptions of every problem found with the message, as a tuple
+    """
+
+    def __init__(self, problems):
+        super().__init__("; ".join(problems))
+        self.problems = tuple(problems)
@@ -0,0 +1,482 @@
+"""A local cache of delivery group membership, kept up to date by the changes made through it."""
+
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from ._concurrency import map_concurrently
+from .results import GroupInfo
+
+#: Add a user to a group
+ADD = "add"
+#: Remove a user from a group
+DELETE = "delete"
+#: Disable a user in a group
+DISABLE = "disable"
+#: Re-enable a user in a group
+ENABLE = "enable"
+
+
+class GroupChange(namedtuple("GroupChange", ["user", "actions", "error"])):  # noqa: PYI024 -- documented below
+    """
+    The changes made to a user's membership of a group by :meth:`PushoverAPI.reconcile_group`.
+
+    .. attribute:: user
+
+        The user key
+
+    .. attribute:: actions
+
+        The actions taken, in order, from ``"add"``, ``"delete"``, ``"disable"`` and ``"enable"``. When an action
+        fails, the actions after it are not attempted and not included.
+
+    .. attribute:: error
+
+        The exception raised by the failed action, or ``None`` if every action succeeded
+    """
+
+    __slots__ = ()
+
+
+def plan_group_changes(info, members, disabled=()):
+    """
+    Work out the fewest actions that bring a group's membership in line with the desired membership.
+
+    Users are compared by user key only; the devices and memos of existing members are left alone.
+
+    :param info: The group's information, as returned by :meth:`PushoverAPI.group_info`
+    :param members: The user keys that should be enabled members of the group
+    :param disabled: The user keys that should be disabled members of the group
+    :type info: dict
+    :type members: iterable
+    :type disabled: iterable
+
+    :returns: The actions to take for each user that needs changing, keyed by user key
+    :rtype: dict[str, tuple(str)]
+    :raises ValueError: Raised when a user is in both ``members`` and ``disabled``.
+    """
+    members = set(members)
+    disabled = set(disabled)
+    both = members & disabled
+    if both:
+        msg = f"users can't be both enabled and disabled: {', '.join(sorted(both))}"
+        raise ValueError(msg)
+
+    # a user with several devices in the group has several entries, which can be disabled independently
+    current = {}
+    for member in info.get("users", []):
+        any_enabled, any_disabled = current.get(member["user"], (False, False))
+        current[member["user"]] = (any_enabled or not member["disabled"], any_disabled or member["disabled"])
+
+    plan = {}
+    for user in members:
+        if user not in current:
+            plan[user] = (ADD,)
+        elif current[user][1]:
+            plan[user] = (ENABLE,)
+    for user in disabled:
+        if user not in current:
+            plan[user] = (ADD, DISABLE)
+        elif current[user][0]:
+            plan[user] = (DISABLE,)
+    for user in current.keys() - members - disabled:
+        plan[user] = (DELETE,)
+    return plan
+
+
+def _apply_group_changes(group_key, plan, operations, max_workers=None):
+    """
+    Carry out the actions planned by :func:`plan_group_changes`, for up to ``max_workers`` users at once.
+
+    :param group_key: A Pushover group key
+    :param plan: The actions to take for each user
+    :param operations: The callable carrying out each action, keyed by action, taking the group key and user key
+    :param max_workers: The maximum number of users to change at once
+    :type group_key: str
+    :type plan: dict[str, tuple(str)]
+    :type operations: dict[str, callable]
+    :type max_workers: int
+
+    :returns: The changes made for each user, in order of user key
+    :rtype: list[GroupChange]
+    """
+
+    def change(user):
+        """Apply the planned changes to one member, stopping at the first that fails."""
+        done = []
+        for action in plan[user]:
+            try:
+                operations[action](group_key, user)
+            except Exception as e:  # noqa: BLE001 -- reported to the caller
+                return GroupChange(user, tuple(done), e)
+            done.append(action)
+        return GroupChange(user, tuple(done), None)
+
+    return map_concurrently(change, sorted(plan), max_workers=max_workers)
+
+
+class _CachedGroup:
+    """
+    The cached information about a single group. ``fetched_at`` is ``None`` if it must be fetched again.
+
+    The members are indexed by user key, then device name, so a membership is found without going through them all.
+    Each member is a read-only mapping that is replaced rather than changed, so the read-only view of the whole group
+    only has to be rebuilt after a change.
+    """
+
+    __slots__ = ("_view", "fetched_at", "info", "members")
+
+    def __init__(self, info, fetched_at):
+        info = dict(info)
+        self.members = {}
+        for member in info.pop("users", None) or ():
+            self.set_member(dict(member))
+        self.info = info
+        self.fetched_at = fetched_at
+        self._view = None
+
+    def set_member(self, member):
+        """
+        Add or replace a member.
+
+        :param member: The member, as in the ``users`` of :meth:`PushoverAPI.group_info`
+        :type member: dict
+        """
+        self.members.setdefault(member["user"], {})[member.get("device", "")] = MappingProxyType(member)
+        self._view = None
+
+    def changed(self):
+        """Note that the group was changed, so its view must be rebuilt."""
+        self._view = None
+
+    def member(self, user, device=None):
+        """
+        Look up a membership of the group.
+
+        :param user: The user key
+        :param device: (optional) The device name, or ``""`` for all of the user's devices. Any device if omitted.
+        :type user: str
+        :type device: str
+
+        :returns: The member, or ``None`` if the user isn't a member on that device
+        :rtype: types.MappingProxyType
+        """
+        devices = self.members.get(user)
+        if not devices:
+            return None
+        if device is None:
+            return next(iter(devices.values()))
+        return devices.get(device)
+
+    def view(self):
+        """
+        Get a read-only view of the group's information, with its members as a tuple.
+
+        :rtype: types.MappingProxyType
+        """
+        if self._view is None:
+            users = tuple(member for devices in self.members.values() for member in devices.values())
+            self._view = MappingProxyType(dict(self.info, users=users))
+        return self._view
+
+
+class GroupCache:
+    """
+    Cache the information about delivery groups, applying changes made through the cache to the cached copy.
+
+    :meth:`GroupCache.get` fetches a group with :meth:`PushoverAPI.group_info` the first time it is asked for, and
+    again once the cached copy is ``refresh_interval`` seconds old. It returns a read-only view of the cached copy,
+    which is cheap even for groups with thousands of members; :meth:`GroupCache.member` looks up a single membership
+    without going through the members at all.
+    Make changes to a group with the methods of the cache (e.g. :meth:`GroupCache.add_user` instead of
+    :meth:`PushoverAPI.group_add_user`): each change is applied to the cached copy once the Pushover API has accepted
+    it, so the group doesn't need to be fetched again. Changes made in other ways are only seen after the next refresh,
+    so call :meth:`GroupCache.invalidate` if you know of any.
+
+    The cache is safe to use from multiple threads.
+
+    :param api: The :class:`PushoverAPI` used to fetch and change groups
+    :param refresh_interval: How long, in seconds, a group is cached before it is fetched again. Never fetched again
+        if ``None``.
+    :type api: PushoverAPI
+    :type refresh_interval: float
+    """
+
+    def __init__(self, api, refresh_interval=300.0):
+        self.api = api
+        self.refresh_interval = refresh_interval
+
+        self._groups = {}
+        # the number of changes made to each group, to catch changes racing a refresh
+        self._changes = {}
+        self._lock = threading.Lock()
+
+    def get(self, group_key, now=None):
+        """
+        Get information about a group, fetching it if it isn't cached or is due to be refreshed.
+
+        :param group_key: A Pushover group key
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type group_key: str
+        :type now: float
+
+        :returns: A read-only view of the group's information, as returned by :meth:`PushoverAPI.group_info` but with
+            ``users`` as a tuple
+        :rtype: types.MappingProxyType
+        :raises BadAPIRequestError: Raised when the group has to be fetched and the Pushover API responds with an
+            error.
+        """
+        group = self._group(group_key, now)
+        with self._lock:
+            return group.view()
+
+    def member(self, group_key, user, device=None, now=None):
+        """
+        Look up a user's membership of a group, fetching the group if it isn't cached or is due to be refreshed.
+
+        :param group_key: A Pushover group key
+        :param user: The user key
+        :param device: (optional) The device name, or ``""`` for a membership covering all of the user's devices. Any
+            of the user's memberships if omitted.
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type group_key: str
+        :type user: str
+        :type device: str
+        :type now: float
+
+        :returns: A read-only view of the membership, as in the ``users`` of :meth:`PushoverAPI.group_info`, or
+            ``None`` if the user isn't a member
+        :rtype: types.MappingProxyType
+        :raises BadAPIRequestError: Raised when the group has to be fetched and the Pushover API responds with an
+            error.
+        """
+        group = self._group(group_key, now)
+        with self._lock:
+            return group.member(user, device)
+
+    def _group(self, group_key, now=None):
+        """
+        Get a cached group, fetching it if it isn't cached or is due to be refreshed.
+
+        :param group_key: A Pushover group key
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type group_key: str
+        :type now: float
+
+        :rtype: _CachedGroup
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            group = self._groups.get(group_key)
+            fresh = group is not None and group.fetched_at is not None
+            if fresh and (self.refresh_interval is None or now - group.fetched_at < self.refresh_interval):
+                return group
+        return self._fetch(group_key, now)
+
+    def refresh(self, group_key, now=None):
+        """
+        Fetch a group, replacing any cached copy.
+
+        :param group_key: A Pushover group key
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type group_key: str
+        :type now: float
+
+        :returns: A read-only view of the group's information. See :meth:`GroupCache.get`.
+        :rtype: types.MappingProxyType
+        :raises BadAPIRequestError: Raised when the Pushover API responds with an error.
+        """
+        group = self._fetch(group_key, now)
+        with self._lock:
+            return group.view()
+
+    def _fetch(self, group_key, now=None):
+        """
+        Fetch a group, replacing any cached copy.
+
+        :param group_key: A Pushover group key
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type group_key: str
+        :type now: float
+
+        :rtype: _CachedGroup
+        :raises BadAPIRequestError: Raised when the Pushover API responds with an error.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            changes = self._changes.get(group_key, 0)
+        info = self.api.group_info(group_key)
+        if isinstance(info, GroupInfo):
+            info = info.as_dict()
+        group = _CachedGroup(info, None)
+        with self._lock:
+            # a change made while the group was being fetched may or may not be included, so don't trust it for long
+            if self._changes.get(group_key, 0) == changes:
+                group.fetched_at = now
+            self._groups[group_key] = group
+        return group
+
+    def invalidate(self, group_key=None):
+        """
+        Forget a cached group, so that it is fetched again when next needed.
+
+        :param group_key: (optional) The group to forget. Every group is forgotten if omitted.
+        :type group_key: str
+        """
+        with self._lock:
+            if group_key is None:
+                self._groups.clear()
+            else:
+                self._groups.pop(group_key, None)
+
+    def _update(self, group_key, change):
+        """
+        Apply a change accepted by the Pushover API to a cached group.
+
+        :param group_key: The group that was changed
+        :param change: A callable changing the cached group in place
+        :type group_key: str
+        :type change: callable
+        """
+        with self._lock:
+            self._changes[group_key] = self._changes.get(group_key, 0) + 1
+            group = self._groups.get(group_key)
+            if group is not None:
+                change(group)
+                group.changed()
+
+    def add_user(self, group_key, user, device=None, memo=None):
+        """
+        Add a user to a group. See :meth:`PushoverAPI.group_add_user`.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to be added to the group
+        :param device: A string representing the device name to add to the group
+        :param memo: A memo to store with the user's group membership (max 200 characters)
+        :type group_key: str
+        :type user: str
+        :type device: str
+        :type memo: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        resp = self.api.group_add_user(group_key, user, device, memo)
+        member = {"user": user, "device": device or "", "memo": memo or "", "disabled": False}
+        self._update(group_key, lambda group: group.set_member(member))
+        return resp
+
+    def delete_user(self, group_key, user):
+        """
+        Remove a user from a group. See :meth:`PushoverAPI.group_delete_user`.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to remove from the group
+        :type group_key: str
+        :type user: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        resp = self.api.group_delete_user(group_key, user)
+
+        self._update(group_key, lambda group: group.members.pop(user, None))
+        return resp
+
+    def _set_disabled(self, group_key, user, disabled):
+        """
+        Mark a user's memberships of a cached group as disabled or enabled.
+
+        :param group_key: The group that was changed
+        :param user: The user key that was disabled or enabled
+        :param disabled: Whether the user was disabled
+        :type group_key: str
+        :type user: str
+        :type disabled: bool
+        """
+
+        def set_disabled(group):
+            """Update every device of the user in the cached group."""
+            for member in list(group.members.get(user, {}).values()):
+                group.set_member(dict(member, disabled=disabled))
+
+        self._update(group_key, set_disabled)
+
+    def disable_user(self, group_key, user):
+        """
+        Temporarily disable a user in a group. See :meth:`PushoverAPI.group_disable_user`.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to disable
+        :type group_key: str
+        :type user: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        resp = self.api.group_disable_user(group_key, user)
+        self._set_disabled(group_key, user, disabled=True)
+        return resp
+
+    def enable_user(self, group_key, user):
+        """
+        Re-enable a user in a group. See :meth:`PushoverAPI.group_enable_user`.
+
+        :param group_key: A Pushover group key
+        :param user: The user key to enable
+        :type group_key: str
+        :type user: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        resp = self.api.group_enable_user(group_key, user)
+        self._set_disabled(group_key, user, disabled=False)
+        return resp
+
+    def reconcile(self, group_key, members, disabled=(), max_workers=None):
+        """
+        Change a group's membership to match the desired membership. See :meth:`PushoverAPI.reconcile_group`.
+
+        The changes are planned against the cached group, fetched if needed, and applied to it as they succeed.
+
+        :param group_key: A Pushover group key
+        :param members: The user keys that should be enabled members of the group
+        :param disabled: The user keys that should be disabled members of the group
+        :param max_workers: The maximum number of users to change at once
+        :type group_key: str
+        :type members: iterable
+        :type disabled: iterable
+        :type max_workers: int
+
+        :returns: The changes made for each user that needed changing, in order of user key
+        :rtype: list[GroupChange]
+        :raises ValueError: Raised when a user is in both ``members`` and ``disabled``.
+        """
+        plan = plan_group_changes(self.get(group_key), members, disabled)
+        operations = {
+            ADD: self.add_user,
+            DELETE: self.delete_user,
+            DISABLE: self.disable_user,
+            ENABLE: self.enable_user,
+        }
+        return _apply_group_changes(group_key, plan, operations, max_workers)
+
+    def rename(self, group_key, new_name):
+        """
+        Change the name of a group. See :meth:`PushoverAPI.group_rename`.
+
+        :param group_key: A Pushover group key
+        :param new_name: The new name for the group
+        :type group_key: str
+        :type new_name: str
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        resp = self.api.group_rename(group_key, new_name)
+        self._update(group_key, lambda group: group.info.update(name=new_name))
+        return resp
@@ -0,0 +1,138 @@
+"""Shrinking of images to fit the size limit on attachments."""
+
+from io import BytesIO
+from pathlib import PurePath
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover -- Pillow is an optional dependency
+    Image = None  # type: ignore[assignment]
+
+from .validation import MAX_ATTACHMENT_SIZE
+
+
+class ImageShrinker:
+    """
+    Downscale and recompress images that are larger than the Pushover API accepts, before they are uploaded.
+
+    Requires `Pillow <https://python-pillow.org>`_, installed with the ``images`` extra.
+
+    An image that is already within ``max_bytes`` (and ``max_dimension``) is left as it is, as is a file that isn't an
+    image Pillow can read. Otherwise, an image is shrunk to
+    ``max_dimension`` and re-encoded in its own format if that is lossy (e.g. JPEG or WebP), or as an optimized PNG. If
+    that is still too large, it is re-encoded as a JPEG at decreasing quality, down to ``min_quality``, and then
+    repeatedly downscaled until it fits.
+
+    Shrinking an image is expensive, so use an :class:`ImageShrinker` as the ``transform`` of an
+    :class:`AttachmentCache`, which keeps the shrunk images for messages sent afterwards::
+
+        api = PushoverAPI(token, attachment_cache=AttachmentCache(transform=ImageShrinker()))
+
+    The cache only handles images given to :meth:`PushoverAPI.send_message` as paths. An image given as bytes, a buffer
+    or a file-like object isn't shrunk; call the :class:`ImageShrinker` on it before sending it instead.
+
+    :param max_bytes: The maximum size of an image, in bytes
+    :param max_dimension: (optional) The maximum width and height of an image, in pixels
+    :param quality: The JPEG quality used when an image is first converted to JPEG
+    :param min_quality: The lowest JPEG quality used before resorting to downscaling
+    :type max_bytes: int
+    :type max_dimension: int
+    :type quality: int
+    :type min_quality: int
+    """
+
+    #: The formats that are re-encoded in their own format instead of as a PNG
+    LOSSY_FORMATS = ("JPEG", "WEBP")
+    #: The factor by which an image's dimensions are scaled for each downscaling step
+    SCALE_STEP = 0.75
+
+    def __init__(self, max_bytes=MAX_ATTACHMENT_SIZE, max_dimension=None, quality=85, min_quality=40):
+        if Image is None:  # pragma: no cover -- Pillow is an optional dependency
+            msg = "ImageShrinker requires Pillow. Install it with `pip install pushover_complete[images]`."
+            raise ImportError(msg)
+        self.max_bytes = max_bytes
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.min_quality = min_quality
+
+    def __call__(self, filename, contents):
+        """
+        Shrink an image if it is too large.
+
+        :param filename: The name of the image file
+        :param contents: The contents of the image file
+        :type filename: str
+        :type contents: bytes
+
+        :returns: The ``(filename, contents)`` of the image to upload. The filename's extension is changed if the image
+            is converted to another format.
+        :rtype: tuple(str, bytes)
+        """
+        # nothing to shrink, so don't spend time decoding it
+        if len(contents) <= self.max_bytes and self.max_dimension is None:
+            return filename, contents
+        try:
+            original = Image.open(BytesIO(contents))
+        except Image.UnidentifiedImageError:
+            # not an image, so leave it for the Pushover API to accept or reject
+            return filename, contents
+        with original:
+            if len(contents) <= self.max_bytes and not self._too_wide(original):
+                return filename, contents
+            image_format = original.format
+            image = original.copy()
+
+        if self._too_wide(image):
+            image.thumbnail((self.max_dimension, self.max_dimension))
+        if image_format in self.LOSSY_FORMATS:
+            encoded = self._encode(image, image_format, quality=self.quality)
+        else:
+            image_format = "PNG"
+            encoded = self._encode(image, image_format, optimize=True)
+
+        quality = self.quality
+        while len(encoded) > self.max_bytes:
+            if image_format != "JPEG":
+                image = image.convert("RGB")
+                image_format = "JPEG"
+            elif quality > self.min_quality:
+                quality = max(self.min_quality, quality - 10)
+            else:
+                width, height = image.size
+                if width <= 1 and height <= 1:
+                    break
+                new_size = (max(1, int(width * self.SCALE_STEP)), max(1, int(height * self.SCALE_STEP)))
+                image = image.resize(new_size, Image.LANCZOS)
+            encoded = self._encode(image, image_format, quality=quality)
+
+        extension = ".jpg" if image_format == "JPEG" else f".{image_format.lower()}"
+        return str(PurePath(filename).with_suffix(extension)), encoded
+
+    def _too_wide(self, image):
+        """
+        Check whether an image is larger than ``max_dimension``.
+
+        :param image: The image
+        :type image: PIL.Image.Image
+
+        :rtype: bool
+        """
+        return self.max_dimension is not None and max(image.size) > self.max_dimension
+
+    @staticmethod
+    def _encode(image, image_format, **options):
+        """
+        Encode an image.
+
+        :param image: The image
+        :param image_format: The format to encode the image in, as understood by Pillow
+        :param options: Options for the format's encoder
+        :type image: PIL.Image.Image
+        :type image_format: str
+
+        :returns: The encoded image
+        :rtype: bytes
+        """
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, **options)
+        return buffer.getvalue()
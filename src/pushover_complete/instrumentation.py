@@ -0,0 +1,328 @@
+"""Hooks reporting the requests made to the Pushover API, with adapters for Prometheus and OpenTelemetry."""
+
+from collections import namedtuple
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover -- prometheus_client is an optional dependency
+    prometheus_client = None  # type: ignore[assignment]
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # pragma: no cover -- opentelemetry-api is an optional dependency
+    otel_metrics = None  # type: ignore[assignment]
+
+
+class RequestMetrics(
+    namedtuple(  # noqa: PYI024 -- documented below
+        "RequestMetrics",
+        ["endpoint", "method", "duration", "status_code", "bytes_sent", "bytes_received", "headers", "error"],
+    )
+):
+    """
+    The measurements of a single attempt at a request to the Pushover API.
+
+    .. attribute:: endpoint
+
+        The endpoint requested, before any parameter is filled in, e.g. ``"receipts/{}.json"``, so that it can be used
+        to group measurements
+
+    .. attribute:: method
+
+        The HTTP method, e.g. ``"POST"``
+
+    .. attribute:: duration
+
+        The time from sending the request to receiving the whole response, in seconds
+
+    .. attribute:: status_code
+
+        The HTTP status code of the response, or ``None`` if no response was received
+
+    .. attribute:: bytes_sent
+
+        The size of the request body, including any attachment, in bytes, or ``None`` if no response was received
+
+    .. attribute:: bytes_received
+
+        The size of the response body, in bytes
+
+    .. attribute:: headers
+
+        The headers of the response, or ``None`` if no response was received
+
+    .. attribute:: error
+
+        The exception raised if no response was received, e.g. a connection error, or ``None``
+    """
+
+    __slots__ = ()
+
+
+class Instrumentation:
+    """
+    Receive measurements of the requests made by :class:`PushoverAPI` or :class:`AsyncPushoverAPI`.
+
+    Give an :class:`Instrumentation` to the API instance as its ``instrumentation`` to have its methods called from
+    the thread (or event loop) making each request. Every method does nothing, so subclasses only need to override the
+    ones they are interested in. The methods are called in the middle of sending messages, so they should be quick.
+
+    When an API instance has no instrumentation, no measurements are taken at all.
+    """
+
+    def request_finished(self, metrics):
+        """
+        Receive the measurements of an attempt at a request, whether or not a response was received.
+
+        Retried requests call this once per attempt. Responses reporting an error, e.g. an invalid user, are included,
+        with their status code.
+
+        :param metrics: The measurements of the attempt
+        :type metrics: RequestMetrics
+        """
+
+    def request_retried(self, endpoint, method, attempt, delay):
+        """
+        Receive notice that a request is about to be retried by the API instance's :class:`RetryPolicy`.
+
+        :param endpoint: The endpoint requested, before any parameter is filled in
+        :param method: The HTTP method
+        :param attempt: The number of the attempt that failed, starting at 1
+        :param delay: How long, in seconds, the request will wait before being retried
+        :type endpoint: str
+        :type method: str
+        :type attempt: int
+        :type delay: float
+        """
+
+    def quota_updated(self, rate_limit):
+        """
+        Receive the application's message quota, whenever the Pushover API reports it.
+
+        :param rate_limit: The application's message quota
+        :type rate_limit: RateLimit
+        """
+
+
+def _status(metrics):
+    """
+    Describe the outcome of a request for use as a label: its status code, or the name of the error it raised.
+
+    :param metrics: The measurements of the request
+    :type metrics: RequestMetrics
+
+    :rtype: str
+    """
+    return type(metrics.error).__name__ if metrics.status_code is None else str(metrics.status_code)
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Record the requests made to the Pushover API as Prometheus metrics.
+
+    Requires `prometheus_client <https://github.com/prometheus/client_python>`_, installed with the ``prometheus``
+    extra. The metrics are labelled with the endpoint and HTTP method of each request and are named, with the default
+    ``namespace``:
+
+    - ``pushover_request_duration_seconds``: a histogram of the duration of each attempt at a request
+    - ``pushover_requests_total``: the number of attempts, also labelled with their status code or the name of the
+      error raised if there was no response
+    - ``pushover_request_bytes_sent_total`` and ``pushover_response_bytes_received_total``: the size of the request and
+      response bodies
+    - ``pushover_retries_total``: the number of retries
+    - ``pushover_quota_limit``, ``pushover_quota_remaining`` and ``pushover_quota_reset_timestamp_seconds``: the
+      application's message quota, without labels
+
+    :param registry: (optional) The registry to register the metrics with. Defaults to the global registry.
+    :param namespace: The prefix of the names of the metrics
+    :param buckets: (optional) The upper bounds of the buckets of the duration histogram, in seconds
+    :type registry: prometheus_client.CollectorRegistry
+    :type namespace: str
+    :type buckets: sequence[float]
+    """
+
+    def __init__(self, registry=None, namespace="pushover", buckets=None):
+        if prometheus_client is None:  # pragma: no cover -- prometheus_client is an optional dependency
+            msg = (
+                "PrometheusInstrumentation requires prometheus_client. "
+                "Install it with `pip install pushover_complete[prometheus]`."
+            )
+            raise ImportError(msg)
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        options = {"namespace": namespace, "registry": registry}
+        labels = ["endpoint", "method"]
+        histogram_options = options if buckets is None else {**options, "buckets": buckets}
+
+        self.request_duration = prometheus_client.Histogram(
+            "request_duration_seconds", "Duration of requests to the Pushover API", labels, **histogram_options
+        )
+        self.requests = prometheus_client.Counter(
+            "requests", "Requests to the Pushover API by status code or error", [*labels, "status"], **options
+        )
+        self.bytes_sent = prometheus_client.Counter(
+            "request_bytes_sent", "Size of the bodies of requests to the Pushover API", labels, **options
+        )
+        self.bytes_received = prometheus_client.Counter(
+            "response_bytes_received", "Size of the bodies of responses from the Pushover API", labels, **options
+        )
+        self.retries = prometheus_client.Counter("retries", "Requests to the Pushover API retried", labels, **options)
+        self.quota_limit = prometheus_client.Gauge("quota_limit", "Monthly message quota", **options)
+        self.quota_remaining = prometheus_client.Gauge("quota_remaining", "Messages left in the quota", **options)
+        self.quota_reset = prometheus_client.Gauge(
+            "quota_reset_timestamp_seconds", "Unix timestamp when the quota resets", **options
+        )
+
+    def request_finished(self, metrics):
+        """
+        Record an attempt at a request.
+
+        :param metrics: The measurements of the attempt
+        :type metrics: RequestMetrics
+        """
+        self.request_duration.labels(metrics.endpoint, metrics.method).observe(metrics.duration)
+        self.requests.labels(metrics.endpoint, metrics.method, _status(metrics)).inc()
+        if metrics.bytes_sent:
+            self.bytes_sent.labels(metrics.endpoint, metrics.method).inc(metrics.bytes_sent)
+        if metrics.bytes_received:
+            self.bytes_received.labels(metrics.endpoint, metrics.method).inc(metrics.bytes_received)
+
+    def request_retried(self, endpoint, method, attempt, delay):  # noqa: ARG002 -- only the count is recorded
+        """
+        Record a retry.
+
+        :param endpoint: The endpoint requested
+        :param method: The HTTP method
+        :param attempt: The number of the attempt that failed
+        :param delay: How long the request will wait before being retried
+        :type endpoint: str
+        :type method: str
+        :type attempt: int
+        :type delay: float
+        """
+        self.retries.labels(endpoint, method).inc()
+
+    def quota_updated(self, rate_limit):
+        """
+        Record the application's message quota.
+
+        :param rate_limit: The application's message quota
+        :type rate_limit: RateLimit
+        """
+        self.quota_limit.set(rate_limit.limit)
+        self.quota_remaining.set(rate_limit.remaining)
+        self.quota_reset.set(rate_limit.reset)
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Record the requests made to the Pushover API as OpenTelemetry metrics.
+
+    Requires the `OpenTelemetry API <https://opentelemetry.io/docs/languages/python/>`_, installed with the
+    ``opentelemetry`` extra, and an SDK configured by the application to export the metrics. The metrics carry the
+    ``endpoint`` and ``http.request.method`` of each request as attributes and are named:
+
+    - ``pushover.request.duration``: a histogram of the duration of each attempt at a request, in seconds
+    - ``pushover.requests``: the number of attempts, with their ``http.response.status_code`` or the ``error.type``
+      raised if there was no response
+    - ``pushover.request.body.size`` and ``pushover.response.body.size``: the size of the request and response bodies,
+      in bytes
+    - ``pushover.retries``: the number of retries
+    - ``pushover.quota.limit``, ``pushover.quota.remaining`` and ``pushover.quota.reset``: the application's message
+      quota, observed when the metrics are collected
+
+    :param meter_provider: (optional) The meter provider to create the metrics with. Defaults to the global one.
+    :type meter_provider: opentelemetry.metrics.MeterProvider
+    """
+
+    def __init__(self, meter_provider=None):
+        if otel_metrics is None:  # pragma: no cover -- opentelemetry-api is an optional dependency
+            msg = (
+                "OpenTelemetryInstrumentation requires opentelemetry-api. "
+                "Install it with `pip install pushover_complete[opentelemetry]`."
+            )
+            raise ImportError(msg)
+        meter = otel_metrics.get_meter("pushover_complete", meter_provider=meter_provider)
+        self.rate_limit = None
+
+        self.request_duration = meter.create_histogram(
+            "pushover.request.duration", unit="s", description="Duration of requests to the Pushover API"
+        )
+        self.requests = meter.create_counter("pushover.requests", description="Requests to the Pushover API")
+        self.bytes_sent = meter.create_counter(
+            "pushover.request.body.size", unit="By", description="Size of the bodies of requests to the Pushover API"
+        )
+        self.bytes_received = meter.create_counter(
+            "pushover.response.body.size",
+            unit="By",
+            description="Size of the bodies of responses from the Pushover API",
+        )
+        self.retries = meter.create_counter("pushover.retries", description="Requests to the Pushover API retried")
+        for field, description in (
+            ("limit", "Monthly message quota"),
+            ("remaining", "Messages left in the quota"),
+            ("reset", "Unix timestamp when the quota resets"),
+        ):
+            meter.create_observable_gauge(
+                f"pushover.quota.{field}", callbacks=[self._observe_quota(field)], description=description
+            )
+
+    def _observe_quota(self, field):
+        """
+        Make a callback observing one field of the last reported quota.
+
+        :param field: The field of :class:`RateLimit` to observe
+        :type field: str
+
+        :rtype: callable
+        """
+
+        def observe(options):  # noqa: ARG001 -- required by the callback signature
+            """Report the quota field from the latest rate limit seen, if any."""
+            if self.rate_limit is None:
+                return []
+            return [otel_metrics.Observation(getattr(self.rate_limit, field))]
+
+        return observe
+
+    def request_finished(self, metrics):
+        """
+        Record an attempt at a request.
+
+        :param metrics: The measurements of the attempt
+        :type metrics: RequestMetrics
+        """
+        attributes = {"endpoint": metrics.endpoint, "http.request.method": metrics.method}
+        self.request_duration.record(metrics.duration, attributes)
+        if metrics.status_code is None:
+            self.requests.add(1, {**attributes, "error.type": type(metrics.error).__name__})
+        else:
+            self.requests.add(1, {**attributes, "http.response.status_code": metrics.status_code})
+        if metrics.bytes_sent:
+            self.bytes_sent.add(metrics.bytes_sent, attributes)
+        if metrics.bytes_received:
+            self.bytes_received.add(metrics.bytes_received, attributes)
+
+    def request_retried(self, endpoint, method, attempt, delay):  # noqa: ARG002 -- only the count is recorded
+        """
+        Record a retry.
+
+        :param endpoint: The endpoint requested
+        :param method: The HTTP method
+        :param attempt: The number of the attempt that failed
+        :param delay: How long the request will wait before being retried
+        :type endpoint: str
+        :type method: str
+        :type attempt: int
+        :type delay: float
+        """
+        self.retries.add(1, {"endpoint": endpoint, "http.request.method": method})
+
+    def quota_updated(self, rate_limit):
+        """
+        Record the application's message quota, to be observed when the metrics are next collected.
+
+        :param rate_limit: The application's message quota
+        :type rate_limit: RateLimit
+        """
+        self.rate_limit = rate_limit
@@ -0,0 +1,276 @@
+"""A durable, SQLite-backed queue of messages waiting to be sent."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from ._concurrency import map_concurrently
+from .error import BadAPIRequestError, MessageValidationError, QuotaExceededError
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    failed INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (failed, next_attempt_at);
+"""
+
+
+class Outbox:
+    """
+    A durable queue of messages, stored in an SQLite database, that are sent in the background.
+
+    :meth:`Outbox.enqueue` only writes the message to the database, so it is cheap enough to call from latency-sensitive
+    code.
+    Messages are sent by :meth:`Outbox.drain`, either called directly or by the worker thread started with
+    :meth:`Outbox.start` (or by using the outbox as a context manager).
+    A message is removed from the database only once it has been sent, so messages survive process restarts and outages
+    of the Pushover API. This means a message may be sent twice if the process dies mid-send.
+
+    Sending a message that fails for a transient reason (see :class:`RetryPolicy`) is retried later with backoff until
+    the ``retry`` policy gives up; it is then marked as failed and kept in the database, along with the error, for
+    inspection with :meth:`Outbox.failed`. Messages rejected as invalid by the Pushover API, or by the API instance's
+    :class:`MessageValidator`, are marked as failed immediately.
+    If the worker thread can't drain the outbox at all, e.g. because the database is locked by another process, the
+    error is logged to the ``pushover_complete.outbox`` logger and the worker tries again after backing off according
+    to the ``retry`` policy.
+
+    :param api: The :class:`PushoverAPI` used to send messages. Give it a large enough ``pool_maxsize`` for
+        ``max_workers``.
+    :param path: The path of the SQLite database file. Created if it doesn't exist.
+    :param retry: (optional) The :class:`RetryPolicy` deciding when and how often failed messages are retried. Defaults
+        to 10 attempts with backoff from 1 second up to 5 minutes.
+    :param max_workers: The maximum number of messages to send at once
+    :param batch_size: The maximum number of messages read from the database at a time
+    :param poll_interval: How often, in seconds, the worker thread checks for messages that are due to be retried
+    :type api: PushoverAPI
+    :type path: str or pathlib.Path
+    :type retry: RetryPolicy
+    :type max_workers: int
+    :type batch_size: int
+    :type poll_interval: float
+    """
+
+    def __init__(self, api, path, retry=None, max_workers=None, batch_size=100, poll_interval=1.0):
+        self.api = api
+        self.retry = RetryPolicy(max_attempts=10, backoff_base=1.0, backoff_max=300.0) if retry is None else retry
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        # write-ahead logging without a sync on every commit keeps enqueueing fast while still surviving a crash
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._worker = None
+
+    def __enter__(self):
+        """Enter the context manager, starting the worker thread."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, stopping the worker thread and closing the database."""
+        self.close()
+
+    def enqueue(self, user, message, **kwargs):
+        """
+        Add a message to the outbox.
+
+        :param user: A Pushover user token representing the user or group to whom the message will be sent
+        :param message: The message to be sent
+        :param kwargs: Any other parameters of :meth:`PushoverAPI.send_message`. An ``image`` must be given as a path,
+            which is read when the message is sent.
+        :type user: str
+        :type message: str
+
+        :returns: The id of the queued message
+        :rtype: int
+        :raises TypeError: Raised when ``image`` is not a path.
+        """
+        image = kwargs.get("image")
+        if image is not None:
+            if not isinstance(image, (str, Path)):
+                msg = "only images given as paths can be stored in an Outbox"
+                raise TypeError(msg)
+            kwargs["image"] = str(image)
+        record = json.dumps(dict(kwargs, user=user, message=message))
+
+        with self._db_lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (message, next_attempt_at) VALUES (?, ?)",
+                (record, time.time()),
+            )
+        self._wake.set()
+        return cursor.lastrowid
+
+    def pending(self):
+        """
+        Count the messages waiting to be sent, including those waiting to be retried.
+
+        :rtype: int
+        """
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE failed = 0").fetchone()[0]
+
+    def failed(self):
+        """
+        List the messages that could not be sent.
+
+        :returns: ``(id, message, error)`` tuples, where ``message`` is a dict of the parameters given to
+            :meth:`Outbox.enqueue` and ``error`` describes the last failure
+        :rtype: list[tuple(int, dict, str)]
+        """
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT id, message, last_error FROM outbox WHERE failed = 1 ORDER BY id"
+            ).fetchall()
+        return [(row_id, json.loads(message), error) for row_id, message, error in rows]
+
+    def drain(self, now=None):
+        """
+        Send every message that is due, in batches. Each message is attempted at most once per call.
+
+        :param now: The current Unix time, deciding which messages waiting to be retried are due. Defaults to
+            :func:`time.time`.
+        :type now: float
+
+        :returns: The number of messages sent successfully
+        :rtype: int
+        """
+        if now is None:
+            now = time.time()
+        sent = 0
+        last_id = 0
+        while True:
+            with self._db_lock:
+                rows = self._db.execute(
+                    "SELECT id, message, attempts FROM outbox WHERE failed = 0 AND next_attempt_at <= ? AND id > ? "
+                    "ORDER BY id LIMIT ?",
+                    (now, last_id, self.batch_size),
+                ).fetchall()
+            if not rows:
+                return sent
+            last_id = rows[-1][0]
+
+            results = map_concurrently(
+                lambda row: self.api._send_message(**json.loads(row[1])),  # noqa: SLF001 -- meant to be used this way
+                rows,
+                max_workers=self.max_workers,
+                return_exceptions=True,
+            )
+            with self._db_lock:
+                for (row_id, _, attempts), result in zip(rows, results):
+                    if isinstance(result, Exception):
+                        self._record_failure(row_id, attempts, result, now)
+                    else:
+                        self._db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+                        sent += 1
+
+    def _record_failure(self, row_id, attempts, error, now):
+        """
+        Reschedule or give up on a message that could not be sent. Must be called with the database lock held.
+
+        :param row_id: The id of the message
+        :param attempts: The number of attempts to send the message before this one
+        :param error: The exception raised while sending the message
+        :param now: The current Unix time
+        :type row_id: int
+        :type attempts: int
+        :type error: Exception
+        :type now: float
+        """
+        retry_at = None
+        if isinstance(error, QuotaExceededError):
+            retry_at = error.retry_at
+            if retry_at is None and self.api.rate_limit is not None:
+                retry_at = self.api.rate_limit.reset
+        if retry_at is not None:
+            # not the message's fault, so try again once the throttle allows it without counting this attempt
+            self._db.execute(
+                "UPDATE outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (retry_at, repr(error), row_id),
+            )
+            return
+
+        attempt = attempts + 1
+        if isinstance(error, MessageValidationError):
+            # rejected before it was sent, so it would be rejected again
+            retry = False
+        elif isinstance(error, BadAPIRequestError):
+            retry = self.retry.should_retry(attempt, error.status_code)
+        else:
+            # connection problems may clear up, anything else (e.g. a missing image file) won't
+            retry = isinstance(error, requests.RequestException) and self.retry.should_retry(attempt)
+
+        if retry:
+            self._db.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempt, now + self.retry.delay(attempt), repr(error), row_id),
+            )
+        else:
+            self._db.execute(
+                "UPDATE outbox SET attempts = ?, failed = 1, last_error = ? WHERE id = ?",
+                (attempt, repr(error), row_id),
+            )
+
+    def start(self):
+        """Start the worker thread that sends messages as they are enqueued. Does nothing if it is already running."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, name="pushover_complete-outbox", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the worker thread after it finishes its current batch. Unsent messages remain in the outbox.
+
+        :param timeout: (optional) The maximum number of seconds to wait for the worker thread to finish
+        :type timeout: float
+        """
+        self._stopping.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def close(self):
+        """Stop the worker thread and close the database."""
+        self.stop()
+        with self._db_lock:
+            self._db.close()
+
+    def _run(self):
+        """Send messages until stopped. The body of the worker thread."""
+        failures = 0
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception:
+                # e.g. the database is locked by another process; dying here would silently stop every delivery
+                failures += 1
+                delay = self.retry.delay(failures)
+                logger.exception("Failed to drain the outbox, trying again in %.1f seconds", delay)
+                self._stopping.wait(delay)
+                continue
+            failures = 0
+            self._wake.wait(self.poll_interval)
@@ -1,15 +1,57 @@
 """The PushoverAPI class, containing the main functionality of the pushover_complete package."""
 
+import mmap
+import threading
+import time
 from pathlib import Path
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
+from ._checkpoint import Checkpoint
+from ._concurrency import iter_as_completed, map_concurrently
+from ._json import loads
+from .dispatcher import Dispatcher
 from .error import BadAPIRequestError
+from .groups import ADD, DELETE, DISABLE, ENABLE, _apply_group_changes, plan_group_changes
+from .instrumentation import RequestMetrics
+from .rate_limit import RateLimit
+from .response_cache import SOUNDS, VALIDATE
+from .results import GroupInfo, MessageResult, ReceiptStatus, ValidationResult
+from .retry import IDEMPOTENT_METHODS
 
 PUSHOVER_API_URL = "https://api.pushover.net/1/"
 
 
+def _file_object(value):
+    """
+    Get the file-like object out of a value of the ``files`` argument of :meth:`requests.Session.request`.
+
+    :param value: A file-like object or a tuple of ``('filename', file-like[, ...])``
+
+    :returns: The file-like object
+    """
+    return value[1] if isinstance(value, tuple) else value
+
+
+def _not_sent(error):
+    """
+    Check whether a request failed before any of it was sent, so that it can't have taken effect.
+
+    :param error: The exception raised by :mod:`requests`
+    :type error: requests.RequestException
+
+    :rtype: bool
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    # requests wraps the error raised by urllib3, which keeps the underlying error as its reason
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
 class PushoverAPI:
     """
     The object representing an application interacting with the Pushover API.
@@ -17,14 +59,158 @@ class PushoverAPI:
     Instantiated with a Pushover application token.
     All API calls made via that instance will use the provided application token.
 
+    Every API call made via that instance also shares one :class:`requests.Session`, so connections to the Pushover
+    servers are kept alive and reused between calls instead of being re-established each time.
+    Use the instance as a context manager or call :meth:`PushoverAPI.close` when finished to release the connections.
+
     :param token: A Pushover application token
+    :param session: (optional) A :class:`requests.Session` to use for sending HTTP requests. If omitted, one is created
+        (on first use) and owned by this instance.
+    :param pool_connections: The number of per-host connection pools to cache in a session created by this instance
+    :param pool_maxsize: The maximum number of connections to keep alive to each host in a session created by this
+        instance. Should be at least the number of threads making calls through the instance at once.
+    :param pool_block: Whether to wait for a free connection instead of opening a new, throwaway one when all
+        ``pool_maxsize`` connections to a host are in use
+    :param throttle: (optional) A :class:`QuotaThrottle` consulted before every message is sent, to spread out messages
+        or refuse to send them before the application's monthly quota runs out
+    :param retry: (optional) A :class:`RetryPolicy` for retrying requests that fail for transient reasons. Requests are
+        not retried if omitted.
+    :param attachment_cache: (optional) An :class:`AttachmentCache` keeping images given as paths in memory, so an
+        image attached to many messages is only read from disk once
+    :param response_cache: (optional) A :class:`ResponseCache` answering repeated calls to
+        :meth:`PushoverAPI.get_sounds` and :meth:`PushoverAPI.validate` without a request
+    :param compact_results: If true, sent messages, :meth:`PushoverAPI.check_receipt`, :meth:`PushoverAPI.group_info`
+        and :meth:`PushoverAPI.validate` return a :class:`MessageResult`, :class:`ReceiptStatus`, :class:`GroupInfo` or
+        :class:`ValidationResult` instead of a dict. These keep the raw response body and a few attributes, which takes
+        much less memory than the decoded dict when many responses are kept.
+    :param json_loads: (optional) A callable decoding the raw bytes of a response body from JSON. Defaults to
+        :func:`orjson.loads` if `orjson <https://github.com/ijl/orjson>`_ is installed (with the ``json`` extra), then
+        :func:`ujson.loads` if `ujson <https://github.com/ultrajson/ultrajson>`_ is, and :func:`json.loads` otherwise.
+    :param instrumentation: (optional) An :class:`Instrumentation` receiving the duration, size and outcome of every
+        request, each retry, and the application's message quota, e.g. a :class:`PrometheusInstrumentation`
+    :param api_url: The base URL of the Pushover API, which every endpoint is joined with. Only change it to talk to a
+        stand-in for the Pushover servers, e.g. in tests or benchmarks.
+    :param validator: (optional) A :class:`MessageValidator` checking every message before it is sent, so that messages
+        the Pushover API would reject raise a :class:`MessageValidationError` without a request
+    :param coalescer: (optional) A :class:`MessageCoalescer` holding back duplicates of messages sent recently, and
+        optionally merging them into a single summary sent by :meth:`PushoverAPI.send_coalesced`
     :type token: str
+    :type session: requests.Session
+    :type pool_connections: int
+    :type pool_maxsize: int
+    :type pool_block: bool
+    :type throttle: QuotaThrottle
+    :type retry: RetryPolicy
+    :type attachment_cache: AttachmentCache
+    :type response_cache: ResponseCache
+    :type compact_results: bool
+    :type json_loads: callable
+    :type instrumentation: Instrumentation
+    :type api_url: str
+    :type validator: MessageValidator
+    :type coalescer: MessageCoalescer
+
+    .. attribute:: dispatcher
+
+        The :class:`Dispatcher` used by :meth:`PushoverAPI.submit`. Created with default settings on first use, or
+        assign a :class:`Dispatcher` of your own to configure it.
+
+    .. attribute:: rate_limit
+
+        The application's message quota as a :class:`RateLimit`, updated from the headers of each response to a sent
+        message. ``None`` until the first message is sent or :meth:`PushoverAPI.get_limits` is called.
     """
 
-    def __init__(self, token):
+    def __init__(  # noqa: PLR0913
+        self,
+        token,
+        session=None,
+        *,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=DEFAULT_POOLSIZE,
+        pool_block=DEFAULT_POOLBLOCK,
+        throttle=None,
+        retry=None,
+        attachment_cache=None,
+        response_cache=None,
+        compact_results=False,
+        json_loads=None,
+        instrumentation=None,
+        api_url=PUSHOVER_API_URL,
+        validator=None,
+        coalescer=None,
+    ):
         self.token = token
+        self.api_url = api_url
+        self.throttle = throttle
+        self.retry = retry
+        self.attachment_cache = attachment_cache
+        self.response_cache = response_cache
+        self.compact_results = compact_results
+        self.json_loads = loads if json_loads is None else json_loads
+        self.instrumentation = instrumentation
+        self.validator = validator
+        self.coalescer = coalescer
+        self.rate_limit = None
+        self.dispatcher = None
+        self._dispatcher_lock = threading.Lock()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._owns_session = session is None
+        self._session = session
+        self._session_lock = threading.Lock()
+
+    def __enter__(self):
+        """Enter the context manager, returning this instance."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, closing the underlying session."""
+        self.close()
+
+    @property
+    def session(self):
+        """
+        The :class:`requests.Session` shared by all API calls made via this instance.
 
-    def _generic_get(self, endpoint, url_parameter=None, payload=None, session=None):
+        Created with a connection pool configured by the constructor arguments the first time it is needed.
+
+        :rtype: requests.Session
+        """
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                )
+                session.mount(self.api_url, adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        """
+        Finish sending queued messages and close the underlying :class:`requests.Session`.
+
+        Waits for the messages queued by :meth:`PushoverAPI.submit` to be sent, and sends the summaries of every
+        duplicate held back by the instance's :class:`MessageCoalescer`, then closes the session if it was created by
+        this instance.
+        The instance may still be used afterwards, in which case a new session is created.
+        """
+        with self._dispatcher_lock:
+            dispatcher, self.dispatcher = self.dispatcher, None
+        if dispatcher is not None:
+            dispatcher.shutdown()
+        if self.coalescer is not None:
+            self.send_coalesced(flush=True)
+        with self._session_lock:
+            if self._owns_session and self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _generic_get(self, endpoint, url_parameter=None, payload=None, session=None, result_class=None):
         """
         Make a GET request to the Pushover API.
 
@@ -36,11 +222,15 @@ class PushoverAPI:
         :param payload: A dict of parameters to be appended to the URL, e.g. :code:`{'test-param': False}` would result
             in the URL having :code:`?test-param=false` appended. Do not include the application token in this dict, as
             it is added by the function.
-        :param session: A :class:`requests.Session` object to be used to send HTTP requests.
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to
+            :attr:`PushoverAPI.session`.
+        :param result_class: (optional) The class of the compact result to return if the instance was created with
+            ``compact_results``, e.g. :class:`GroupInfo`
         :type endpoint: str
         :type url_parameter: str
         :type payload: dict
         :type session: requests.Session
+        :type result_class: type
 
         :returns: Response body interpreted as JSON
         :rtype: dict
@@ -50,15 +240,11 @@ class PushoverAPI:
             payload = {}
         payload["token"] = self.token
 
-        get = session.get if session else requests.get
-        resp = get(urljoin(PUSHOVER_API_URL, endpoint.format(url_parameter)), data=payload)
-        resp_body = resp.json()
-        if resp_body.get("status", None) != 1:
-            msg = "{}: {}".format(resp.status_code, ": ".join(resp_body.get("errors")))
-            raise BadAPIRequestError(msg)
-        return resp_body
+        url = urljoin(self.api_url, endpoint.format(url_parameter))
+        resp = self._request("GET", url, session, endpoint=endpoint, data=payload)
+        return self._process_response(resp, result_class)
 
-    def _generic_post(self, endpoint, url_parameter=None, payload=None, session=None, files=None):
+    def _generic_post(self, endpoint, url_parameter=None, payload=None, session=None, files=None, result_class=None):
         """
         Make a POST request to the Pushover API.
 
@@ -75,12 +261,16 @@ class PushoverAPI:
             ``('filename', file-like[, 'content_type'[, custom_headers_dict]])``. The optional 'content_type' string
             describes the file type and custom_headers_dict is a dict-like-object with additional headers describing
             the file.
-        :param session: A :class:`requests.Session` object to be used to send HTTP requests.
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to
+            :attr:`PushoverAPI.session`.
+        :param result_class: (optional) The class of the compact result to return if the instance was created with
+            ``compact_results``, e.g. :class:`MessageResult`
         :type endpoint: str
         :type url_parameter: str
         :type payload: dict
         :type files: dict{str, file-like} or dict{str, tuple(str, file-like[, str[, dict]])}
         :type session: requests.Session
+        :type result_class: type
 
         :returns: Response body interpreted as JSON
         :rtype: dict
@@ -90,16 +280,166 @@ class PushoverAPI:
             payload = {}
         payload["token"] = self.token
 
-        post = session.post if session else requests.post
-        resp = post(
-            urljoin(PUSHOVER_API_URL, endpoint.format(url_parameter)),
+        resp = self._request(
+            "POST",
+            urljoin(self.api_url, endpoint.format(url_parameter)),
+            session,
+            endpoint=endpoint,
             data=payload,
             files=files,
         )
-        resp_body = resp.json()
+        return self._process_response(resp, result_class)
+
+    def _request(self, method, url, session=None, endpoint=None, **kwargs):
+        """
+        Send an HTTP request, retrying it according to the instance's :class:`RetryPolicy`.
+
+        :param method: The HTTP method to use, e.g. "GET" or "POST"
+        :param url: The URL to request
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to
+            :attr:`PushoverAPI.session`.
+        :param endpoint: (optional) The endpoint requested, before any parameter is filled in, reported to the
+            instance's :class:`Instrumentation`. Defaults to ``url``.
+        :param kwargs: Further arguments for :meth:`requests.Session.request`
+        :type method: str
+        :type url: str
+        :type session: requests.Session
+        :type endpoint: str
+
+        :returns: The final response
+        :rtype: requests.Response
+        :raises requests.RequestException: Raised when the request could not be sent, even after any retries.
+        """
+        if session is None:
+            session = self.session
+        if endpoint is None:
+            endpoint = url
+        if self.retry is None:
+            return self._attempt(session, method, url, endpoint, **kwargs)
+
+        # remember where any attachments start so they can be re-read for a retry
+        attachments = [_file_object(value) for value in (kwargs.get("files") or {}).values()]
+        positions = [(f, f.tell()) for f in attachments if hasattr(f, "seek")]
+
+        self.retry.record_request()
+        attempt = 1
+        while True:
+            try:
+                resp = self._attempt(session, method, url, endpoint, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # a request which got as far as being sent may have taken effect, so only repeat it if that's harmless
+                if not (method in IDEMPOTENT_METHODS or _not_sent(e)) or not self.retry.should_retry(attempt):
+                    raise
+                retry_after = None
+            else:
+                if not self.retry.should_retry(attempt, resp.status_code):
+                    return resp
+                retry_after = resp.headers.get("Retry-After")
+
+            time.sleep(self._retry_delay(endpoint, method, attempt, retry_after))
+            for f, position in positions:
+                f.seek(position)
+            attempt += 1
+
+    def _retry_delay(self, endpoint, method, attempt, retry_after):
+        """
+        Work out how long to wait before retrying a request, and report the retry.
+
+        The retry is reported to the instance's :class:`Instrumentation`, if it has one.
+
+        :param endpoint: The endpoint requested, before any parameter is filled in
+        :param method: The HTTP method used
+        :param attempt: The number of the attempt that failed, starting at 1
+        :param retry_after: The value of the ``Retry-After`` header of the failed response, if any
+        :type endpoint: str
+        :type method: str
+        :type attempt: int
+        :type retry_after: str
+
+        :returns: The delay, in seconds
+        :rtype: float
+        """
+        delay = self.retry.delay(attempt, retry_after)
+        if self.instrumentation is not None:
+            self.instrumentation.request_retried(endpoint, method, attempt, delay)
+        return delay
+
+    def _attempt(self, session, method, url, endpoint, **kwargs):
+        """
+        Send an HTTP request once, reporting its measurements to the instance's :class:`Instrumentation`.
+
+        :param session: The :class:`requests.Session` to send the request with
+        :param method: The HTTP method to use
+        :param url: The URL to request
+        :param endpoint: The endpoint requested, before any parameter is filled in
+        :param kwargs: Further arguments for :meth:`requests.Session.request`
+        :type session: requests.Session
+        :type method: str
+        :type url: str
+        :type endpoint: str
+
+        :returns: The response
+        :rtype: requests.Response
+        :raises requests.RequestException: Raised when the request could not be sent.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return session.request(method, url, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            instrumentation.request_finished(
+                RequestMetrics(endpoint, method, time.perf_counter() - start, None, None, 0, None, e)
+            )
+            raise
+        instrumentation.request_finished(
+            RequestMetrics(
+                endpoint,
+                method,
+                time.perf_counter() - start,
+                resp.status_code,
+                int(resp.request.headers.get("Content-Length", 0)),
+                len(resp.content),
+                resp.headers,
+                None,
+            )
+        )
+        return resp
+
+    def _process_response(self, resp, result_class=None):
+        """
+        Interpret a response from the Pushover API, recording any quota information it carries.
+
+        :param resp: The response to interpret
+        :param result_class: (optional) The class of the compact result to return if the instance was created with
+            ``compact_results``
+        :type resp: requests.Response
+        :type result_class: type
+
+        :returns: Response body interpreted as JSON, or an instance of ``result_class``
+        :rtype: dict
+        :raises BadAPIRequestError: Raised when the Pushover response body contains a status code other than 1.
+        """
+        rate_limit = RateLimit.from_headers(resp.headers)
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+            if self.instrumentation is not None:
+                self.instrumentation.quota_updated(rate_limit)
+
+        try:
+            # Pushover always responds in UTF-8, so decode the bytes without detecting their encoding
+            resp_body = self.json_loads(resp.content)
+        except ValueError:
+            # e.g. an HTML error page from a proxy in front of the Pushover servers
+            msg = f"{resp.status_code}: {resp.reason}"
+            raise BadAPIRequestError(msg, resp.status_code) from None
         if resp_body.get("status", None) != 1:
             msg = "{}: {}".format(resp.status_code, ": ".join(resp_body.get("errors")))
-            raise BadAPIRequestError(msg)
+            raise BadAPIRequestError(msg, resp.status_code)
+        if result_class is not None and self.compact_results:
+            return result_class(resp.content, resp_body, rate_limit)
         return resp_body
 
     # yeah, it's a lot of arguments, but I'd rather do this than create a type for the request
@@ -122,6 +462,8 @@ class PushoverAPI:
         html=False,  # noqa: FBT002
         ttl=None,
         session=None,
+        attachment_base64=None,
+        attachment_type=None,
     ):
         """
         Send a message via the Pushover API with control over the HTTP session.
@@ -137,8 +479,8 @@ class PushoverAPI:
         :param title: The title of the message
         :param url: A URL to be included with the message
         :param url_title: The link text to be displayed for the URL. If omitted, the URL itself is displayed.
-        :param image: The file path pointing to the image to be attached to the message or a file-like-object
-            representing the image data.
+        :param image: The file path pointing to the image to be attached to the message, a file-like-object
+            representing the image data, or the image data itself as a bytes-like object or :class:`mmap.mmap`.
         :param priority: An integer representing the priority of the message, from -2 (least important) to 2
             (emergency). Default is 0.
         :param retry: How often the Pushover server will re-send an emergency-priority message in seconds. Required with
@@ -153,15 +495,19 @@ class PushoverAPI:
             enable.
         :param ttl: An integer representing Time to Live in seconds, after which the message will be automatically
             deleted.
-        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Useful to send multiple
-            messages without opening multiple HTTP sessions.
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to
+            :attr:`PushoverAPI.session`.
+        :param attachment_base64: The base64-encoded data of an image to be attached to the message, instead of
+            ``image``
+        :param attachment_type: The MIME type of ``attachment_base64``, e.g. "image/png"
         :type user: str
         :type message: str
         :type device: str or list
         :type title: str
         :type url: str
         :type url_title: str
-        :type image: str, pathlib.Path, pathlib2.Path (only in Python 2), or file-like
+        :type image: str, pathlib.Path, pathlib2.Path (only in Python 2), file-like, bytes, bytearray, memoryview, or
+            mmap.mmap
         :type priority: int
         :type retry: int
         :type expire: int
@@ -171,10 +517,21 @@ class PushoverAPI:
         :type html: int
         :type ttl: int
         :type session: requests.Session
-
-        :returns: Response body interpreted as JSON
-        :rtype: dict
+        :type attachment_base64: str
+        :type attachment_type: str
+
+        :returns: Response body interpreted as JSON, or ``None`` if the instance's :class:`MessageCoalescer` held the
+            message back as a duplicate
+        :rtype: dict or MessageResult
+        :raises MessageValidationError: Raised when the instance's :class:`MessageValidator` finds problems with the
+            message.
+        :raises QuotaExceededError: Raised when the instance's :class:`QuotaThrottle` refuses to send the message.
+        :raises ValueError: Raised when both ``image`` and ``attachment_base64`` are given.
         """
+        if image is not None and attachment_base64 is not None:
+            msg = "only one of image and attachment_base64 can be given"
+            raise ValueError(msg)
+
         payload = {
             "user": user,
             "message": message,
@@ -190,9 +547,46 @@ class PushoverAPI:
             "sound": sound,
             "html": html,
             "ttl": ttl,
+            "attachment_base64": attachment_base64,
+            "attachment_type": attachment_type,
         }
 
+        if not self._screen_message(payload, session=session):
+            return None
+
+        try:
+            return self._post_message(payload, image, session=session)
+        except BaseException:
+            # a duplicate of a message which wasn't sent mustn't be held back
+            if self.coalescer is not None:
+                self.coalescer.forget(payload)
+            raise
+
+    def _post_message(self, payload, image, session=None):
+        """
+        Send a message which has been screened by :meth:`PushoverAPI._screen_message`.
+
+        :param payload: The fields of the message, named as in a request to the Pushover API
+        :param image: The image to be attached to the message, as taken by :meth:`PushoverAPI.send_message`
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to the session
+            shared by this instance.
+        :type payload: dict
+        :type session: requests.Session
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict or MessageResult
+        :raises QuotaExceededError: Raised when the instance's :class:`QuotaThrottle` refuses to send the message.
+        """
+        if self.throttle is not None:
+            time.sleep(self.throttle.delay(self.rate_limit))
+
         if image is not None:
+            # if it's a path and there's a cache, use the cached contents
+            if isinstance(image, (str, Path)) and self.attachment_cache is not None:
+                attachment = {"attachment": self.attachment_cache.get(image)}
+                return self._generic_post(
+                    "messages.json", payload=payload, session=session, files=attachment, result_class=MessageResult
+                )
             # if it's a str, convert to a Path and open it
             if isinstance(image, str):
                 with Path(image).open("rb") as f:
@@ -202,6 +596,7 @@ class PushoverAPI:
                         payload=payload,
                         session=session,
                         files=attachment,
+                        result_class=MessageResult,
                     )
             # if it's already a Path, open it directly
             elif isinstance(image, Path):
@@ -212,13 +607,78 @@ class PushoverAPI:
                         payload=payload,
                         session=session,
                         files=attachment,
+                        result_class=MessageResult,
                     )
-            # otherwise, assume it's a file-like (no good way to test that in both Python 2 and 3...)
+            # otherwise, assume it's bytes-like, which requests sends as is, or a file-like (no good way to test that in
+            # both Python 2 and 3...)
             else:
+                # requests would read() a memory map from its current position into a bytes object before copying
+                # that into the multipart body, whereas a view of the whole map is copied into the body directly
+                if isinstance(image, mmap.mmap):
+                    image = memoryview(image)
                 attachment = {"attachment": image}
-                return self._generic_post("messages.json", payload=payload, session=session, files=attachment)
+                return self._generic_post(
+                    "messages.json", payload=payload, session=session, files=attachment, result_class=MessageResult
+                )
 
-        return self._generic_post("messages.json", payload=payload, session=session)
+        return self._generic_post("messages.json", payload=payload, session=session, result_class=MessageResult)
+
+    def _screen_message(self, payload, session=None):
+        """
+        Check a message with the instance's :class:`MessageValidator` and :class:`MessageCoalescer` before it is sent.
+
+        Any summaries of duplicates due from the coalescer are sent first.
+
+        :param payload: The fields of the message, named as in a request to the Pushover API
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to the session
+            shared by this instance.
+        :type payload: dict
+        :type session: requests.Session
+
+        :returns: Whether to send the message, or hold it back as a duplicate
+        :rtype: bool
+        :raises MessageValidationError: Raised when the validator finds problems with the message.
+        """
+        if self.validator is not None:
+            if self.validator.needs_sounds(payload):
+                self.validator.update_sounds(self.get_sounds())
+            self.validator.validate(payload)
+
+        if self.coalescer is None:
+            return True
+        self.send_coalesced(session=session)
+        return self.coalescer.admit(payload)
+
+    def send_coalesced(self, flush=False, session=None):  # noqa: FBT002
+        """
+        Send the summaries of the duplicates merged by the instance's :class:`MessageCoalescer`.
+
+        Called before every message is sent, and with ``flush`` when the instance is closed. Failing to send a summary
+        doesn't raise, so that it can't stop an unrelated message from being sent; the exception is returned instead.
+
+        :param flush: If true, send the summaries of every duplicate held back, without waiting for the window to close
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to the session
+            shared by this instance.
+        :type flush: bool
+        :type session: requests.Session
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each summary sent
+        :rtype: list
+        """
+        if self.coalescer is None:
+            return []
+        summaries = self.coalescer.drain() if flush else self.coalescer.pop_due()
+        results = []
+        for summary in summaries:
+            try:
+                if self.throttle is not None:
+                    time.sleep(self.throttle.delay(self.rate_limit))
+                results.append(
+                    self._generic_post("messages.json", payload=summary, session=session, result_class=MessageResult)
+                )
+            except Exception as e:  # noqa: BLE001, PERF203 -- handed to the caller instead of failing an unrelated message
+                results.append(e)
+        return results
 
     # yeah, it's a lot of arguments, but I'd rather do this than create a type for the request
     def send_message(  # noqa: PLR0913
@@ -239,6 +699,8 @@ class PushoverAPI:
         # this doesn't change function behavior, it is just passed directly in the request
         html=False,  # noqa: FBT002
         ttl=None,
+        attachment_base64=None,
+        attachment_type=None,
     ):
         """
         Send a message via the Pushover API.
@@ -249,8 +711,8 @@ class PushoverAPI:
         :param title: The title of the message
         :param url: A URL to be included with the message
         :param url_title: The link text to be displayed for the URL. If omitted, the URL itself is displayed.
-        :param image: The file path pointing to the image to be attached to the message or a file-like object
-            representing the image data.
+        :param image: The file path pointing to the image to be attached to the message, a file-like object
+            representing the image data, or the image data itself as a bytes-like object or :class:`mmap.mmap`.
         :param priority: An integer representing the priority of the message, from -2 (least important) to 2
             (emergency). Default is 0.
         :param retry: How often the Pushover server will re-send an emergency-priority message in seconds. Required with
@@ -266,13 +728,17 @@ class PushoverAPI:
             enable.
         :param ttl: An integer representing Time to Live in seconds, after which the message will be automatically
             deleted.
+        :param attachment_base64: The base64-encoded data of an image to be attached to the message, instead of
+            ``image``
+        :param attachment_type: The MIME type of ``attachment_base64``, e.g. "image/png"
         :type user: str
         :type message: str
         :type device: str or list
         :type title: str
         :type url: str
         :type url_title: str
-        :type image: str, pathlib.Path, pathlib2.Path (only in Python 2), or file-like
+        :type image: str, pathlib.Path, pathlib2.Path (only in Python 2), file-like, bytes, bytearray, memoryview, or
+            mmap.mmap
         :type priority: int
         :type retry: int
         :type expire: int
@@ -281,9 +747,13 @@ class PushoverAPI:
         :type sound: str
         :type html: int
         :type ttl: int
+        :type attachment_base64: str
+        :type attachment_type: str
 
-        :returns: Response body interpreted as JSON
-        :rtype: dict
+        :returns: Response body interpreted as JSON, or ``None`` if the instance's :class:`MessageCoalescer` held the
+            message back as a duplicate
+        :rtype: dict or MessageResult
+        :raises ValueError: Raised when both ``image`` and ``attachment_base64`` are given.
         """
         return self._send_message(
             user,
@@ -301,20 +771,134 @@ class PushoverAPI:
             sound,
             html,
             ttl,
+            attachment_base64=attachment_base64,
+            attachment_type=attachment_type,
+        )
+
+    def submit(self, user, message, **kwargs):
+        """
+        Send a message in the background, returning immediately.
+
+        The message is queued in :attr:`PushoverAPI.dispatcher` and sent by one of its worker threads.
+
+        :param user: A Pushover user token representing the user or group to whom the message will be sent
+        :param message: The message to be sent
+        :param kwargs: Any other parameters of :meth:`PushoverAPI.send_message`
+        :type user: str
+        :type message: str
+
+        :returns: A future resolving to the response body interpreted as JSON, or to the exception raised while sending
+        :rtype: concurrent.futures.Future
+        :raises QueueFullError: Raised when the dispatcher's queue is full and its backpressure policy doesn't allow
+            waiting.
+        """
+        dispatcher = self.dispatcher
+        if dispatcher is None:
+            # submit may be called from many threads at once, and a second dispatcher would never be shut down
+            with self._dispatcher_lock:
+                if self.dispatcher is None:
+                    self.dispatcher = Dispatcher(self)
+                dispatcher = self.dispatcher
+        return dispatcher.submit(user, message, **kwargs)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every message queued by :meth:`PushoverAPI.submit` has been sent.
+
+        :param timeout: (optional) The maximum number of seconds to wait
+        :type timeout: float
+
+        :returns: Whether all messages were sent before the timeout
+        :rtype: bool
+        """
+        if self.dispatcher is None:
+            return True
+        return self.dispatcher.flush(timeout)
+
+    def send_messages(self, messages, max_workers=None, return_exceptions=False):  # noqa: FBT002
+        """
+        Send multiple messages with one call.
+
+        By default the messages are sent one after another and the first failure raises.
+        Pass ``max_workers`` to send up to that many messages at once from a pool of threads, and ``return_exceptions``
+        to collect the error for each failed message instead of stopping at the first one.
+
+        :param messages: An iterable of messages to be sent. Each item in the iterable must be expandable using the
+            ``**kwargs`` syntax with the keys matching the parameters of :meth:`PushoverAPI.send_message`.
+        :param max_workers: The maximum number of messages to have in flight at once. Connections beyond the
+            ``pool_maxsize`` given to the constructor are not kept alive, so it should not exceed that number.
+        :param return_exceptions: If true, the exception raised for a message (usually a :class:`BadAPIRequestError`)
+            is placed in the returned list in that message's position instead of being raised
+        :type max_workers: int
+        :type return_exceptions: bool
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each message, in the same order as
+            ``messages``
+        :rtype: list[dict]
+        """
+        return map_concurrently(
+            lambda message: self._send_message(**message),
+            messages,
+            max_workers=max_workers,
+            return_exceptions=return_exceptions,
         )
 
-    def send_messages(self, messages):
+    def iter_send_messages(self, messages, max_workers=None):
         """
-        Send multiple messages with one call. Utilizes a single HTTP session to decrease overhead.
+        Send a stream of messages, yielding the outcome of each one as soon as it is known.
+
+        Unlike :meth:`PushoverAPI.send_messages`, ``messages`` is consumed lazily, as messages can be sent, and nothing
+        is kept once its outcome has been yielded, so memory use doesn't grow with the number of messages. This makes
+        it suitable for sending from a database cursor or another generator of any length.
+        Sending stops when the generator is closed; messages already in flight are finished first.
 
         :param messages: An iterable of messages to be sent. Each item in the iterable must be expandable using the
             ``**kwargs`` syntax with the keys matching the parameters of :meth:`PushoverAPI.send_message`.
+        :param max_workers: The maximum number of messages to have in flight at once. The messages are sent one after
+            another if omitted. Connections beyond the ``pool_maxsize`` given to the constructor are not kept alive,
+            so it should not exceed that number.
+        :type messages: iterable
+        :type max_workers: int
+
+        :returns: A generator of ``(message, result)`` tuples, in the order the messages finish sending, where
+            ``result`` is the response body interpreted as JSON or the exception raised for the message (usually a
+            :class:`BadAPIRequestError`)
+        :rtype: generator
+        """
+        return iter_as_completed(lambda message: self._send_message(**message), messages, max_workers=max_workers)
+
+    def _cached(self, key, request, *args, **kwargs):
+        """
+        Make a request, or answer it from :attr:`PushoverAPI.response_cache` if it is cached.
+
+        :param key: The key of the response in the cache
+        :param request: The function making the request
+        :param args: Positional arguments for ``request``
+        :param kwargs: Keyword arguments for ``request``
+        :type key: tuple
+        :type request: callable
 
         :returns: Response body interpreted as JSON
-        :rtype: list[dict]
+        :rtype: dict
+        :raises BadAPIRequestError: Raised when the Pushover response body contains a status code other than 1.
         """
-        sess = requests.Session()
-        return [self._send_message(session=sess, **message) for message in messages]
+        if self.response_cache is None:
+            return request(*args, **kwargs)
+        cached, response = self.response_cache.lookup(key)
+        if cached:
+            if isinstance(response, BadAPIRequestError):
+                raise response
+            return response
+
+        try:
+            response = request(*args, **kwargs)
+        except BadAPIRequestError as e:
+            # a request rejected as invalid will be rejected again, unlike one that failed for a transient reason
+            if e.status_code == 400:  # noqa: PLR2004
+                self.response_cache.store(key, e)
+            raise
+        self.response_cache.store(key, response)
+        return response
 
     def get_sounds(self):
         """
@@ -323,7 +907,22 @@ class PushoverAPI:
         :return: A :class:`dict` of sounds, with keys representing the identifier and values a human-readable name.
         :rtype: dict
         """
-        return self._generic_get("sounds.json").get("sounds")
+        return self._cached((SOUNDS,), self._generic_get, "sounds.json").get("sounds")
+
+    def get_limits(self):
+        """
+        Get the application's current message quota from the Pushover servers.
+
+        Also updates :attr:`PushoverAPI.rate_limit`.
+
+        :returns: The application's quota
+        :rtype: RateLimit
+        """
+        resp_body = self._generic_get("apps/limits.json")
+        self.rate_limit = RateLimit(resp_body["limit"], resp_body["remaining"], resp_body["reset"])
+        if self.instrumentation is not None:
+            self.instrumentation.quota_updated(self.rate_limit)
+        return self.rate_limit
 
     def validate(self, user, device=None):
         """
@@ -335,10 +934,16 @@ class PushoverAPI:
         :type device: str
 
         :returns: Response body interpreted as JSON
-        :rtype: dict
+        :rtype: dict or ValidationResult
         """
         payload = {"user": user, "device": device}
-        return self._generic_post("users/validate.json", payload=payload)
+        return self._cached(
+            (VALIDATE, user, device),
+            self._generic_post,
+            "users/validate.json",
+            payload=payload,
+            result_class=ValidationResult,
+        )
 
     def check_receipt(self, receipt):
         """
@@ -348,9 +953,9 @@ class PushoverAPI:
         :type receipt: str
 
         :returns: Response body interpreted as JSON
-        :rtype: dict
+        :rtype: dict or ReceiptStatus
         """
-        return self._generic_get("receipts/{}.json", receipt)
+        return self._generic_get("receipts/{}.json", receipt, result_class=ReceiptStatus)
 
     def cancel_receipt(self, receipt):
         """
@@ -378,8 +983,8 @@ class PushoverAPI:
         :param subscription_code: The subscription code to migrate the user to
         :param device: The user's device that the subscription will be limited to
         :param sound: The user's preferred sound
-        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Useful to send multiple
-            messages without opening multiple HTTP sessions.
+        :param session: A :class:`requests.Session` object to be used to send HTTP requests. Defaults to
+            :attr:`PushoverAPI.session`.
         :type user: str
         :type subscription_code: str
         :type device: str
@@ -416,23 +1021,67 @@ class PushoverAPI:
         """
         return self._migrate_to_subscription(user, subscription_code, device, sound)
 
-    def migrate_multiple_to_subscription(self, users, subscription_code):
+    def migrate_multiple_to_subscription(
+        self,
+        users,
+        subscription_code,
+        max_workers=None,
+        return_exceptions=False,  # noqa: FBT002
+        checkpoint=None,
+    ):
         """
-        Migrate multiple users to subscriptions with one call. Utilizes a single HTTP session to decrease overhead.
+        Migrate multiple users to subscriptions with one call.
+
+        Like :meth:`PushoverAPI.send_messages`, the users are migrated one after another and the first failure raises
+        by default. Pass ``max_workers`` to migrate up to that many users at once from a pool of threads, and
+        ``return_exceptions`` to collect the error for each failed migration instead of stopping at the first one.
 
-        :param users: An iterable of messages to be sent. Each item in the iterable must be expandable using the
+        Pass a ``checkpoint`` file to make a long migration resumable. Each successful migration is recorded in it as
+        soon as it completes, and users already recorded there are not migrated again; their recorded response is
+        returned instead. After a crash or running out of quota, call this method again with the same ``users``,
+        ``subscription_code`` and ``checkpoint`` to migrate only the users that remain. Failed migrations are not
+        recorded, so they are tried again.
+
+        :param users: An iterable of users to be migrated. Each item in the iterable must be expandable using the
             ``**kwargs`` syntax with keys matching ``user`` and, optionally, ``device`` and ``sound``. Compare to
             :meth:`PushoverAPI.migrate_to_subscription`.
         :param subscription_code: The subscription code to migrate the user to
+        :param max_workers: The maximum number of migrations to have in flight at once. Connections beyond the
+            ``pool_maxsize`` given to the constructor are not kept alive, so it should not exceed that number.
+        :param return_exceptions: If true, the exception raised for a user (usually a :class:`BadAPIRequestError`) is
+            placed in the returned list in that user's position instead of being raised
+        :param checkpoint: (optional) The path of a file recording the completed migrations, in JSON lines format.
+            Created if it doesn't exist.
+        :type users: iterable
         :type subscription_code: str
+        :type max_workers: int
+        :type return_exceptions: bool
+        :type checkpoint: str or pathlib.Path
 
-        :returns: Response body interpreted as JSON
-        :rtype: dict
+        :returns: Response body interpreted as JSON (or the exception raised) for each user, in the same order as
+            ``users``
+        :rtype: list[dict]
         """
-        sess = requests.Session()
-        return [
-            self._migrate_to_subscription(session=sess, subscription_code=subscription_code, **user) for user in users
-        ]
+        if checkpoint is None:
+            return map_concurrently(
+                lambda user: self._migrate_to_subscription(subscription_code=subscription_code, **user),
+                users,
+                max_workers=max_workers,
+                return_exceptions=return_exceptions,
+            )
+
+        with Checkpoint(checkpoint) as done:
+
+            def migrate(user):
+                """Migrate a user unless the checkpoint shows it was already done, recording it when it is."""
+                item = dict(user, subscription_code=subscription_code)
+                found, resp = done.lookup(item)
+                if not found:
+                    resp = self._migrate_to_subscription(**item)
+                    done.record(item, resp)
+                return resp
+
+            return map_concurrently(migrate, users, max_workers=max_workers, return_exceptions=return_exceptions)
 
     def group_info(self, group_key):
         """
@@ -442,9 +1091,9 @@ class PushoverAPI:
         :type group_key: str
 
         :returns: Response body interpreted as JSON
-        :rtype: dict
+        :rtype: dict or GroupInfo
         """
-        return self._generic_get("groups/{}.json", group_key)
+        return self._generic_get("groups/{}.json", group_key, result_class=GroupInfo)
 
     def group_add_user(self, group_key, user, device=None, memo=None):
         """
@@ -510,6 +1159,41 @@ class PushoverAPI:
         payload = {"user": user}
         return self._generic_post("groups/{}/enable_user.json", group_key, payload)
 
+    def reconcile_group(self, group_key, members, disabled=(), max_workers=None):
+        """
+        Change a group's membership to match the desired membership with the fewest API calls.
+
+        Fetches the group with :meth:`PushoverAPI.group_info`, then adds, deletes, disables and enables users as needed.
+        Users are compared by user key only; the devices and memos of existing members are left alone.
+        Up to ``max_workers`` users are changed at once. A failure to change one user doesn't stop the others from
+        being changed; check the ``error`` of each returned :class:`GroupChange`.
+
+        Use :meth:`GroupCache.reconcile` to avoid fetching the group every time.
+
+        :param group_key: A Pushover group key
+        :param members: The user keys that should be enabled members of the group
+        :param disabled: The user keys that should be disabled members of the group
+        :param max_workers: The maximum number of users to change at once. Connections beyond the ``pool_maxsize``
+            given to the constructor are not kept alive, so it should not exceed that number.
+        :type group_key: str
+        :type members: iterable
+        :type disabled: iterable
+        :type max_workers: int
+
+        :returns: The changes made for each user that needed changing, in order of user key
+        :rtype: list[GroupChange]
+        :raises ValueError: Raised when a user is in both ``members`` and ``disabled``.
+        :raises BadAPIRequestError: Raised when the group can't be fetched.
+        """
+        plan = plan_group_changes(self.group_info(group_key), members, disabled)
+        operations = {
+            ADD: self.group_add_user,
+            DELETE: self.group_delete_user,
+            DISABLE: self.group_disable_user,
+            ENABLE: self.group_enable_user,
+        }
+        return _apply_group_changes(group_key, plan, operations, max_workers)
+
     def group_rename(self, group_key, new_name):
         """
         Change the name of a group.
@@ -543,3 +1227,34 @@ class PushoverAPI:
         else:
             payload["user"] = user_identifier
         return self._generic_post("licenses/assign.json", payload=payload)
+
+    def assign_licenses(self, user_identifiers, os=None, max_workers=None, return_exceptions=False):  # noqa: FBT002
+        """
+        Assign Pushover licenses to multiple users with one call.
+
+        Like :meth:`PushoverAPI.send_messages`, the licenses are assigned one after another and the first failure raises
+        by default. Pass ``max_workers`` to assign up to that many licenses at once from a pool of threads, and
+        ``return_exceptions`` to collect the error for each failed assignment instead of stopping at the first one.
+        ``user_identifiers`` is consumed as workers become free, so it may be a generator over a large directory.
+
+        :param user_identifiers: An iterable of Pushover user keys or emails identifying the users to assign licenses to
+        :param os: An OS to limit the licenses. Available options are :code:`Android`, :code:`iOS`, or :code:`Desktop`
+        :param max_workers: The maximum number of assignments to have in flight at once. Connections beyond the
+            ``pool_maxsize`` given to the constructor are not kept alive, so it should not exceed that number.
+        :param return_exceptions: If true, the exception raised for a user (usually a :class:`BadAPIRequestError`) is
+            placed in the returned list in that user's position instead of being raised
+        :type user_identifiers: iterable
+        :type os: str
+        :type max_workers: int
+        :type return_exceptions: bool
+
+        :returns: Response body interpreted as JSON (or the exception raised) for each user, in the same order as
+            ``user_identifiers``
+        :rtype: list[dict]
+        """
+        return map_concurrently(
+            lambda user_identifier: self.assign_license(user_identifier, os),
+            user_identifiers,
+            max_workers=max_workers,
+            return_exceptions=return_exceptions,
+        )
@@ -0,0 +1,114 @@
+"""Tracking of, and throttling against, an application's monthly message quota."""
+
+import threading
+import time
+from collections import namedtuple
+
+from .error import QuotaExceededError
+
+
+# no annotations anywhere else in the package, so stick with the functional form
+class RateLimit(namedtuple("RateLimit", ["limit", "remaining", "reset"])):  # noqa: PYI024
+    """
+    An application's message quota as reported by the Pushover API.
+
+    :param limit: The number of messages the application may send each month
+    :param remaining: The number of messages the application has left for the current month
+    :param reset: The Unix timestamp at which ``remaining`` will be reset to ``limit``
+    :type limit: int
+    :type remaining: int
+    :type reset: int
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_headers(cls, headers):
+        """
+        Build a :class:`RateLimit` from the ``X-Limit-App-*`` headers of a response to ``messages.json``.
+
+        :param headers: The response headers
+        :type headers: Mapping[str, str]
+
+        :returns: The reported quota, or ``None`` if the headers are not present
+        :rtype: RateLimit or None
+        """
+        try:
+            return cls(
+                int(headers["X-Limit-App-Limit"]),
+                int(headers["X-Limit-App-Remaining"]),
+                int(headers["X-Limit-App-Reset"]),
+            )
+        except (KeyError, ValueError):
+            return None
+
+
+class QuotaThrottle:
+    """
+    A policy for holding back messages so an application's monthly quota is not exhausted.
+
+    Pass an instance as the ``throttle`` argument of :class:`PushoverAPI` or :class:`AsyncPushoverAPI` and it will be
+    consulted, using the most recently reported :class:`RateLimit`, before every message is sent.
+
+    Once only ``reserve`` messages remain, sending is refused with a :class:`QuotaExceededError` until the quota
+    resets, keeping those messages available for anything sent outside of the throttle (e.g. by another process).
+    With ``spread``, messages are additionally delayed so that the messages left are spaced evenly over the time left
+    until the reset, rather than being used up in a burst.
+    The quota resets monthly, so the space between messages can be long, and the delay is spent blocking the thread (or
+    task) sending the message. A message that would have to wait longer than ``max_delay`` seconds is refused with a
+    :class:`QuotaExceededError` instead, whose ``retry_at`` says when to try again; it doesn't take up a slot.
+
+    :param reserve: The number of messages to hold back
+    :param spread: Whether to space out messages over the time until the quota resets
+    :param max_delay: The longest, in seconds, to delay a message with ``spread`` before refusing it. Never refused
+        for the delay if ``None``.
+    :type reserve: int
+    :type spread: bool
+    :type max_delay: float
+    """
+
+    def __init__(self, reserve=0, spread=False, max_delay=60.0):  # noqa: FBT002
+        self.reserve = reserve
+        self.spread = spread
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def delay(self, rate_limit, now=None):
+        """
+        Claim permission to send one message.
+
+        :param rate_limit: The most recently reported quota, or ``None`` if it is not yet known
+        :param now: The current Unix time. Defaults to :func:`time.time`.
+        :type rate_limit: RateLimit or None
+        :type now: float
+
+        :returns: The number of seconds to wait before sending the message
+        :rtype: float
+        :raises QuotaExceededError: Raised when sending the message would eat into the reserve, or with ``spread``,
+            when the message would have to wait longer than ``max_delay``.
+        """
+        if now is None:
+            now = time.time()
+        if rate_limit is None or now >= rate_limit.reset:
+            # nothing to go on until the first response after a reset
+            return 0.0
+
+        available = rate_limit.remaining - self.reserve
+        if available <= 0:
+            msg = (
+                f"{rate_limit.remaining} of {rate_limit.limit} messages remaining, "
+                f"refusing to send until the quota resets at {rate_limit.reset}"
+            )
+            raise QuotaExceededError(msg, retry_at=rate_limit.reset)
+        if not self.spread:
+            return 0.0
+
+        interval = (rate_limit.reset - now) / available
+        with self._lock:
+            slot = max(now, self._next_slot)
+            if self.max_delay is not None and slot - now > self.max_delay:
+                msg = f"the next message can't be sent for {slot - now:.0f} seconds without using up the quota early"
+                raise QuotaExceededError(msg, retry_at=slot)
+            self._next_slot = slot + interval
+        return slot - now
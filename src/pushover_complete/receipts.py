@@ -0,0 +1,338 @@
+"""Tracking of emergency-priority message receipts until they are acknowledged or expire."""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+
+from ._concurrency import map_concurrently
+from .error import BadAPIRequestError
+from .results import MessageResult
+
+
+class _TrackedReceipt:
+    """The polling state of a single receipt."""
+
+    __slots__ = ("expires_at", "future", "interval", "receipt")
+
+    def __init__(self, receipt, expires_at, interval):
+        self.receipt = receipt
+        self.expires_at = expires_at
+        self.interval = interval
+        self.future = Future()
+
+
+def _notify(callback):
+    """
+    Wrap a callback taking a receipt status as a done callback for the future of a tracked receipt.
+
+    :param callback: A callable to be called with the final status of the receipt
+    :type callback: callable
+
+    :returns: A callable to be passed to :meth:`concurrent.futures.Future.add_done_callback`
+    :rtype: callable
+    """
+
+    def done(future):
+        """Pass the status of a resolved receipt to the callback."""
+        if not future.cancelled() and future.exception() is None:
+            callback(future.result())
+
+    return done
+
+
+class ReceiptTracker:
+    """
+    Poll the receipts of emergency-priority messages until they are acknowledged or expire.
+
+    Register receipts with :meth:`ReceiptTracker.track`, which returns a :class:`concurrent.futures.Future` resolving to
+    the final status of the receipt (as returned by :meth:`PushoverAPI.check_receipt`) once it has been acknowledged or
+    has expired.
+    Receipts are polled by :meth:`ReceiptTracker.poll`, either called directly or by the background thread started with
+    :meth:`ReceiptTracker.start` (or by using the tracker as a context manager).
+
+    Each receipt is first polled ``min_interval`` seconds after being tracked. Every poll that finds it still pending
+    multiplies the time until the next poll by ``backoff``, up to ``max_interval``, randomized by up to ``jitter``
+    (as a fraction) so receipts tracked at the same time don't stay in step. Polls are never scheduled past the
+    receipt's expiry time, when it is polled a final time.
+
+    Receipts whose status is learned without polling, e.g. by a :class:`CallbackReceiver`, are passed to
+    :meth:`ReceiptTracker.resolve`.
+
+    :param api: The :class:`PushoverAPI` used to check receipts
+    :param min_interval: The number of seconds before the first poll of a receipt
+    :param max_interval: The maximum number of seconds between polls of a receipt
+    :param backoff: The factor by which the time between polls grows after each poll
+    :param jitter: The maximum fraction by which the time between polls is randomly lengthened or shortened
+    :param max_workers: The maximum number of receipts to check at once
+    :type api: PushoverAPI
+    :type min_interval: float
+    :type max_interval: float
+    :type backoff: float
+    :type jitter: float
+    :type max_workers: int
+    """
+
+    def __init__(self, api, min_interval=5.0, max_interval=300.0, backoff=2.0, jitter=0.1, max_workers=None):
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_workers = max_workers
+
+        self._tracked = {}
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._worker = None
+
+    def __enter__(self):
+        """Enter the context manager, starting the polling thread."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, stopping the polling thread."""
+        self.stop()
+
+    def __len__(self):
+        """
+        Count the receipts being tracked.
+
+        :rtype: int
+        """
+        with self._condition:
+            return len(self._tracked)
+
+    def track(self, receipt, expires_at=None, callback=None, now=None):
+        """
+        Start tracking a receipt.
+
+        :param receipt: The receipt id, or the response to :meth:`PushoverAPI.send_message` that contains it
+        :param expires_at: (optional) The Unix time at which the message stops being re-sent, if known. Fetched with
+            the first poll otherwise.
+        :param callback: (optional) A callable to be called with the final status of the receipt
+        :param now: The current Unix time. Defaults to :func:`time.time`.
+        :type receipt: str, dict or MessageResult
+        :type expires_at: float
+        :type callback: callable
+        :type now: float
+
+        :returns: A future resolving to the final status of the receipt, or to the error that stopped it being polled
+        :rtype: concurrent.futures.Future
+        :raises ValueError: Raised when a response without a receipt is given.
+        """
+        if isinstance(receipt, (dict, MessageResult)):
+            if "receipt" not in receipt:
+                msg = "the response has no receipt; only emergency-priority messages have receipts"
+                raise ValueError(msg)
+            receipt = receipt["receipt"]
+        if now is None:
+            now = time.time()
+
+        with self._condition:
+            tracked = self._tracked.get(receipt)
+            if tracked is None:
+                tracked = _TrackedReceipt(receipt, expires_at, self.min_interval)
+                self._tracked[receipt] = tracked
+                self._schedule_poll(tracked, now + self.min_interval, now)
+                self._condition.notify_all()
+        if callback is not None:
+            tracked.future.add_done_callback(_notify(callback))
+        return tracked.future
+
+    def untrack(self, receipt):
+        """
+        Stop tracking a receipt, cancelling its future.
+
+        :param receipt: The receipt id
+        :type receipt: str
+        """
+        with self._condition:
+            tracked = self._tracked.pop(receipt, None)
+        if tracked is not None:
+            tracked.future.cancel()
+
+    def resolve(self, receipt, status):
+        """
+        Finish tracking a receipt whose final status was learned some other way than polling.
+
+        :param receipt: The receipt id
+        :param status: The final status of the receipt
+        :type receipt: str
+        :type status: dict
+
+        :returns: Whether the receipt was being tracked
+        :rtype: bool
+        """
+        with self._condition:
+            tracked = self._tracked.get(receipt)
+        if tracked is None:
+            return False
+        self._finish(tracked, status=status)
+        return True
+
+    def _schedule_poll(self, tracked, poll_at, now):
+        """
+        Schedule the next poll of a receipt. Must be called with the condition held.
+
+        :param tracked: The receipt to poll
+        :param poll_at: The Unix time of the poll, before it is capped at the receipt's expiry time
+        :param now: The current Unix time
+        :type tracked: _TrackedReceipt
+        :type poll_at: float
+        :type now: float
+        """
+        if tracked.expires_at is not None and tracked.expires_at > now:
+            poll_at = min(poll_at, tracked.expires_at)
+        # the sequence number breaks ties so that receipts themselves are never compared
+        heapq.heappush(self._schedule, (poll_at, next(self._sequence), tracked))
+
+    def next_poll_at(self):
+        """
+        Get the time of the next scheduled poll.
+
+        :returns: The Unix time of the next poll, or ``None`` if no receipts are being tracked
+        :rtype: float or None
+        """
+        with self._condition:
+            self._discard_untracked()
+            return self._schedule[0][0] if self._schedule else None
+
+    def _is_tracked(self, tracked):
+        """
+        Check whether a receipt is still being tracked. Must be called with the condition held.
+
+        :param tracked: The receipt to check
+        :type tracked: _TrackedReceipt
+
+        :rtype: bool
+        """
+        return self._tracked.get(tracked.receipt) is tracked
+
+    def _discard_untracked(self):
+        """Drop scheduled polls of receipts that are no longer tracked. Must be called with the condition held."""
+        while self._schedule and not self._is_tracked(self._schedule[0][2]):
+            heapq.heappop(self._schedule)
+
+    def poll(self, now=None):
+        """
+        Check every receipt that is due to be polled.
+
+        :param now: The current Unix time. Defaults to :func:`time.time`.
+        :type now: float
+
+        :returns: The number of receipts checked
+        :rtype: int
+        """
+        if now is None:
+            now = time.time()
+        with self._condition:
+            due = []
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, tracked = heapq.heappop(self._schedule)
+                if self._is_tracked(tracked):
+                    due.append(tracked)
+
+        results = map_concurrently(
+            lambda tracked: self.api.check_receipt(tracked.receipt),
+            due,
+            max_workers=self.max_workers,
+            return_exceptions=True,
+        )
+        for tracked, result in zip(due, results):
+            self._handle_poll(tracked, result, now)
+        return len(due)
+
+    def _handle_poll(self, tracked, result, now):
+        """
+        Resolve or reschedule a receipt after it has been checked.
+
+        :param tracked: The receipt that was checked
+        :param result: The status of the receipt, or the exception raised while checking it
+        :param now: The current Unix time
+        :type tracked: _TrackedReceipt
+        :type result: dict or Exception
+        :type now: float
+        """
+        if isinstance(result, Exception):
+            transient = isinstance(result, requests.RequestException) or (
+                isinstance(result, BadAPIRequestError) and (result.status_code or 0) >= 500  # noqa: PLR2004
+            )
+            if not transient:
+                self._finish(tracked, exception=result)
+                return
+        elif result.get("acknowledged") or result.get("expired"):
+            self._finish(tracked, status=result)
+            return
+        elif result.get("expires_at"):
+            tracked.expires_at = result["expires_at"]
+
+        tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+        delay = tracked.interval * random.uniform(1 - self.jitter, 1 + self.jitter)  # noqa: S311 -- not cryptographic
+        with self._condition:
+            if self._is_tracked(tracked):
+                self._schedule_poll(tracked, now + delay, now)
+                self._condition.notify_all()
+
+    def _finish(self, tracked, status=None, exception=None):
+        """
+        Stop tracking a receipt and resolve its future, unless it was already resolved some other way.
+
+        :param tracked: The receipt
+        :param status: The final status of the receipt
+        :param exception: The error that stopped the receipt being polled, instead of a status
+        :type tracked: _TrackedReceipt
+        :type status: dict
+        :type exception: Exception
+        """
+        with self._condition:
+            if not self._is_tracked(tracked):
+                return
+            del self._tracked[tracked.receipt]
+        if exception is not None:
+            tracked.future.set_exception(exception)
+        else:
+            tracked.future.set_result(status)
+
+    def start(self):
+        """Start the background thread that polls receipts when they are due. Does nothing if it is already running."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._condition:
+            self._stopping = False
+        self._worker = threading.Thread(target=self._run, name="pushover_complete-receipts", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the polling thread. Receipts stay tracked, to be polled again once the thread is restarted.
+
+        :param timeout: (optional) The maximum number of seconds to wait for the thread to finish
+        :type timeout: float
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def _run(self):
+        """Poll receipts until stopped. The body of the polling thread."""
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                self._discard_untracked()
+                wait = self._schedule[0][0] - time.time() if self._schedule else None
+                if wait is None or wait > 0:
+                    self._condition.wait(wait)
+                    continue
+            self.poll()
@@ -0,0 +1,136 @@
+"""An in-memory cache of responses from Pushover API endpoints whose results rarely change."""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+#: The key of the cached response of :meth:`PushoverAPI.get_sounds`
+SOUNDS = "sounds"
+#: The first element of the keys of cached responses of :meth:`PushoverAPI.validate`
+VALIDATE = "validate"
+
+
+class ResponseCache:
+    """
+    A size-bounded, least-recently-used cache of responses that rarely change.
+
+    Caches the responses of :meth:`PushoverAPI.get_sounds` and :meth:`PushoverAPI.validate`. Give a
+    :class:`ResponseCache` to :class:`PushoverAPI` (or :class:`AsyncPushoverAPI`) so that repeated calls within the
+    cache's time-to-live are answered without a request to the Pushover API.
+    Each endpoint has its own time-to-live. Users and devices found invalid by :meth:`PushoverAPI.validate` are cached
+    too, for ``invalid_ttl``, and the :class:`BadAPIRequestError` is raised again on each cached call.
+    Other errors, such as connection errors, are never cached.
+
+    Once more than ``maxsize`` responses are cached, the least recently used ones are evicted.
+    Use :meth:`ResponseCache.invalidate` to forget responses that are known to have changed, e.g. after a user adds a
+    device.
+
+    The cache is safe to share between threads and between API instances using the same application token.
+
+    :param maxsize: The maximum number of cached responses
+    :param sounds_ttl: How long, in seconds, to cache the list of sounds
+    :param validate_ttl: How long, in seconds, to cache a valid user or device
+    :param invalid_ttl: How long, in seconds, to cache an invalid user or device
+    :type maxsize: int
+    :type sounds_ttl: float
+    :type validate_ttl: float
+    :type invalid_ttl: float
+    """
+
+    def __init__(self, maxsize=1024, sounds_ttl=86400.0, validate_ttl=3600.0, invalid_ttl=300.0):
+        self.maxsize = maxsize
+        self.sounds_ttl = sounds_ttl
+        self.validate_ttl = validate_ttl
+        self.invalid_ttl = invalid_ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Count the cached responses, including any that have expired but not yet been evicted.
+
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, key, now=None):
+        """
+        Look up a cached response.
+
+        :param key: The key of the response, e.g. ``("validate", user, device)``
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type key: tuple
+        :type now: float
+
+        :returns: ``(True, response)`` if the response is cached, where ``response`` is the response body or the
+            :class:`BadAPIRequestError` raised for the request, or ``(False, None)`` if it isn't
+        :rtype: tuple(bool, dict or BadAPIRequestError)
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry[1]
+        # don't let callers modify the cached response, or pile up tracebacks on the cached error
+        return True, copy.copy(response) if isinstance(response, Exception) else copy.deepcopy(response)
+
+    def store(self, key, response, now=None):
+        """
+        Cache a response for the time-to-live of its endpoint.
+
+        :param key: The key of the response, e.g. ``("validate", user, device)``
+        :param response: The response body, or the :class:`BadAPIRequestError` raised for an invalid user or device
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type key: tuple
+        :type response: dict or BadAPIRequestError
+        :type now: float
+        """
+        if now is None:
+            now = time.monotonic()
+        if isinstance(response, Exception):
+            ttl = self.invalid_ttl
+            # without the traceback, which would keep the frames it references alive
+            response = copy.copy(response)
+        else:
+            ttl = self.sounds_ttl if key[0] == SOUNDS else self.validate_ttl
+            response = copy.deepcopy(response)
+        with self._lock:
+            self._entries[key] = (now + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint=None, user=None):
+        """
+        Forget cached responses.
+
+        :param endpoint: (optional) Only forget responses of this endpoint: ``"sounds"`` or ``"validate"``
+        :param user: (optional) Only forget the responses of :meth:`PushoverAPI.validate` for this user or group, for
+            any device
+        :type endpoint: str
+        :type user: str
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if endpoint is not None and key[0] != endpoint:
+                    continue
+                if user is not None and (key[0] != VALIDATE or key[1] != user):
+                    continue
+                del self._entries[key]
+
+    def clear(self):
+        """Forget every cached response."""
+        with self._lock:
+            self._entries.clear()
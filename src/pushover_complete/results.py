@@ -0,0 +1,175 @@
+"""Compact objects holding responses from the Pushover API, for applications that keep many of them."""
+
+from collections.abc import Mapping
+
+from ._json import loads
+
+
+class _Result:
+    """
+    A successful response from the Pushover API, kept as the raw response body.
+
+    The response body is decoded once when the response arrives, to check it and take the fields most often needed as
+    attributes, but only its raw bytes are kept. The rest of it is decoded again each time it is asked for, with
+    :meth:`as_dict` or by indexing the result like the dict it replaces, so call :meth:`as_dict` once to look up many
+    values. A result compares equal to the dict of its response body.
+
+    :param content: The raw response body
+    :param body: The response body, already decoded, from which the attributes are taken
+    :param rate_limit: The quota reported in the response headers
+    :type content: bytes
+    :type body: dict
+    :type rate_limit: RateLimit
+
+    .. attribute:: request
+
+        The request ID assigned by the Pushover servers
+
+    .. attribute:: rate_limit
+
+        The application's message quota reported with the response, as a :class:`RateLimit`, or ``None`` if it wasn't
+        reported
+    """
+
+    __slots__ = ("_content", "rate_limit", "request")
+    #: The keys of the response body kept as attributes of the same name
+    FIELDS: tuple[str, ...] = ()
+
+    def __init__(self, content, body, rate_limit=None):
+        self._content = bytes(content)
+        self.request = body.get("request")
+        self.rate_limit = rate_limit
+        for field in self.FIELDS:
+            setattr(self, field, body.get(field))
+
+    def as_dict(self):
+        """
+        Decode the full response body.
+
+        A new dict is decoded on every call, so keep it if it is needed more than once.
+
+        :returns: Response body interpreted as JSON
+        :rtype: dict
+        """
+        return loads(self._content)
+
+    def __getitem__(self, key):
+        """Get a value from the response body, as from the dict it replaces."""
+        return self.as_dict()[key]
+
+    def __contains__(self, key):
+        """Check whether the response body has a key, as for the dict it replaces."""
+        return key in self.as_dict()
+
+    def get(self, key, default=None):
+        """
+        Get a value from the response body, as from the dict it replaces.
+
+        :param key: The key of the value
+        :param default: The value returned if the key is missing
+
+        :returns: The value
+        """
+        return self.as_dict().get(key, default)
+
+    def __eq__(self, other):
+        """Compare equal to another result or a dict with the same response body."""
+        if isinstance(other, _Result):
+            return self.as_dict() == other.as_dict()
+        if isinstance(other, Mapping):
+            return self.as_dict() == other
+        return NotImplemented
+
+    # unhashable, like the dict it replaces
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        """Show the raw response body."""
+        return f"{type(self).__name__}({self._content.decode('utf-8', 'replace')})"
+
+
+class MessageResult(_Result):
+    """
+    The response to a sent message.
+
+    .. attribute:: receipt
+
+        The receipt of an emergency-priority message, for :meth:`PushoverAPI.check_receipt`, or ``None`` for other
+        messages
+    """
+
+    __slots__ = FIELDS = ("receipt",)
+
+
+class ReceiptStatus(_Result):
+    """
+    The status of an emergency-priority message, as returned by :meth:`PushoverAPI.check_receipt`.
+
+    The attributes are named after the keys of the response body; the times are Unix timestamps, or ``0`` if the event
+    hasn't happened. ``acknowledged``, ``expired`` and ``called_back`` are :class:`bool`.
+    """
+
+    __slots__ = FIELDS = (
+        "acknowledged",
+        "acknowledged_at",
+        "acknowledged_by",
+        "acknowledged_by_device",
+        "last_delivered_at",
+        "expired",
+        "expires_at",
+        "called_back",
+        "called_back_at",
+    )
+
+    def __init__(self, content, body, rate_limit=None):
+        super().__init__(content, body, rate_limit)
+        self.acknowledged = bool(self.acknowledged)
+        self.expired = bool(self.expired)
+        self.called_back = bool(self.called_back)
+
+
+class GroupInfo(_Result):
+    """
+    The information about a delivery group, as returned by :meth:`PushoverAPI.group_info`.
+
+    .. attribute:: name
+
+        The name of the group
+    """
+
+    __slots__ = FIELDS = ("name",)
+
+    @property
+    def users(self):
+        """
+        The members of the group, decoded when asked for.
+
+        :rtype: list[dict]
+        """
+        return self.as_dict().get("users", [])
+
+
+class ValidationResult(_Result):
+    """
+    The response to a valid user or group, as returned by :meth:`PushoverAPI.validate`.
+
+    .. attribute:: devices
+
+        The names of the user's active devices
+
+    .. attribute:: licenses
+
+        The platforms the user has licensed
+
+    .. attribute:: group
+
+        Whether the key is a group key rather than a user key
+    """
+
+    __slots__ = FIELDS = ("devices", "licenses", "group")
+
+    def __init__(self, content, body, rate_limit=None):
+        super().__init__(content, body, rate_limit)
+        self.devices = tuple(self.devices or ())
+        self.licenses = tuple(self.licenses or ())
+        self.group = bool(self.group)
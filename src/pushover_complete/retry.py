@@ -0,0 +1,147 @@
+"""Retrying of API requests that fail for transient reasons."""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+#: HTTP status codes worth retrying: Pushover's rate limiting and server-side errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+#: HTTP methods whose requests can be repeated without doing anything twice
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class RetryPolicy:
+    """
+    A policy for retrying API requests that fail for transient reasons.
+
+    Pass an instance as the ``retry`` argument of :class:`PushoverAPI` or :class:`AsyncPushoverAPI` to have every
+    request retried when the connection fails or the Pushover servers respond with a 429 or 5xx status code.
+    Other 4xx responses mean the request itself was invalid and are never retried.
+    A POST request, such as sending a message, may already have taken effect if the connection drops or times out after
+    it was sent, so it is only retried after failing to connect; retrying it otherwise could send a message twice.
+
+    Retries are delayed with exponential backoff: the ``n``-th retry waits ``backoff_base * 2 ** (n - 1)`` seconds,
+    capped at ``backoff_max``.
+    With ``jitter``, a random delay between zero and that value is used instead ("full jitter") so that many clients
+    failing at once don't retry in lockstep.
+    A ``Retry-After`` header sent by the server takes precedence over the computed delay, though it is also capped at
+    ``backoff_max``.
+
+    With a ``budget``, retries are additionally limited to that fraction of the requests made using the policy (plus
+    ``budget_min`` retries to get started), so a widespread outage doesn't multiply the load on the Pushover servers.
+    Only about the last ``budget_window`` requests count towards the budget, so that a long healthy period doesn't save
+    up enough retries to retry every request of an outage.
+    The policy may be shared between several instances to give them a common budget.
+
+    :param max_attempts: The maximum number of times a request is attempted, including the first try
+    :param backoff_base: The delay in seconds before the first retry
+    :param backoff_max: The maximum delay in seconds before any retry
+    :param jitter: Whether to randomize the delays
+    :param budget: (optional) The fraction of requests that may be retried, e.g. ``0.1`` for 10%
+    :param budget_min: The number of retries allowed by the budget before any requests have been made
+    :param budget_window: The number of recent requests whose retries the budget saves up
+    :type max_attempts: int
+    :type backoff_base: float
+    :type backoff_max: float
+    :type jitter: bool
+    :type budget: float
+    :type budget_min: int
+    :type budget_window: int
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        max_attempts=3,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        jitter=True,  # noqa: FBT002
+        budget=None,
+        budget_min=10,
+        *,
+        budget_window=100,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.budget = budget
+        self._budget_lock = threading.Lock()
+        self._budget_tokens = float(budget_min)
+        self._budget_max = budget_min + (budget or 0) * budget_window
+
+    def record_request(self):
+        """Record that a new (non-retry) request is being made, adding to the retry budget."""
+        if self.budget is not None:
+            with self._budget_lock:
+                self._budget_tokens = min(self._budget_max, self._budget_tokens + self.budget)
+
+    def should_retry(self, attempt, status_code=None):
+        """
+        Decide whether a failed attempt at a request should be retried, withdrawing from the retry budget if so.
+
+        :param attempt: The number of the attempt that failed, starting at 1
+        :param status_code: The HTTP status code of the response, or ``None`` if the request failed without a response
+            (e.g. the connection could not be made)
+        :type attempt: int
+        :type status_code: int
+
+        :returns: Whether to retry the request
+        :rtype: bool
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if status_code is not None and status_code not in RETRYABLE_STATUS_CODES:
+            return False
+        if self.budget is None:
+            return True
+        with self._budget_lock:
+            if self._budget_tokens < 1:
+                return False
+            self._budget_tokens -= 1
+            return True
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Calculate how long to wait before retrying a failed attempt at a request.
+
+        :param attempt: The number of the attempt that failed, starting at 1
+        :param retry_after: (optional) The value of the ``Retry-After`` header of the response, if any
+        :type attempt: int
+        :type retry_after: str
+
+        :returns: The number of seconds to wait
+        :rtype: float
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            # a buggy or hostile server mustn't be able to stall the caller indefinitely
+            return min(self.backoff_max, server_delay)
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)  # noqa: S311 -- not used for cryptography
+        return delay
+
+
+def parse_retry_after(value):
+    """
+    Parse the value of a ``Retry-After`` header.
+
+    :param value: The header value, either a number of seconds or an HTTP date
+    :type value: str
+
+    :returns: The number of seconds to wait, or ``None`` if there is no valid value
+    :rtype: float or None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
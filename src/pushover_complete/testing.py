@@ -0,0 +1,698 @@
+"""A fake Pushover API served over real HTTP on localhost, for testing and load-testing applications."""
+
+import collections
+import collections.abc
+import json
+import random
+import re
+import ssl
+import string
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .validation import EMERGENCY_PRIORITY, MAX_ATTACHMENT_SIZE, MAX_USERS, message_problems
+
+#: The sounds built into the Pushover apps, by name
+SOUNDS = {
+    "pushover": "Pushover (default)",
+    "bike": "Bike",
+    "bugle": "Bugle",
+    "cashregister": "Cash Register",
+    "classical": "Classical",
+    "cosmic": "Cosmic",
+    "falling": "Falling",
+    "gamelan": "Gamelan",
+    "incoming": "Incoming",
+    "intermission": "Intermission",
+    "magic": "Magic",
+    "mechanical": "Mechanical",
+    "pianobar": "Piano Bar",
+    "siren": "Siren",
+    "spacealarm": "Space Alarm",
+    "tugboat": "Tug Boat",
+    "alien": "Alien Alarm (long)",
+    "climb": "Climb (long)",
+    "persistent": "Persistent (long)",
+    "echo": "Pushover Echo (long)",
+    "updown": "Up Down (long)",
+    "vibrate": "Vibrate Only",
+    "none": "None (silent)",
+}
+
+# application tokens, user keys, group keys and receipts are all 30 letters and digits
+_KEY_RE = re.compile(r"[A-Za-z0-9]{30}")
+_BOUNDARY_RE = re.compile(r"boundary=([^;]+)")
+_NAME_RE = re.compile(r'\bname="([^"]*)"')
+
+_INVALID_USER = "user identifier is not a valid user, group, or subscribed user key"
+_GROUP_NOT_FOUND = "group not found or you are not authorized to edit it"
+
+
+def _new_key(prefix, rng):
+    """
+    Make up a key in the format of the Pushover API's keys.
+
+    :param prefix: The first letter of the key, e.g. ``"r"`` for a receipt
+    :param rng: The random number generator to use
+    :type prefix: str
+    :type rng: random.Random
+
+    :rtype: str
+    """
+    return prefix + "".join(rng.choices(string.ascii_letters + string.digits, k=29))
+
+
+def _parse_form(content_type, body):
+    """
+    Parse the form fields of a request body, URL-encoded or multipart.
+
+    :param content_type: The Content-Type header of the request
+    :param body: The request body
+    :type content_type: str
+    :type body: bytes
+
+    :returns: The fields, with an attachment kept as bytes and everything else as str
+    :rtype: dict
+    """
+    if not content_type.startswith("multipart/form-data"):
+        return dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+    # split the parts by hand: the email package is an order of magnitude slower on large attachments
+    boundary = _BOUNDARY_RE.search(content_type).group(1).strip('"').encode("latin-1")
+    fields = {}
+    for part in body.split(b"--" + boundary)[1:-1]:
+        headers, _, content = part.partition(b"\r\n\r\n")
+        name = _NAME_RE.search(headers.decode("utf-8")).group(1)
+        content = content[: -len(b"\r\n")]
+        fields[name] = content if name == "attachment" else content.decode("utf-8")
+    return fields
+
+
+def _error(problems, status=400, headers=None):
+    """
+    Build an error response listing problems with a request.
+
+    :param problems: The problems, as ``(field, description)`` tuples
+    :param status: The HTTP status code
+    :param headers: (optional) Extra headers
+    :type problems: list[tuple(str, str)]
+    :type status: int
+    :type headers: dict[str, str]
+
+    :returns: The status code, the extra headers and the body of the response
+    :rtype: tuple(int, dict[str, str], dict)
+    """
+    body = {field: "invalid" for field, _ in problems}
+    body["errors"] = [description for _, description in problems]
+    return status, headers or {}, body
+
+
+class _Server(ThreadingHTTPServer):
+    """A threading HTTP server that keeps a reference to the :class:`FakePushoverServer` it serves."""
+
+    daemon_threads = True
+    # the default backlog of 5 drops connections when many clients connect at once
+    request_queue_size = 1024
+
+    def __init__(self, address, fake):
+        super().__init__(address, _Handler)
+        self.fake = fake
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer a request to the Pushover API from the state of the :class:`FakePushoverServer`."""
+
+    # keep connections alive, as the Pushover servers do
+    protocol_version = "HTTP/1.1"
+    # the headers and body are written separately, which Nagle's algorithm would delay by tens of milliseconds
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002 -- the name is set by BaseHTTPRequestHandler
+        """Don't log every request."""
+
+    def do_GET(self):
+        """Answer a GET request."""
+        self._answer("GET")
+
+    def do_POST(self):
+        """Answer a POST request."""
+        self._answer("POST")
+
+    def _answer(self, method):
+        """
+        Read the request and send the response worked out by the :class:`FakePushoverServer`.
+
+        :param method: The HTTP method of the request
+        :type method: str
+        """
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if body:
+            params.update(_parse_form(self.headers.get("Content-Type", ""), body))
+        status, headers, resp_body = self.server.fake.respond(method, url.path, params)
+
+        content = json.dumps(resp_body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakePushoverServer:
+    """
+    Serve a fake Pushover API on localhost, from a background thread, to test applications without the real API.
+
+    Point a :class:`PushoverAPI` or :class:`AsyncPushoverAPI` at it by giving it :attr:`FakePushoverServer.url` as its
+    ``api_url``. Requests are checked against the same rules as the real API, and rejected with the same kind of error
+    response:
+
+    - tokens, user keys and group keys must be 30 letters and digits, and only ``token`` and ``users`` are accepted if
+      they are given
+    - messages must not be blank or longer than 1024 characters, titles longer than 250, URLs longer than 512, and URL
+      titles longer than 100
+    - the priority must be from -2 to 2, and emergency-priority messages need a ``retry`` of at least 30 seconds and an
+      ``expire`` of at most 10800 seconds
+    - sounds must be one of :data:`SOUNDS`, and attachments must be no larger than 5 MB
+
+    Every problem with a message is reported at once. Each message accepted uses up the quota, once for each user and
+    once for each enabled member of each group it is sent to, and the remaining quota is reported in the
+    ``X-Limit-App-*`` headers. Once it is used up, messages are refused with a 429 error.
+
+    For load tests, ``latency`` delays every response and ``error_rate`` fails a random fraction of requests with a
+    500 error.
+
+    Delivery groups must be created with :meth:`FakePushoverServer.add_group` before they can be used. Emergency
+    messages get a receipt, which can be acknowledged with :meth:`FakePushoverServer.acknowledge`.
+
+    Use as a context manager, or call :meth:`FakePushoverServer.start` and :meth:`FakePushoverServer.stop`.
+
+    :param token: (optional) The only application token accepted. Any well-formed token is accepted if omitted.
+    :param users: (optional) The only user keys accepted, or a mapping of user keys to the names of their devices. Any
+        well-formed user key is accepted, with any device, if omitted.
+    :param quota: The number of messages the application may send
+    :param latency: How long, in seconds, to wait before answering each request
+    :param error_rate: The fraction of requests, from 0 to 1, answered with a 500 error
+    :param certfile: (optional) The path of a PEM file with the certificate and private key to serve HTTPS with
+    :param seed: (optional) The seed for choosing the requests that fail, to make runs repeatable
+    :param history: The number of accepted messages to keep in :attr:`FakePushoverServer.messages`
+    :type token: str
+    :type users: iterable or dict[str, list[str]]
+    :type quota: int
+    :type latency: float
+    :type error_rate: float
+    :type certfile: str
+    :type seed: int
+    :type history: int
+
+    .. attribute:: messages
+
+        The most recent messages accepted, oldest first, as dicts of their form fields. An attachment is kept as bytes.
+
+    .. attribute:: remaining
+
+        The number of messages left in the quota. May be changed, e.g. to test running out of quota.
+
+    .. attribute:: requests
+
+        The number of requests answered so far
+    """
+
+    #: The endpoints served, as ``(method, path regex, handler method name)``
+    ROUTES = (
+        ("POST", r"messages\.json", "_send"),
+        ("GET", r"sounds\.json", "_sounds"),
+        ("GET", r"apps/limits\.json", "_limits"),
+        ("POST", r"users/validate\.json", "_validate"),
+        ("GET", r"receipts/(\w+)\.json", "_receipt"),
+        ("POST", r"receipts/(\w+)/cancel\.json", "_cancel_receipt"),
+        ("POST", r"subscriptions/migrate\.json", "_migrate"),
+        ("POST", r"licenses/assign\.json", "_assign_license"),
+        ("GET", r"groups/(\w+)\.json", "_group_info"),
+        ("POST", r"groups/(\w+)/rename\.json", "_rename_group"),
+        ("POST", r"groups/(\w+)/(add_user|delete_user|disable_user|enable_user)\.json", "_change_group"),
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        token=None,
+        users=None,
+        *,
+        quota=10000,
+        latency=0.0,
+        error_rate=0.0,
+        certfile=None,
+        seed=None,
+        history=1000,
+    ):
+        self.token = token
+        if users is not None and not isinstance(users, collections.abc.Mapping):
+            users = dict.fromkeys(users, ())
+        self.users = users
+        self.quota = quota
+        self.remaining = quota
+        self.latency = latency
+        self.error_rate = error_rate
+        self.certfile = certfile
+        self.messages = collections.deque(maxlen=history)
+        self.requests = 0
+
+        # the quota resets at the start of next month on the real servers; a day is enough here
+        self.reset = int(time.time()) + 86400
+        self._groups = {}
+        self._receipts = {}
+        self._routes = [(method, re.compile(f"/1/{path}"), handler) for method, path, handler in self.ROUTES]
+        self._random = random.Random(seed)  # noqa: S311 -- not used for anything secret
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        """Start the server, returning this instance."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the server."""
+        self.stop()
+
+    @property
+    def url(self):
+        """
+        The base URL of the fake API, to be given to the client as its ``api_url``.
+
+        :rtype: str
+        """
+        host, port = self._server.server_address[:2]
+        scheme = "http" if self.certfile is None else "https"
+        return f"{scheme}://{host}:{port}/1/"
+
+    def start(self):
+        """Start serving on a free port of 127.0.0.1."""
+        self._server = _Server(("127.0.0.1", 0), self)
+        if self.certfile is not None:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certfile)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-pushover", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the listening socket. Does nothing if the server isn't running."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def add_group(self, group_key=None, name="", users=()):
+        """
+        Create a delivery group.
+
+        :param group_key: (optional) The group key. Made up if omitted.
+        :param name: The name of the group
+        :param users: The user keys of the group's members
+        :type group_key: str
+        :type name: str
+        :type users: iterable
+
+        :returns: The group key
+        :rtype: str
+        """
+        with self._lock:
+            if group_key is None:
+                group_key = _new_key("g", self._random)
+            members = [{"user": user, "device": "", "memo": "", "disabled": False} for user in users]
+            self._groups[group_key] = {"name": name, "users": members}
+        return group_key
+
+    def acknowledge(self, receipt, user, device=""):
+        """
+        Acknowledge an emergency message, as the user would from their device.
+
+        :param receipt: The receipt of the message
+        :param user: The user key of the user acknowledging the message
+        :param device: The name of the device the message is acknowledged from
+        :type receipt: str
+        :type user: str
+        :type device: str
+
+        :raises KeyError: Raised when there is no message with the receipt.
+        """
+        with self._lock:
+            status = self._receipts[receipt]
+            status.update(
+                acknowledged=1,
+                acknowledged_at=int(time.time()),
+                acknowledged_by=user,
+                acknowledged_by_device=device,
+            )
+
+    def respond(self, method, path, params):
+        """
+        Work out the response to a request, as the Pushover API would.
+
+        :param method: The HTTP method of the request
+        :param path: The path of the request, e.g. ``"/1/messages.json"``
+        :param params: The form fields and query parameters of the request
+        :type method: str
+        :type path: str
+        :type params: dict
+
+        :returns: The status code, the headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        request = uuid.uuid4().hex
+        with self._lock:
+            self.requests += 1
+            status, headers, body = self._route(method, path, params)
+        body.update(status=1 if status == 200 else 0, request=request)  # noqa: PLR2004 -- HTTP OK
+        return status, {"X-Request-Id": request, **headers}, body
+
+    def _route(self, method, path, params):
+        """
+        Pass a request to the method handling its endpoint. Must be called with the lock held.
+
+        :param method: The HTTP method of the request
+        :param path: The path of the request
+        :param params: The form fields and query parameters of the request
+        :type method: str
+        :type path: str
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response, without its status and request ID
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        if self._random.random() < self.error_rate:
+            return 500, {}, {"errors": ["simulated server error"]}
+        for route_method, route_re, handler in self._routes:
+            match = route_re.fullmatch(path)
+            if match is not None and route_method == method:
+                return self._authorized(params, handler, match.groups())
+        return 404, {}, {"errors": ["not found"]}
+
+    def _authorized(self, params, handler, args):
+        """
+        Check the application token of a request, then pass it to the method handling its endpoint.
+
+        :param params: The form fields and query parameters of the request
+        :param handler: The name of the method handling the endpoint
+        :param args: The parts of the path passed to the method, e.g. the group key
+        :type params: dict
+        :type handler: str
+        :type args: tuple(str)
+
+        :returns: The status code, the extra headers and the body of the response, without its status and request ID
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        token = params.get("token") or ""
+        if not _KEY_RE.fullmatch(token) or (self.token is not None and token != self.token):
+            return _error([("token", "application token is invalid")])
+        return getattr(self, handler)(params, *args)
+
+    def _is_user(self, user):
+        """
+        Check whether a key is an accepted user key. Must be called with the lock held.
+
+        :param user: The key
+        :type user: str
+
+        :rtype: bool
+        """
+        return bool(_KEY_RE.fullmatch(user)) and (self.users is None or user in self.users)
+
+    def _rate_limit_headers(self):
+        """
+        Get the headers reporting the application's message quota.
+
+        :rtype: dict[str, str]
+        """
+        return {
+            "X-Limit-App-Limit": str(self.quota),
+            "X-Limit-App-Remaining": str(max(self.remaining, 0)),
+            "X-Limit-App-Reset": str(self.reset),
+        }
+
+    def _recipients(self, params, problems):
+        """
+        Check the users a message is sent to and count the messages it uses up from the quota.
+
+        :param params: The form fields of the request
+        :param problems: The problems found so far, to add to
+        :type params: dict
+        :type problems: list[tuple(str, str)]
+
+        :returns: The number of messages used up from the quota
+        :rtype: int
+        """
+        users = [user.strip() for user in params.get("user", "").split(",")]
+        if len(users) > MAX_USERS:
+            problems.append(("user", f"a message cannot be sent to more than {MAX_USERS} users at once"))
+        cost = 0
+        for user in users:
+            if user in self._groups:
+                cost += sum(not member["disabled"] for member in self._groups[user]["users"])
+            elif self._is_user(user):
+                cost += 1
+            else:
+                problems.append(("user", _INVALID_USER))
+                break
+        return cost
+
+    def _send(self, params):
+        """
+        Handle ``messages.json``: check the message and use up the quota.
+
+        :param params: The form fields of the request
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        problems = []
+        cost = self._recipients(params, problems)
+        problems.extend(message_problems(params, SOUNDS))
+        if params.get("html") == "1" and params.get("monospace") == "1":
+            problems.append(("monospace", "html and monospace cannot both be set"))
+        attachment = params.get("attachment")
+        if attachment is not None and len(attachment) > MAX_ATTACHMENT_SIZE:
+            problems.append(("attachment", f"attachment cannot be larger than {MAX_ATTACHMENT_SIZE} bytes"))
+        if problems:
+            return _error(problems, headers=self._rate_limit_headers())
+        if cost > self.remaining:
+            return _error([("limit", "application is over its message quota")], 429, self._rate_limit_headers())
+
+        self.remaining -= cost
+        self.messages.append(params)
+        body = {}
+        if int(params.get("priority") or 0) == EMERGENCY_PRIORITY:
+            now = int(time.time())
+            body["receipt"] = _new_key("r", self._random)
+            self._receipts[body["receipt"]] = {
+                "acknowledged": 0,
+                "acknowledged_at": 0,
+                "acknowledged_by": "",
+                "acknowledged_by_device": "",
+                "last_delivered_at": now,
+                "expired": 0,
+                "expires_at": now + int(params["expire"]),
+                "called_back": 0,
+                "called_back_at": 0,
+            }
+        return 200, self._rate_limit_headers(), body
+
+    def _sounds(self, params):  # noqa: ARG002 -- every handler takes the request's fields
+        """
+        Handle ``sounds.json``.
+
+        :param params: The form fields of the request
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        return 200, {}, {"sounds": dict(SOUNDS)}
+
+    def _limits(self, params):  # noqa: ARG002 -- every handler takes the request's fields
+        """
+        Handle ``apps/limits.json``.
+
+        :param params: The form fields of the request
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        return 200, {}, {"limit": self.quota, "remaining": max(self.remaining, 0), "reset": self.reset}
+
+    def _validate(self, params):
+        """
+        Handle ``users/validate.json``.
+
+        :param params: The form fields of the request
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        user = params.get("user", "")
+        if user in self._groups:
+            return 200, {}, {"group": 1, "devices": [], "licenses": []}
+        if not self._is_user(user):
+            return _error([("user", _INVALID_USER)])
+        devices = [] if self.users is None else list(self.users[user])
+        device = params.get("device")
+        if device and self.users is not None and device not in devices:
+            return _error([("device", "device name is not valid for this user")])
+        return 200, {}, {"group": 0, "devices": devices, "licenses": ["Android", "iOS", "Desktop"]}
+
+    def _receipt(self, params, receipt):  # noqa: ARG002 -- every handler takes the request's fields
+        """
+        Handle ``receipts/{receipt}.json``.
+
+        :param params: The form fields of the request
+        :param receipt: The receipt requested
+        :type params: dict
+        :type receipt: str
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        status = self._receipts.get(receipt)
+        if status is None:
+            return _error([("receipt", "receipt not found; may be invalid or expired")], 404)
+        if not status["expired"] and status["expires_at"] <= time.time():
+            status["expired"] = 1
+        return 200, {}, dict(status)
+
+    def _cancel_receipt(self, params, receipt):  # noqa: ARG002 -- every handler takes the request's fields
+        """
+        Handle ``receipts/{receipt}/cancel.json``: stop retrying the emergency message.
+
+        :param params: The form fields of the request
+        :param receipt: The receipt to cancel
+        :type params: dict
+        :type receipt: str
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        status = self._receipts.get(receipt)
+        if status is None:
+            return _error([("receipt", "receipt not found; may be invalid or expired")], 404)
+        status.update(expired=1, expires_at=min(status["expires_at"], int(time.time())))
+        return 200, {}, {}
+
+    def _migrate(self, params):
+        """
+        Handle ``subscriptions/migrate.json``.
+
+        :param params: The form fields of the request
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        if not params.get("subscription"):
+            return _error([("subscription", "subscription token is invalid")])
+        if not self._is_user(params.get("user", "")):
+            return _error([("user", "user key is not valid for any active user")])
+        return 200, {}, {"subscribed_user_key": _new_key("s", self._random)}
+
+    def _assign_license(self, params):
+        """
+        Handle ``licenses/assign.json``.
+
+        :param params: The form fields of the request
+        :type params: dict
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        if params.get("user"):
+            if not self._is_user(params["user"]):
+                return _error([("user", _INVALID_USER)])
+        elif not params.get("email"):
+            return _error([("user", "user or email must be supplied")])
+        return 200, {}, {}
+
+    def _group_info(self, params, group_key):  # noqa: ARG002 -- every handler takes the request's fields
+        """
+        Handle ``groups/{group_key}.json``.
+
+        :param params: The form fields of the request
+        :param group_key: The group requested
+        :type params: dict
+        :type group_key: str
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        group = self._groups.get(group_key)
+        if group is None:
+            return _error([("group", _GROUP_NOT_FOUND)])
+        return 200, {}, {"name": group["name"], "users": [dict(member) for member in group["users"]]}
+
+    def _rename_group(self, params, group_key):
+        """
+        Handle ``groups/{group_key}/rename.json``.
+
+        :param params: The form fields of the request
+        :param group_key: The group to rename
+        :type params: dict
+        :type group_key: str
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        group = self._groups.get(group_key)
+        if group is None:
+            return _error([("group", _GROUP_NOT_FOUND)])
+        if not params.get("name"):
+            return _error([("name", "name cannot be blank")])
+        group["name"] = params["name"]
+        return 200, {}, {}
+
+    def _change_group(self, params, group_key, action):
+        """
+        Handle the endpoints changing a group's members: ``groups/{group_key}/{action}.json``.
+
+        :param params: The form fields of the request
+        :param group_key: The group to change
+        :param action: The change: ``"add_user"``, ``"delete_user"``, ``"disable_user"`` or ``"enable_user"``
+        :type params: dict
+        :type group_key: str
+        :type action: str
+
+        :returns: The status code, the extra headers and the body of the response
+        :rtype: tuple(int, dict[str, str], dict)
+        """
+        group = self._groups.get(group_key)
+        if group is None:
+            return _error([("group", _GROUP_NOT_FOUND)])
+        user = params.get("user", "")
+        if not self._is_user(user):
+            return _error([("user", "user key is invalid")])
+        members = [member for member in group["users"] if member["user"] == user]
+        if action == "add_user":
+            if members:
+                return _error([("user", "user is already a member of this group")])
+            member = {"user": user, "device": params.get("device", ""), "memo": params.get("memo", "")}
+            group["users"].append(dict(member, disabled=False))
+        elif not members:
+            return _error([("user", "user is not a member of this group")])
+        elif action == "delete_user":
+            group["users"] = [member for member in group["users"] if member["user"] != user]
+        else:
+            for member in members:
+                member["disabled"] = action == "disable_user"
+        return 200, {}, {}
@@ -0,0 +1,208 @@
+"""Checks of messages against the rules of the Pushover API, made before the messages are sent."""
+
+import threading
+import time
+
+from .error import MessageValidationError
+
+#: The most characters allowed in a message
+MAX_MESSAGE_LENGTH = 1024
+#: The most characters allowed in a message's title
+MAX_TITLE_LENGTH = 250
+#: The most characters allowed in a supplementary URL
+MAX_URL_LENGTH = 512
+#: The most characters allowed in a supplementary URL's title
+MAX_URL_TITLE_LENGTH = 100
+#: The largest attachment allowed, in bytes
+MAX_ATTACHMENT_SIZE = 5 * 1024 * 1024
+#: The most users a single message can be sent to, separated by commas
+MAX_USERS = 50
+#: The valid message priorities
+PRIORITIES = (-2, -1, 0, 1, 2)
+#: The priority of emergency messages, which require ``retry`` and ``expire``
+EMERGENCY_PRIORITY = 2
+#: The shortest interval allowed between retries of an emergency message, in seconds
+MIN_RETRY = 30
+#: The longest an emergency message may be retried for, in seconds
+MAX_EXPIRE = 10800
+
+_TEXT_LIMITS = (
+    ("message", MAX_MESSAGE_LENGTH),
+    ("title", MAX_TITLE_LENGTH),
+    ("url", MAX_URL_LENGTH),
+    ("url_title", MAX_URL_TITLE_LENGTH),
+)
+
+
+def _integer(fields, field, problems):
+    """
+    Get an optional integer field, noting a problem if it isn't an integer.
+
+    :param fields: The fields of the message
+    :param field: The name of the field
+    :param problems: The problems found so far, to add to
+    :type fields: dict
+    :type field: str
+    :type problems: list[tuple(str, str)]
+
+    :returns: The value, or ``None`` if it is missing or invalid
+    :rtype: int
+    """
+    value = fields.get(field)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        problems.append((field, f"{field} must be an integer"))
+        return None
+
+
+def _check_priority(fields, problems):
+    """
+    Check the priority of a message, and the ``retry`` and ``expire`` required by emergency messages.
+
+    :param fields: The fields of the message
+    :param problems: The problems found so far, to add to
+    :type fields: dict
+    :type problems: list[tuple(str, str)]
+    """
+    priority = _integer(fields, "priority", problems)
+    retry = _integer(fields, "retry", problems)
+    expire = _integer(fields, "expire", problems)
+    if priority is not None and priority not in PRIORITIES:
+        problems.append(("priority", "priority is invalid"))
+    if priority != EMERGENCY_PRIORITY:
+        return
+    if retry is None:
+        problems.append(("retry", "retry must be supplied with priority=2"))
+    elif retry < MIN_RETRY:
+        problems.append(("retry", f"retry must be at least {MIN_RETRY} seconds"))
+    if expire is None:
+        problems.append(("expire", "expire must be supplied with priority=2"))
+    elif expire > MAX_EXPIRE:
+        problems.append(("expire", f"expire cannot be more than {MAX_EXPIRE} seconds"))
+
+
+def message_problems(fields, sounds=None):
+    """
+    Find every way in which a message breaks the rules of the Pushover API.
+
+    Only the message's own fields are checked, not whether its user, device or application token are valid.
+
+    :param fields: The fields of the message, named as in a request to the Pushover API (``message``, ``title``,
+        ``priority``, ...). Missing fields may be left out or ``None``.
+    :param sounds: (optional) The names of the sounds available to the application. The sound isn't checked if omitted.
+    :type fields: dict
+    :type sounds: collection
+
+    :returns: The problems found, as ``(field, description)`` tuples
+    :rtype: list[tuple(str, str)]
+    """
+    problems = []
+    message = fields.get("message")
+    if message is None or not str(message).strip():
+        problems.append(("message", "message cannot be blank"))
+    for field, limit in _TEXT_LIMITS:
+        value = fields.get(field)
+        if value is not None and len(str(value)) > limit:
+            problems.append((field, f"{field} cannot be longer than {limit} characters"))
+    _check_priority(fields, problems)
+    sound = fields.get("sound")
+    if sounds is not None and sound and sound not in sounds:
+        problems.append(("sound", "sound is invalid"))
+    return problems
+
+
+class MessageValidator:
+    """
+    Check messages against the rules of the Pushover API before they are sent, so doomed messages fail straight away.
+
+    Give a :class:`MessageValidator` to :class:`PushoverAPI` (or :class:`AsyncPushoverAPI`) as its ``validator`` to
+    check every message it sends, including those of :meth:`PushoverAPI.send_messages` and :meth:`PushoverAPI.submit`.
+    A message breaking any rule raises a :class:`MessageValidationError` listing every problem found, without a request
+    to the Pushover API or using up the quota. The rules checked are:
+
+    - the message must not be blank, and the message, title, URL and URL title must not be too long
+    - the priority must be from -2 to 2
+    - emergency-priority messages need a ``retry`` of at least 30 seconds and an ``expire`` of at most 10800 seconds
+    - with ``check_sounds``, the sound must be one of those available to the application
+
+    The list of sounds is fetched with :meth:`PushoverAPI.get_sounds` when a message with a sound is first checked, and
+    kept for ``sounds_ttl`` seconds.
+
+    The validator is safe to share between threads and between API instances using the same application token.
+
+    :param check_sounds: If true, also check that the sound of each message is available to the application
+    :param sounds_ttl: How long, in seconds, to keep the list of sounds before fetching it again
+    :type check_sounds: bool
+    :type sounds_ttl: float
+    """
+
+    def __init__(self, check_sounds=False, sounds_ttl=86400.0):  # noqa: FBT002
+        self.check_sounds = check_sounds
+        self.sounds_ttl = sounds_ttl
+
+        self._sounds = None
+        self._expires_at = None
+        self._lock = threading.Lock()
+
+    def needs_sounds(self, fields, now=None):
+        """
+        Check whether the list of sounds must be fetched before a message can be checked.
+
+        :param fields: The fields of the message
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type fields: dict
+        :type now: float
+
+        :rtype: bool
+        """
+        if not self.check_sounds or not fields.get("sound"):
+            return False
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            return self._sounds is None or self._expires_at <= now
+
+    def update_sounds(self, sounds, now=None):
+        """
+        Keep the list of sounds available to the application.
+
+        :param sounds: The sounds, as returned by :meth:`PushoverAPI.get_sounds`, or just their names
+        :param now: The current time, from :func:`time.monotonic`. Defaults to the actual current time.
+        :type sounds: dict or iterable
+        :type now: float
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self._sounds = frozenset(sounds)
+            self._expires_at = now + self.sounds_ttl
+
+    def check(self, fields):
+        """
+        Find every way in which a message breaks the rules of the Pushover API.
+
+        :param fields: The fields of the message, named as in a request to the Pushover API
+        :type fields: dict
+
+        :returns: The descriptions of the problems found
+        :rtype: list[str]
+        """
+        with self._lock:
+            sounds = self._sounds if self.check_sounds else None
+        return [description for _, description in message_problems(fields, sounds)]
+
+    def validate(self, fields):
+        """
+        Check a message, raising if it breaks any rule of the Pushover API.
+
+        :param fields: The fields of the message, named as in a request to the Pushover API
+        :type fields: dict
+
+        :raises MessageValidationError: Raised when the message breaks any rule, listing every problem.
+        """
+        problems = self.check(fields)
+        if problems:
+            raise MessageValidationError(problems)
@@ -0,0 +1,455 @@
+"""Tests for the :mod:`pushover_complete.async_pushover_api.AsyncPushoverAPI` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import asyncio
+import base64
+from io import BytesIO
+
+import httpx
+import pytest
+
+from pushover_complete import async_pushover_api
+from pushover_complete.attachments import AttachmentCache
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.groups import GroupChange
+from pushover_complete.rate_limit import RateLimit
+from pushover_complete.response_cache import ResponseCache
+from pushover_complete.results import MessageResult, ValidationResult
+from pushover_complete.retry import RetryPolicy
+from tests.constants import (
+    SOUNDS,
+    TEST_APP_LIMIT,
+    TEST_APP_REMAINING,
+    TEST_APP_RESET,
+    TEST_BAD_GENERAL_ID,
+    TEST_DEVICES,
+    TEST_GROUP,
+    TEST_GROUP_NAME,
+    TEST_IMAGE_BYTES,
+    TEST_MESSAGE,
+    TEST_RECEIPT_ID,
+    TEST_REQUEST_ID,
+    TEST_SUBSCRIBED_USER_KEY,
+    TEST_SUBSCRIPTION_CODE,
+    TEST_TITLE,
+    TEST_TOKEN,
+    TEST_USER,
+    TEST_USER_EMAIL,
+)
+from tests.fixtures import (  # noqa: F401 -- needs to be imported for pytest to find them
+    AsyncPushoverAPI,
+    BadTokenAsyncPushoverAPI,
+)
+from tests.httpx_transport import callback_transport
+from tests.responses_callbacks import messages_callback
+
+
+def run(api, coro):
+    """Run a coroutine to completion, closing the API's client afterwards."""
+
+    async def runner():
+        """Await the coroutine with the instance open."""
+        async with api:
+            return await coro
+
+    return asyncio.run(runner())
+
+
+def test_AsyncPushoverAPI_sends_simple_message(AsyncPushoverAPI):
+    """Test the sending of a simple message."""
+    resp = run(AsyncPushoverAPI, AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE))
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+
+
+def test_AsyncPushoverAPI_sends_to_given_api_url():
+    """Test that requests go to the base URL given to the constructor."""
+    transport = callback_transport([("POST", r"http://127\.0\.0\.1:8080/1/messages\.json", messages_callback)])
+    api = async_pushover_api.AsyncPushoverAPI(
+        TEST_TOKEN, client=httpx.AsyncClient(transport=transport), api_url="http://127.0.0.1:8080/1/"
+    )
+    resp = run(api, api.send_message(TEST_USER, TEST_MESSAGE))
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+
+
+def test_AsyncPushoverAPI_sends_complex_message(AsyncPushoverAPI):
+    """Test sending a more complex message."""
+    resp = run(
+        AsyncPushoverAPI,
+        AsyncPushoverAPI.send_message(
+            TEST_USER, TEST_MESSAGE, device=TEST_DEVICES[0], title=TEST_TITLE, priority=1, sound="gamelan"
+        ),
+    )
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+
+
+def test_AsyncPushoverAPI_takes_message_options_by_keyword_only(AsyncPushoverAPI):
+    """Test that the options of a message can't be given by position, so their order can change."""
+    with pytest.raises(TypeError):
+        AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE, TEST_DEVICES[0])
+
+
+def test_AsyncPushoverAPI_sends_message_with_image(AsyncPushoverAPI, tmpdir):
+    """Test the sending of image attachments from a file-like and from a path."""
+    img_path = tmpdir.join("pushover.png")
+    img_path.write_binary(TEST_IMAGE_BYTES)
+
+    async def send_both():
+        """Send the image as a file-like object and as a path."""
+        return [
+            await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=BytesIO(TEST_IMAGE_BYTES)),
+            await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=img_path.strpath),
+        ]
+
+    resps = run(AsyncPushoverAPI, send_both())
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID}] * 2
+
+
+def test_AsyncPushoverAPI_sends_message_with_image_from_buffer(AsyncPushoverAPI):
+    """Test the sending of image attachments from bytes-like objects and as base64."""
+
+    async def send_all():
+        """Send the image as bytes, as a memoryview and base64-encoded."""
+        return [
+            await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=TEST_IMAGE_BYTES),
+            await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=memoryview(TEST_IMAGE_BYTES)),
+            await AsyncPushoverAPI.send_message(
+                TEST_USER,
+                TEST_MESSAGE,
+                attachment_base64=base64.b64encode(TEST_IMAGE_BYTES).decode("ascii"),
+                attachment_type="image/png",
+            ),
+        ]
+
+    resps = run(AsyncPushoverAPI, send_all())
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID}] * 3
+
+
+def test_AsyncPushoverAPI_sends_cached_attachments(AsyncPushoverAPI, tmp_path):
+    """Test that images given as paths are read through the attachment cache."""
+    img_path = tmp_path / "pushover.png"
+    img_path.write_bytes(TEST_IMAGE_BYTES)
+    AsyncPushoverAPI.attachment_cache = AttachmentCache()
+
+    async def send_twice():
+        """Send the same image twice."""
+        return [await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=img_path) for _ in range(2)]
+
+    resps = run(AsyncPushoverAPI, send_twice())
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID}] * 2
+    assert (AsyncPushoverAPI.attachment_cache.hits, AsyncPushoverAPI.attachment_cache.misses) == (1, 1)
+
+
+def test_AsyncPushoverAPI_raises_error_on_bad_message(AsyncPushoverAPI):
+    """Test proper error behavior when a malformed message is sent."""
+    with pytest.raises(BadAPIRequestError):
+        run(AsyncPushoverAPI, AsyncPushoverAPI.send_message(TEST_BAD_GENERAL_ID, TEST_MESSAGE))
+
+
+def test_AsyncPushoverAPI_sends_multiple_messages(AsyncPushoverAPI):
+    """Test sending multiple messages concurrently."""
+    messages = [{"user": TEST_USER, "message": TEST_MESSAGE}] * 5
+    resps = run(AsyncPushoverAPI, AsyncPushoverAPI.send_messages(messages))
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID}] * 5
+
+
+def test_AsyncPushoverAPI_sends_multiple_messages_with_bounded_concurrency(AsyncPushoverAPI):
+    """Test sending multiple messages with a limit on the number in flight, collecting errors in place."""
+    messages = [{"user": TEST_USER, "message": TEST_MESSAGE}] * 5 + [{"user": TEST_BAD_GENERAL_ID, "message": "x"}]
+    resps = run(AsyncPushoverAPI, AsyncPushoverAPI.send_messages(messages, max_in_flight=2, return_exceptions=True))
+
+    assert resps[:5] == [{"status": 1, "request": TEST_REQUEST_ID}] * 5
+    assert isinstance(resps[5], BadAPIRequestError)
+
+
+def test_AsyncPushoverAPI_streams_multiple_messages(AsyncPushoverAPI):
+    """Test sending an asynchronous stream of messages, yielding each message with its outcome."""
+
+    async def messages():
+        """Yield messages, some of them to an invalid user."""
+        for i in range(10):
+            yield {"user": TEST_BAD_GENERAL_ID if i % 4 == 0 else TEST_USER, "message": f"{TEST_MESSAGE} {i}"}
+
+    async def collect():
+        """Collect the outcome of every message."""
+        return [outcome async for outcome in AsyncPushoverAPI.iter_send_messages(messages(), max_in_flight=3)]
+
+    outcomes = run(AsyncPushoverAPI, collect())
+
+    assert sorted(message["message"] for message, _ in outcomes) == [f"{TEST_MESSAGE} {i}" for i in range(10)]
+    for message, resp in outcomes:
+        if message["user"] == TEST_BAD_GENERAL_ID:
+            assert isinstance(resp, BadAPIRequestError)
+        else:
+            assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+
+
+def test_AsyncPushoverAPI_tracks_rate_limit(AsyncPushoverAPI):
+    """Test that the quota is recorded from sent messages and can be fetched directly."""
+    expected = RateLimit(TEST_APP_LIMIT, TEST_APP_REMAINING, TEST_APP_RESET)
+
+    async def send_and_get_limits():
+        """Send a message, then get the limits."""
+        await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE)
+        tracked = AsyncPushoverAPI.rate_limit
+        return tracked, await AsyncPushoverAPI.get_limits()
+
+    assert run(AsyncPushoverAPI, send_and_get_limits()) == (expected, expected)
+
+
+def test_AsyncPushoverAPI_retries_transient_failures():
+    """Test that connection errors and 5xx responses are retried."""
+    outcomes = [httpx.ConnectError("connection refused"), httpx.Response(503, text="Service Unavailable")]
+
+    def handler(_request):
+        """Fail with the next outcome, then succeed."""
+        if outcomes:
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return httpx.Response(200, json={"status": 1, "sounds": SOUNDS})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api = async_pushover_api.AsyncPushoverAPI(TEST_TOKEN, client=client, retry=RetryPolicy(backoff_base=0))
+
+    assert run(api, api.get_sounds()) == SOUNDS
+    assert not outcomes
+
+
+def test_AsyncPushoverAPI_does_not_retry_messages_which_may_have_been_sent():
+    """Test that a message isn't sent again after timing out once it may have reached the Pushover servers."""
+    outcomes = [httpx.ConnectError("connection refused"), httpx.ReadTimeout("timed out")]
+    requests = []
+
+    def handler(request):
+        """Fail every request with the next outcome."""
+        requests.append(request)
+        raise outcomes[len(requests) - 1]
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api = async_pushover_api.AsyncPushoverAPI(TEST_TOKEN, client=client, retry=RetryPolicy(backoff_base=0))
+
+    with pytest.raises(httpx.ReadTimeout):
+        run(api, api.send_message(TEST_USER, TEST_MESSAGE))
+    assert len(requests) == 2  # noqa: PLR2004 -- the failure to connect is retried, the timeout isn't
+
+
+def test_AsyncPushoverAPI_gets_sounds(AsyncPushoverAPI):
+    """Test the retrieval of sounds."""
+    assert run(AsyncPushoverAPI, AsyncPushoverAPI.get_sounds()) == SOUNDS
+
+
+def test_AsyncPushoverAPI_raises_error_on_getting_sounds_with_bad_token(BadTokenAsyncPushoverAPI):
+    """Test proper error behavior when a request with a bad token is sent."""
+    with pytest.raises(BadAPIRequestError):
+        run(BadTokenAsyncPushoverAPI, BadTokenAsyncPushoverAPI.get_sounds())
+
+
+def test_AsyncPushoverAPI_validates_user(AsyncPushoverAPI):
+    """Test validation of a user token."""
+    resp = run(AsyncPushoverAPI, AsyncPushoverAPI.validate(TEST_USER))
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID, "group": 0, "devices": TEST_DEVICES}
+
+
+def test_AsyncPushoverAPI_caches_sounds_and_validation(AsyncPushoverAPI):
+    """Test that repeated calls are answered from the response cache."""
+    AsyncPushoverAPI.response_cache = ResponseCache()
+
+    async def call_twice():
+        """Get the sounds and validate the user, twice each."""
+        return [
+            await AsyncPushoverAPI.get_sounds(),
+            await AsyncPushoverAPI.get_sounds(),
+            await AsyncPushoverAPI.validate(TEST_USER),
+            await AsyncPushoverAPI.validate(TEST_USER),
+        ]
+
+    sounds, cached_sounds, validation, cached_validation = run(AsyncPushoverAPI, call_twice())
+
+    assert sounds == cached_sounds == SOUNDS
+    assert validation == cached_validation
+    assert (AsyncPushoverAPI.response_cache.hits, AsyncPushoverAPI.response_cache.misses) == (2, 2)
+
+
+def test_AsyncPushoverAPI_returns_compact_results(AsyncPushoverAPI):
+    """Test that compact result objects are returned when asked for, and cached like dicts."""
+    AsyncPushoverAPI.compact_results = True
+    AsyncPushoverAPI.response_cache = ResponseCache()
+
+    async def call():
+        """Send a message and validate the user twice."""
+        return [
+            await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE),
+            await AsyncPushoverAPI.validate(TEST_USER),
+            await AsyncPushoverAPI.validate(TEST_USER),
+        ]
+
+    sent, validation, cached_validation = run(AsyncPushoverAPI, call())
+
+    assert isinstance(sent, MessageResult)
+    assert sent.request == TEST_REQUEST_ID
+    assert isinstance(cached_validation, ValidationResult)
+    assert validation == cached_validation
+    assert validation.devices == tuple(TEST_DEVICES)
+
+
+def test_AsyncPushoverAPI_gets_and_cancels_receipt(AsyncPushoverAPI):
+    """Test the retrieval and cancellation of a receipt."""
+
+    async def check_and_cancel():
+        """Check the receipt, then cancel it."""
+        return (
+            await AsyncPushoverAPI.check_receipt(TEST_RECEIPT_ID),
+            await AsyncPushoverAPI.cancel_receipt(TEST_RECEIPT_ID),
+        )
+
+    receipt, cancel = run(AsyncPushoverAPI, check_and_cancel())
+
+    assert receipt["acknowledged"] == 1
+    assert cancel == {"status": 1, "request": TEST_REQUEST_ID}
+
+
+def test_AsyncPushoverAPI_migrates_multiple_subscriptions(AsyncPushoverAPI):
+    """Test a migration of multiple user keys at once."""
+    users = [{"user": TEST_USER}] * 3
+    resps = run(AsyncPushoverAPI, AsyncPushoverAPI.migrate_multiple_to_subscription(users, TEST_SUBSCRIPTION_CODE))
+
+    assert (
+        resps
+        == [
+            {"status": 1, "request": TEST_REQUEST_ID, "subscribed_user_key": TEST_SUBSCRIBED_USER_KEY},
+        ]
+        * 3
+    )
+
+
+def test_AsyncPushoverAPI_resumes_migration_from_checkpoint(AsyncPushoverAPI, tmp_path):
+    """Test that users recorded in the checkpoint aren't migrated again."""
+    checkpoint = tmp_path / "migration.jsonl"
+    users = [{"user": TEST_USER}, {"user": TEST_BAD_GENERAL_ID}]
+    migrated = {"status": 1, "request": TEST_REQUEST_ID, "subscribed_user_key": TEST_SUBSCRIBED_USER_KEY}
+
+    async def migrate_twice():
+        """Migrate the users, then again from the checkpoint."""
+        first = await AsyncPushoverAPI.migrate_multiple_to_subscription(
+            users, TEST_SUBSCRIPTION_CODE, max_in_flight=1, return_exceptions=True, checkpoint=checkpoint
+        )
+        with pytest.raises(BadAPIRequestError):
+            await AsyncPushoverAPI.migrate_multiple_to_subscription(
+                users, TEST_SUBSCRIPTION_CODE, checkpoint=checkpoint
+            )
+        return first
+
+    resps = run(AsyncPushoverAPI, migrate_twice())
+
+    assert resps[0] == migrated
+    assert isinstance(resps[1], BadAPIRequestError)
+    assert len(checkpoint.read_text().splitlines()) == 1
+
+
+def test_AsyncPushoverAPI_manages_groups(AsyncPushoverAPI):
+    """Test the group endpoints."""
+
+    async def manage_group():
+        """Call every group endpoint."""
+        return [
+            await AsyncPushoverAPI.group_add_user(TEST_GROUP, TEST_USER),
+            await AsyncPushoverAPI.group_disable_user(TEST_GROUP, TEST_USER),
+            await AsyncPushoverAPI.group_enable_user(TEST_GROUP, TEST_USER),
+            await AsyncPushoverAPI.group_delete_user(TEST_GROUP, TEST_USER),
+            await AsyncPushoverAPI.group_rename(TEST_GROUP, TEST_GROUP_NAME + "New"),
+        ]
+
+    resps = run(AsyncPushoverAPI, manage_group())
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID}] * 5
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"max_in_flight": 2}])
+def test_AsyncPushoverAPI_reconciles_group(AsyncPushoverAPI, kwargs):
+    """Test reconciling a group's membership, with the default unlimited concurrency and with a limit."""
+    changes = run(AsyncPushoverAPI, AsyncPushoverAPI.reconcile_group(TEST_GROUP, [], disabled=[TEST_USER], **kwargs))
+
+    assert changes == [GroupChange(TEST_USER, ("disable",), None)]
+
+
+def test_AsyncPushoverAPI_gets_group_info(AsyncPushoverAPI):
+    """Test getting group info."""
+    resp = run(AsyncPushoverAPI, AsyncPushoverAPI.group_info(TEST_GROUP))
+
+    assert resp["name"] == TEST_GROUP_NAME
+    assert len(resp["users"]) == len(TEST_DEVICES)
+
+
+def test_AsyncPushoverAPI_assigns_license(AsyncPushoverAPI):
+    """Test assigning a license to a user and an email."""
+
+    async def assign_both():
+        """Assign a license by user key and by email."""
+        return [
+            await AsyncPushoverAPI.assign_license(TEST_USER),
+            await AsyncPushoverAPI.assign_license(TEST_USER_EMAIL),
+        ]
+
+    resps = run(AsyncPushoverAPI, assign_both())
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID, "credits": 0}] * 2
+
+
+def test_AsyncPushoverAPI_assigns_multiple_licenses(AsyncPushoverAPI):
+    """Test assigning licenses to multiple users, collecting the error for each failed assignment."""
+    resps = run(
+        AsyncPushoverAPI,
+        AsyncPushoverAPI.assign_licenses(
+            [TEST_USER, TEST_BAD_GENERAL_ID, TEST_USER_EMAIL], max_in_flight=2, return_exceptions=True
+        ),
+    )
+
+    assert resps[0] == resps[2] == {"status": 1, "request": TEST_REQUEST_ID, "credits": 0}
+    assert isinstance(resps[1], BadAPIRequestError)
+
+
+def test_AsyncPushoverAPI_streams_license_assignments(AsyncPushoverAPI, monkeypatch):
+    """Test that identifiers are taken only as assignments finish, with at most ``max_in_flight`` in flight."""
+    taken = []
+    in_flight = []
+    most_in_flight = 0
+
+    def identifiers():
+        """Yield user identifiers, noting each one taken."""
+        for n in range(10):
+            taken.append(n)
+            yield str(n)
+
+    async def assign_license(user_identifier, os=None):  # noqa: ARG001 -- same signature as the real method
+        """Stand in for the real method, checking how much of the input has been taken."""
+        nonlocal most_in_flight
+        in_flight.append(user_identifier)
+        most_in_flight = max(most_in_flight, len(in_flight))
+        # only the identifiers in flight and those already assigned have been taken from the generator
+        assert len(taken) <= int(user_identifier) + 3  # up to three in flight
+        await asyncio.sleep(0)
+        in_flight.remove(user_identifier)
+        if user_identifier == "9":
+            msg = "400: user is invalid"
+            raise BadAPIRequestError(msg)
+        return user_identifier
+
+    monkeypatch.setattr(AsyncPushoverAPI, "assign_license", assign_license)
+    resps = run(
+        AsyncPushoverAPI, AsyncPushoverAPI.assign_licenses(identifiers(), max_in_flight=3, return_exceptions=True)
+    )
+
+    assert resps[:9] == [str(n) for n in range(9)]
+    assert isinstance(resps[9], BadAPIRequestError)
+    assert most_in_flight == 3  # noqa: PLR2004 -- max_in_flight
+
+    with pytest.raises(BadAPIRequestError):
+        asyncio.run(AsyncPushoverAPI.assign_licenses(["9", "1"]))
@@ -0,0 +1,100 @@
+"""Tests for the :mod:`pushover_complete.attachments.AttachmentCache` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import os
+from urllib.parse import urljoin
+
+import responses
+
+from pushover_complete.attachments import AttachmentCache
+from pushover_complete.pushover_api import PushoverAPI
+from tests.constants import PUSHOVER_API_URL, TEST_IMAGE_BYTES, TEST_MESSAGE, TEST_REQUEST_ID, TEST_TOKEN, TEST_USER
+from tests.responses_callbacks import messages_callback
+
+
+def test_AttachmentCache_reads_each_file_once(tmp_path):
+    """Test that repeated reads of an unchanged file are served from the cache."""
+    img_path = tmp_path / "pushover.png"
+    img_path.write_bytes(TEST_IMAGE_BYTES)
+    cache = AttachmentCache()
+
+    assert cache.get(img_path) == ("pushover.png", TEST_IMAGE_BYTES)
+    assert cache.get(str(img_path)) == ("pushover.png", TEST_IMAGE_BYTES)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1
+    assert cache.size == len(TEST_IMAGE_BYTES)
+
+
+def test_AttachmentCache_rereads_changed_files(tmp_path):
+    """Test that a file modified on disk is read again, replacing the old contents."""
+    img_path = tmp_path / "pushover.png"
+    img_path.write_bytes(TEST_IMAGE_BYTES)
+    cache = AttachmentCache()
+    cache.get(img_path)
+
+    img_path.write_bytes(b"new image")
+    stat = img_path.stat()
+    os.utime(img_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.get(img_path) == ("pushover.png", b"new image")
+    assert cache.misses == 2  # noqa: PLR2004
+    assert len(cache) == 1
+    assert cache.size == len(b"new image")
+
+
+def test_AttachmentCache_evicts_least_recently_used(tmp_path):
+    """Test that the least recently used files are evicted once the cache is full."""
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.png"
+        path.write_bytes(b"x" * 10)
+        paths.append(path)
+    cache = AttachmentCache(max_bytes=25)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])  # b is now the least recently used
+    cache.get(paths[2])
+    assert cache.size == 20  # noqa: PLR2004
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    cache = AttachmentCache(max_entries=1)
+    cache.get(paths[0])
+    cache.get(paths[1])
+    assert len(cache) == 1
+
+
+def test_AttachmentCache_does_not_cache_large_files(tmp_path):
+    """Test that files larger than the whole cache are read but not cached."""
+    img_path = tmp_path / "pushover.png"
+    img_path.write_bytes(TEST_IMAGE_BYTES)
+    cache = AttachmentCache(max_bytes=len(TEST_IMAGE_BYTES) - 1)
+
+    assert cache.get(img_path) == ("pushover.png", TEST_IMAGE_BYTES)
+    assert len(cache) == 0
+
+
+@responses.activate
+def test_PushoverAPI_sends_cached_attachments(tmp_path):
+    """Test that PushoverAPI sends images from its attachment cache."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    img_path = tmp_path / "pushover.png"
+    img_path.write_bytes(TEST_IMAGE_BYTES)
+    cache = AttachmentCache()
+    api = PushoverAPI(TEST_TOKEN, attachment_cache=cache)
+
+    for _ in range(3):
+        resp = api.send_message(TEST_USER, TEST_MESSAGE, image=img_path)
+        assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+
+    assert (cache.hits, cache.misses) == (2, 1)
+    for call in responses.calls:
+        assert TEST_IMAGE_BYTES in call.request.body
+        assert b'filename="pushover.png"' in call.request.body
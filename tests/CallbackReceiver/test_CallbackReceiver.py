@@ -0,0 +1,86 @@
+"""Tests for the :mod:`pushover_complete.callback_receiver.CallbackReceiver` class."""  # noqa: N999 -- weird name for tests module is okay
+
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from pushover_complete.callback_receiver import CallbackReceiver, parse_callback
+from pushover_complete.receipts import ReceiptTracker
+from tests.constants import TEST_DEVICES, TEST_RECEIPT_ID, TEST_USER
+from tests.fixtures import PushoverAPI  # noqa: F401 -- needs to be imported for pytest to find it
+
+CALLBACK_BODY = {
+    "receipt": TEST_RECEIPT_ID,
+    "acknowledged": "1",
+    "acknowledged_at": "1360019238",
+    "acknowledged_by": TEST_USER,
+    "acknowledged_by_device": TEST_DEVICES[0],
+}
+
+
+def test_parse_callback():
+    """Test that a callback body is parsed into a receipt status."""
+    status = parse_callback(
+        b"receipt=rLqVuqTRh62UzxtmqiaLzQmVcPgiCy&acknowledged=1&acknowledged_at=1360019238&acknowledged_by=u"
+    )
+    assert status == {
+        "receipt": TEST_RECEIPT_ID,
+        "acknowledged": 1,
+        "acknowledged_at": 1360019238,
+        "acknowledged_by": "u",
+    }
+
+    with pytest.raises(ValueError, match="no receipt"):
+        parse_callback("acknowledged=1")
+
+
+def test_CallbackReceiver_resolves_tracked_receipts(PushoverAPI):
+    """Test that callbacks POSTed to the receiver resolve tracked receipts without polling."""
+    tracker = ReceiptTracker(PushoverAPI)
+    future = tracker.track(TEST_RECEIPT_ID)
+    unknown = []
+
+    with CallbackReceiver(tracker, path="/hooks/pushover", on_unknown=unknown.append) as receiver:
+        resp = requests.post(receiver.url, data=CALLBACK_BODY, timeout=5)
+        assert resp.status_code == requests.codes.ok
+        resp = requests.post(receiver.url, data=dict(CALLBACK_BODY, receipt="rUnknown"), timeout=5)
+        assert resp.status_code == requests.codes.ok
+
+    status = future.result(0)
+    assert status["acknowledged"] == 1
+    assert status["acknowledged_by"] == TEST_USER
+    assert len(tracker) == 0
+    assert [status["receipt"] for status in unknown] == ["rUnknown"]
+
+
+def test_CallbackReceiver_rejects_bad_requests(PushoverAPI):
+    """Test that requests to other paths, or that aren't callbacks, are rejected."""
+    tracker = ReceiptTracker(PushoverAPI)
+    future = tracker.track(TEST_RECEIPT_ID)
+
+    with CallbackReceiver(tracker, path="/hooks/pushover") as receiver:
+        resp = requests.post(receiver.url.replace("/hooks/pushover", "/"), data=CALLBACK_BODY, timeout=5)
+        assert resp.status_code == requests.codes.not_found
+        resp = requests.post(receiver.url, data={"acknowledged": "1"}, timeout=5)
+        assert resp.status_code == requests.codes.bad_request
+        resp = requests.post(receiver.url, data="x" * 10000, timeout=5)
+        assert resp.status_code == requests.codes.request_entity_too_large
+
+    assert not future.done()
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-1"])
+def test_CallbackReceiver_rejects_bad_content_length(PushoverAPI, content_length):
+    """Test that a request with a malformed or negative Content-Length is rejected instead of read."""
+    with CallbackReceiver(ReceiptTracker(PushoverAPI), path="/hooks/pushover") as receiver:
+        url = urlsplit(receiver.url)
+        connection = HTTPConnection(url.hostname, url.port, timeout=5)
+        connection.putrequest("POST", url.path)
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        resp = connection.getresponse()
+        connection.close()
+
+    assert resp.status == requests.codes.bad_request
@@ -0,0 +1 @@
+"""Tests for the Dispatcher class."""
@@ -0,0 +1,156 @@
+"""Tests for the :mod:`pushover_complete.dispatcher.Dispatcher` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import threading
+import time
+from urllib.parse import urljoin
+
+import pytest
+import responses
+
+from pushover_complete import pushover_api
+from pushover_complete.dispatcher import Dispatcher
+from pushover_complete.error import BadAPIRequestError, QueueFullError
+from tests.constants import PUSHOVER_API_URL, TEST_BAD_GENERAL_ID, TEST_MESSAGE, TEST_REQUEST_ID, TEST_USER
+from tests.fixtures import PushoverAPI  # noqa: F401 -- needs to be imported for pytest to find it
+from tests.responses_callbacks import messages_callback
+
+MESSAGES_URL = urljoin(PUSHOVER_API_URL, "messages.json")
+
+
+@pytest.fixture
+def blocked_messages_endpoint():
+    """Mock the messages endpoint so that requests don't complete until the yielded event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def callback(request):
+        """Answer once the test releases the request."""
+        started.set()
+        release.wait(5)
+        return messages_callback(request)
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, MESSAGES_URL, callback=callback, content_type="application/json")
+        yield started, release
+        release.set()
+
+
+@responses.activate
+def test_PushoverAPI_submits_messages_in_background(PushoverAPI):
+    """Test that submitted messages are sent by the dispatcher and their futures resolve."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+
+    futures = [PushoverAPI.submit(TEST_USER, TEST_MESSAGE) for _ in range(5)]
+    bad_future = PushoverAPI.submit(TEST_BAD_GENERAL_ID, TEST_MESSAGE)
+
+    assert PushoverAPI.flush(timeout=5)
+    assert [future.result() for future in futures] == [{"status": 1, "request": TEST_REQUEST_ID}] * 5
+    assert isinstance(bad_future.exception(), BadAPIRequestError)
+    PushoverAPI.close()
+
+
+@responses.activate
+def test_PushoverAPI_creates_one_dispatcher_for_concurrent_submits(PushoverAPI, monkeypatch):
+    """Test that threads submitting at once share a single dispatcher, which is shut down when the API is closed."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    created = []
+    barrier = threading.Barrier(8)
+
+    def slow_dispatcher(api):
+        """Create a dispatcher slowly, keeping it."""
+        # give the other threads every chance to find no dispatcher yet
+        time.sleep(0.05)
+        created.append(Dispatcher(api))
+        return created[-1]
+
+    monkeypatch.setattr(pushover_api, "Dispatcher", slow_dispatcher)
+
+    def submit():
+        """Submit a message once every thread is ready."""
+        barrier.wait()
+        PushoverAPI.submit(TEST_USER, TEST_MESSAGE)
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    PushoverAPI.close()
+
+    assert len(created) == 1
+    assert len(responses.calls) == 8  # noqa: PLR2004 -- every submitted message was sent
+
+
+def test_Dispatcher_raises_when_full(PushoverAPI, blocked_messages_endpoint):
+    """Test the "raise" backpressure policy."""
+    started, release = blocked_messages_endpoint
+    dispatcher = Dispatcher(PushoverAPI, max_workers=1, max_queue=1, backpressure="raise")
+    in_flight = dispatcher.submit(TEST_USER, TEST_MESSAGE)
+    started.wait(5)
+    queued = dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+    with pytest.raises(QueueFullError):
+        dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+    release.set()
+    assert dispatcher.shutdown(timeout=5)
+    assert in_flight.result()["status"] == queued.result()["status"] == 1
+
+
+def test_Dispatcher_drops_oldest_when_full(PushoverAPI, blocked_messages_endpoint):
+    """Test the "drop_oldest" backpressure policy."""
+    started, release = blocked_messages_endpoint
+    dispatcher = Dispatcher(PushoverAPI, max_workers=1, max_queue=1, backpressure="drop_oldest")
+    dispatcher.submit(TEST_USER, TEST_MESSAGE)
+    started.wait(5)
+    oldest = dispatcher.submit(TEST_USER, TEST_MESSAGE)
+    newest = dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+    release.set()
+    assert dispatcher.shutdown(timeout=5)
+    assert oldest.cancelled()
+    assert newest.result()["status"] == 1
+
+
+def test_Dispatcher_block_times_out(PushoverAPI, blocked_messages_endpoint):
+    """Test the "block" backpressure policy giving up after its timeout."""
+    started, release = blocked_messages_endpoint
+    dispatcher = Dispatcher(PushoverAPI, max_workers=1, max_queue=1, block_timeout=0.01)
+    dispatcher.submit(TEST_USER, TEST_MESSAGE)
+    started.wait(5)
+    dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+    with pytest.raises(QueueFullError):
+        dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+    release.set()
+    assert dispatcher.shutdown(timeout=5)
+
+
+def test_Dispatcher_shutdown_cancels_pending(PushoverAPI, blocked_messages_endpoint):
+    """Test that shutdown can cancel queued messages and that no messages are accepted afterwards."""
+    started, release = blocked_messages_endpoint
+    dispatcher = Dispatcher(PushoverAPI, max_workers=1)
+    dispatcher.submit(TEST_USER, TEST_MESSAGE)
+    started.wait(5)
+    queued = dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+    assert not dispatcher.shutdown(timeout=0, cancel_pending=True)
+    release.set()
+    assert dispatcher.shutdown(timeout=5)
+    assert queued.cancelled()
+    with pytest.raises(RuntimeError):
+        dispatcher.submit(TEST_USER, TEST_MESSAGE)
+
+
+def test_Dispatcher_rejects_unknown_backpressure(PushoverAPI):
+    """Test that an unknown backpressure policy is rejected."""
+    with pytest.raises(ValueError, match="backpressure"):
+        Dispatcher(PushoverAPI, backpressure="ignore")
+
+
+@pytest.mark.parametrize("backpressure", ["block", "drop_oldest", "raise"])
+def test_Dispatcher_rejects_empty_queue(PushoverAPI, backpressure):
+    """Test that a queue with no space for any message is rejected."""
+    with pytest.raises(ValueError, match="max_queue"):
+        Dispatcher(PushoverAPI, max_queue=0, backpressure=backpressure)
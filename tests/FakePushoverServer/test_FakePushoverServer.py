@@ -0,0 +1,178 @@
+"""Tests for the :mod:`pushover_complete.testing.FakePushoverServer` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import asyncio
+
+import httpx
+import pytest
+
+from pushover_complete.async_pushover_api import AsyncPushoverAPI
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.pushover_api import PushoverAPI
+from pushover_complete.testing import FakePushoverServer
+from pushover_complete.validation import MAX_ATTACHMENT_SIZE
+from tests.constants import (
+    TEST_BAD_GENERAL_ID,
+    TEST_DEVICES,
+    TEST_GROUP,
+    TEST_IMAGE_BYTES,
+    TEST_MESSAGE,
+    TEST_TITLE,
+    TEST_TOKEN,
+    TEST_USER,
+)
+
+
+@pytest.fixture
+def server():
+    """Fixture for a running :class:`FakePushoverServer` accepting only the test token and user."""
+    with FakePushoverServer(token=TEST_TOKEN, users={TEST_USER: TEST_DEVICES}, quota=5) as fake:
+        yield fake
+
+
+@pytest.fixture
+def api(server):
+    """Fixture for a :class:`PushoverAPI` pointed at the fake server."""
+    with PushoverAPI(TEST_TOKEN, api_url=server.url) as client:
+        # don't send requests for localhost through any proxy configured in the environment
+        client.session.trust_env = False
+        yield client
+
+
+def test_FakePushoverServer_accepts_messages_and_uses_up_quota(server, api):
+    """Test that an accepted message is kept, uses up the quota, and reports it in the headers."""
+    resp = api.send_message(TEST_USER, TEST_MESSAGE, title=TEST_TITLE, image=TEST_IMAGE_BYTES)
+
+    assert resp["status"] == 1
+    assert server.messages[-1]["message"] == TEST_MESSAGE
+    assert server.messages[-1]["attachment"] == TEST_IMAGE_BYTES
+    assert server.remaining == 4  # noqa: PLR2004 -- one of five messages used
+    assert api.rate_limit.remaining == 4  # noqa: PLR2004 -- one of five messages used
+    assert api.get_limits().remaining == 4  # noqa: PLR2004 -- one of five messages used
+
+
+def test_FakePushoverServer_reports_every_problem_at_once(server, api):
+    """Test that a message breaking several rules is rejected with all of them."""
+    with pytest.raises(BadAPIRequestError) as exc_info:
+        api.send_message(TEST_USER, "x" * 1025, title="x" * 251, priority=2, sound="nope")
+
+    assert exc_info.value.status_code == 400  # noqa: PLR2004 -- HTTP Bad Request
+    for problem in ("message cannot be longer", "title cannot be longer", "sound is invalid", "retry must", "expire"):
+        assert problem in str(exc_info.value)
+    assert not server.messages
+    assert server.remaining == 5  # noqa: PLR2004 -- nothing used
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "problem"),
+    [
+        ({"priority": 3}, "priority is invalid"),
+        ({"priority": 2, "retry": 10, "expire": 60}, "retry must be at least 30 seconds"),
+        ({"priority": 2, "retry": 30, "expire": 10801}, "expire cannot be more than 10800 seconds"),
+        ({"image": b"\0" * (MAX_ATTACHMENT_SIZE + 1)}, "attachment cannot be larger"),
+        ({"url": "x", "url_title": "x" * 101}, "url_title cannot be longer than 100 characters"),
+    ],
+)
+def test_FakePushoverServer_enforces_rules(api, kwargs, problem):
+    """Test the rules on priorities, emergency messages, attachments and formatting."""
+    with pytest.raises(BadAPIRequestError, match=problem):
+        api.send_message(TEST_USER, TEST_MESSAGE, **kwargs)
+
+
+def test_FakePushoverServer_checks_token_and_users(server):
+    """Test that only the given token and users are accepted."""
+    with PushoverAPI(TEST_BAD_GENERAL_ID, api_url=server.url) as bad_api:
+        bad_api.session.trust_env = False
+        with pytest.raises(BadAPIRequestError, match="application token is invalid"):
+            bad_api.get_sounds()
+    with PushoverAPI(TEST_TOKEN, api_url=server.url) as api:
+        api.session.trust_env = False
+        with pytest.raises(BadAPIRequestError, match="not a valid user"):
+            api.send_message(TEST_GROUP, TEST_MESSAGE)
+        with pytest.raises(BadAPIRequestError, match="device name is not valid"):
+            api.validate(TEST_USER, "laptop")
+        assert api.validate(TEST_USER)["devices"] == TEST_DEVICES
+
+
+def test_FakePushoverServer_refuses_messages_over_quota():
+    """Test that messages to a group use up the quota per enabled member, and are refused once it runs out."""
+    with FakePushoverServer(quota=5) as server, PushoverAPI(TEST_TOKEN, api_url=server.url) as api:
+        api.session.trust_env = False
+        group = server.add_group(users=[TEST_USER, "u" * 30, "v" * 30])
+        api.group_disable_user(group, "v" * 30)
+        api.send_message(group, TEST_MESSAGE)
+        assert server.remaining == 3  # noqa: PLR2004 -- two enabled members
+
+        server.remaining = 0
+        with pytest.raises(BadAPIRequestError) as exc_info:
+            api.send_message(TEST_USER, TEST_MESSAGE)
+    assert exc_info.value.status_code == 429  # noqa: PLR2004 -- HTTP Too Many Requests
+
+
+def test_FakePushoverServer_tracks_receipts(server, api):
+    """Test that emergency messages get a receipt which can be acknowledged and cancelled."""
+    receipt = api.send_message(TEST_USER, TEST_MESSAGE, priority=2, retry=30, expire=3600)["receipt"]
+    assert api.check_receipt(receipt)["acknowledged"] == 0
+
+    server.acknowledge(receipt, TEST_USER, TEST_DEVICES[0])
+    status = api.check_receipt(receipt)
+    assert status["acknowledged"] == 1
+    assert status["acknowledged_by_device"] == TEST_DEVICES[0]
+
+    api.cancel_receipt(receipt)
+    assert api.check_receipt(receipt)["expired"] == 1
+    with pytest.raises(BadAPIRequestError, match="receipt not found"):
+        api.check_receipt("r" * 30)
+
+
+def test_FakePushoverServer_changes_groups(server, api):
+    """Test that group membership changes are applied, and rejected for unknown groups and members."""
+    server.add_group(TEST_GROUP, "Before")
+    api.group_add_user(TEST_GROUP, TEST_USER, memo="memo")
+    api.group_rename(TEST_GROUP, "After")
+
+    info = api.group_info(TEST_GROUP)
+    assert info["name"] == "After"
+    assert info["users"] == [{"user": TEST_USER, "device": "", "memo": "memo", "disabled": False}]
+
+    with pytest.raises(BadAPIRequestError, match="already a member"):
+        api.group_add_user(TEST_GROUP, TEST_USER)
+    api.group_delete_user(TEST_GROUP, TEST_USER)
+    with pytest.raises(BadAPIRequestError, match="not a member"):
+        api.group_delete_user(TEST_GROUP, TEST_USER)
+    with pytest.raises(BadAPIRequestError, match="group not found"):
+        api.group_info("g" * 30)
+
+
+def test_FakePushoverServer_simulates_server_errors():
+    """Test that ``error_rate`` fails requests with a server error."""
+    with FakePushoverServer(error_rate=1.0) as server, PushoverAPI(TEST_TOKEN, api_url=server.url) as api:
+        api.session.trust_env = False
+        with pytest.raises(BadAPIRequestError) as exc_info:
+            api.send_message(TEST_USER, TEST_MESSAGE)
+
+    assert exc_info.value.status_code == 500  # noqa: PLR2004 -- HTTP Internal Server Error
+    assert server.requests == 1
+
+
+def test_FakePushoverServer_serves_AsyncPushoverAPI(server):
+    """Test that the asyncio client can be pointed at the fake server."""
+
+    async def send():
+        """Send two messages to the fake server."""
+        async with httpx.AsyncClient(trust_env=False) as client:
+            api = AsyncPushoverAPI(TEST_TOKEN, client=client, api_url=server.url)
+            return await api.send_messages([{"user": TEST_USER, "message": TEST_MESSAGE}] * 2, max_in_flight=2)
+
+    resps = asyncio.run(send())
+
+    assert [resp["status"] for resp in resps] == [1, 1]
+    assert server.remaining == 3  # noqa: PLR2004 -- two of five messages used
+
+
+def test_FakePushoverServer_stops_only_when_running():
+    """Test that stopping a server which was never started, or was already stopped, does nothing."""
+    server = FakePushoverServer()
+    server.stop()
+    server.start()
+    server.stop()
+    server.stop()
@@ -0,0 +1,157 @@
+"""Tests for the :mod:`pushover_complete.groups.GroupCache` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import re
+
+import pytest
+import responses
+
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.groups import GroupCache, GroupChange, plan_group_changes
+from tests.constants import TEST_BAD_GENERAL_ID, TEST_DEVICES, TEST_GROUP, TEST_GROUP_NAME, TEST_USER
+from tests.fixtures import PushoverAPI  # noqa: F401 -- needs to be imported for pytest to find it
+from tests.responses_callbacks import (
+    groups_add_user_callback,
+    groups_callback,
+    groups_delete_user_callback,
+    groups_disable_user_callback,
+    groups_enable_user_callback,
+    groups_rename_callback,
+)
+
+GROUP_URL_RE = re.compile(r"https://api\.pushover\.net/1/groups/[a-zA-Z0-9]+\.json")
+
+
+@pytest.fixture
+def group_endpoints():
+    """Mock every group endpoint."""
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add_callback(responses.GET, GROUP_URL_RE, callback=groups_callback, content_type="application/json")
+        for action, callback in (
+            ("add_user", groups_add_user_callback),
+            ("delete_user", groups_delete_user_callback),
+            ("disable_user", groups_disable_user_callback),
+            ("enable_user", groups_enable_user_callback),
+            ("rename", groups_rename_callback),
+        ):
+            rsps.add_callback(
+                responses.POST,
+                re.compile(rf"https://api\.pushover\.net/1/groups/[a-zA-Z0-9]+/{action}\.json"),
+                callback=callback,
+                content_type="application/json",
+            )
+        yield rsps
+
+
+def group_info_calls(rsps):
+    """Count the calls to the group info endpoint."""
+    return sum(1 for call in rsps.calls if GROUP_URL_RE.fullmatch(call.request.url.split("?")[0]))
+
+
+def test_GroupCache_fetches_group_once(PushoverAPI, group_endpoints):
+    """Test that a group is only fetched again once the refresh interval has passed."""
+    cache = GroupCache(PushoverAPI, refresh_interval=60)
+
+    info = cache.get(TEST_GROUP, now=0)
+    assert info["name"] == TEST_GROUP_NAME
+    with pytest.raises(TypeError):
+        info["name"] = "changed by the caller"
+    with pytest.raises(TypeError):
+        info["users"][0]["disabled"] = True
+    assert cache.get(TEST_GROUP, now=59) is info
+    assert group_info_calls(group_endpoints) == 1
+
+    cache.get(TEST_GROUP, now=60)
+    assert group_info_calls(group_endpoints) == 2  # noqa: PLR2004
+    cache.invalidate(TEST_GROUP)
+    cache.get(TEST_GROUP, now=61)
+    assert group_info_calls(group_endpoints) == 3  # noqa: PLR2004
+
+
+def test_GroupCache_applies_changes_locally(PushoverAPI, group_endpoints):
+    """Test that changes made through the cache update the cached group without fetching it again."""
+    cache = GroupCache(PushoverAPI, refresh_interval=None)
+    cache.get(TEST_GROUP)
+
+    cache.disable_user(TEST_GROUP, TEST_USER)
+    assert all(member["disabled"] for member in cache.get(TEST_GROUP)["users"])
+    cache.enable_user(TEST_GROUP, TEST_USER)
+    assert not any(member["disabled"] for member in cache.get(TEST_GROUP)["users"])
+
+    cache.rename(TEST_GROUP, "Renamed")
+    assert cache.get(TEST_GROUP)["name"] == "Renamed"
+
+    cache.delete_user(TEST_GROUP, TEST_USER)
+    assert cache.get(TEST_GROUP)["users"] == ()
+    cache.add_user(TEST_GROUP, TEST_USER, device=TEST_DEVICES[0], memo="on call")
+    assert cache.get(TEST_GROUP)["users"] == (
+        {"user": TEST_USER, "device": TEST_DEVICES[0], "memo": "on call", "disabled": False},
+    )
+
+    assert group_info_calls(group_endpoints) == 1
+
+
+def test_GroupCache_looks_up_members(PushoverAPI, group_endpoints):
+    """Test that a membership is looked up by user key and device, and kept up to date by changes."""
+    cache = GroupCache(PushoverAPI, refresh_interval=None)
+
+    assert cache.member(TEST_GROUP, TEST_USER)["user"] == TEST_USER
+    assert cache.member(TEST_GROUP, TEST_USER, TEST_DEVICES[1])["device"] == TEST_DEVICES[1]
+    assert cache.member(TEST_GROUP, TEST_USER, "laptop") is None
+    assert cache.member(TEST_GROUP, "u" * 30) is None
+
+    cache.disable_user(TEST_GROUP, TEST_USER)
+    assert cache.member(TEST_GROUP, TEST_USER, TEST_DEVICES[1])["disabled"]
+    cache.delete_user(TEST_GROUP, TEST_USER)
+    assert cache.member(TEST_GROUP, TEST_USER) is None
+    assert group_info_calls(group_endpoints) == 1
+
+
+def test_GroupCache_ignores_rejected_changes(PushoverAPI, group_endpoints):  # noqa: ARG001 -- mocks the endpoints
+    """Test that a change rejected by the Pushover API leaves the cached group as it was."""
+    cache = GroupCache(PushoverAPI)
+    before = cache.get(TEST_GROUP)
+
+    with pytest.raises(BadAPIRequestError):
+        cache.add_user(TEST_GROUP, TEST_BAD_GENERAL_ID)
+
+    assert cache.get(TEST_GROUP) == before
+
+
+def test_plan_group_changes():
+    """Test that the fewest actions are planned to reach the desired membership."""
+    info = {
+        "users": [
+            {"user": "uEnabled", "device": "", "memo": "", "disabled": False},
+            {"user": "uDisabled", "device": "", "memo": "", "disabled": True},
+            {"user": "uMixed", "device": "phone", "memo": "", "disabled": False},
+            {"user": "uMixed", "device": "tablet", "memo": "", "disabled": True},
+            {"user": "uLeaving", "device": "", "memo": "", "disabled": False},
+        ]
+    }
+
+    plan = plan_group_changes(info, ["uEnabled", "uDisabled", "uMixed", "uNew"], disabled=["uNewDisabled"])
+
+    assert plan == {
+        "uDisabled": ("enable",),
+        "uMixed": ("enable",),
+        "uNew": ("add",),
+        "uNewDisabled": ("add", "disable"),
+        "uLeaving": ("delete",),
+    }
+    assert plan_group_changes(info, [], disabled=["uEnabled", "uMixed"])["uMixed"] == ("disable",)
+    with pytest.raises(ValueError, match="uNew"):
+        plan_group_changes(info, ["uNew"], disabled=["uNew"])
+
+
+def test_GroupCache_reconciles_group(PushoverAPI, group_endpoints):
+    """Test that reconciling through the cache applies the changes to the cached group."""
+    cache = GroupCache(PushoverAPI, refresh_interval=None)
+
+    changes = cache.reconcile(TEST_GROUP, [], disabled=[TEST_USER])
+    assert changes == [GroupChange(TEST_USER, ("disable",), None)]
+    assert all(member["disabled"] for member in cache.get(TEST_GROUP)["users"])
+
+    changes = cache.reconcile(TEST_GROUP, [TEST_USER])
+    assert changes == [GroupChange(TEST_USER, ("enable",), None)]
+    assert cache.reconcile(TEST_GROUP, [TEST_USER]) == []
+    assert group_info_calls(group_endpoints) == 1
@@ -0,0 +1,68 @@
+"""Tests for the :mod:`pushover_complete.images.ImageShrinker` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import os
+from io import BytesIO
+
+import pytest
+
+from pushover_complete.attachments import AttachmentCache
+from pushover_complete.images import ImageShrinker
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def make_image(image_format, size=(800, 600)):
+    """Create an image of random noise, which compresses badly."""
+    image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_ImageShrinker_leaves_small_images_alone():
+    """Test that images within the limits are returned unchanged."""
+    contents = make_image("PNG", (10, 10))
+    assert ImageShrinker()("small.png", contents) == ("small.png", contents)
+
+
+@pytest.mark.parametrize("max_bytes", [1024, 10])
+def test_ImageShrinker_leaves_other_files_alone(max_bytes):
+    """Test that a file which isn't an image is returned unchanged, whether or not it is within the limit."""
+    contents = b"%PDF-1.4 not an image"
+    assert ImageShrinker(max_bytes=max_bytes, max_dimension=200)("report.pdf", contents) == ("report.pdf", contents)
+
+
+def test_ImageShrinker_fits_image_into_byte_budget():
+    """Test that a large PNG is recompressed to fit the byte budget."""
+    contents = make_image("PNG")
+    max_bytes = len(contents) // 10
+
+    filename, shrunk = ImageShrinker(max_bytes=max_bytes)("render.png", contents)
+
+    assert len(shrunk) <= max_bytes
+    assert filename == "render.jpg"
+    with Image.open(BytesIO(shrunk)) as image:
+        assert image.format == "JPEG"
+
+
+def test_ImageShrinker_limits_dimensions():
+    """Test that images are scaled down to the maximum dimension, keeping their format where possible."""
+    contents = make_image("JPEG")
+
+    filename, shrunk = ImageShrinker(max_dimension=200)("photo.jpeg", contents)
+
+    assert filename == "photo.jpg"
+    with Image.open(BytesIO(shrunk)) as image:
+        assert image.size == (200, 150)
+
+
+def test_AttachmentCache_caches_shrunk_images(tmp_path):
+    """Test that an AttachmentCache with an ImageShrinker caches the shrunk image."""
+    img_path = tmp_path / "render.png"
+    img_path.write_bytes(make_image("PNG"))
+    cache = AttachmentCache(transform=ImageShrinker(max_dimension=100))
+
+    first = cache.get(img_path)
+    assert cache.get(img_path) is first
+    assert first[0] == "render.png"
+    assert cache.size == len(first[1])
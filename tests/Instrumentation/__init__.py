@@ -0,0 +1 @@
+"""Tests for the Instrumentation class and its adapters."""
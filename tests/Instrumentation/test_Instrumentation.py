@@ -0,0 +1,156 @@
+"""Tests for the :mod:`pushover_complete.instrumentation.Instrumentation` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import asyncio
+from urllib.parse import urljoin
+
+import pytest
+import requests
+import responses
+
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.instrumentation import (
+    Instrumentation,
+    OpenTelemetryInstrumentation,
+    PrometheusInstrumentation,
+)
+from pushover_complete.pushover_api import PushoverAPI
+from pushover_complete.rate_limit import RateLimit
+from pushover_complete.retry import RetryPolicy
+from tests.constants import (
+    PUSHOVER_API_URL,
+    TEST_APP_LIMIT,
+    TEST_APP_REMAINING,
+    TEST_APP_RESET,
+    TEST_BAD_GENERAL_ID,
+    TEST_IMAGE_BYTES,
+    TEST_MESSAGE,
+    TEST_RECEIPT_ID,
+    TEST_TOKEN,
+    TEST_USER,
+)
+from tests.fixtures import AsyncPushoverAPI  # noqa: F401 -- needs to be imported for pytest to find it
+from tests.responses_callbacks import messages_callback
+
+MESSAGES_URL = urljoin(PUSHOVER_API_URL, "messages.json")
+
+
+class RecordingInstrumentation(Instrumentation):
+    """Record every call, for inspection by the tests."""
+
+    def __init__(self):
+        self.requests = []
+        self.retries = []
+        self.quotas = []
+
+    def request_finished(self, metrics):
+        """Record an attempt at a request."""
+        self.requests.append(metrics)
+
+    def request_retried(self, endpoint, method, attempt, delay):
+        """Record a retry."""
+        self.retries.append((endpoint, method, attempt, delay))
+
+    def quota_updated(self, rate_limit):
+        """Record the quota."""
+        self.quotas.append(rate_limit)
+
+
+@responses.activate
+def test_Instrumentation_receives_every_attempt_retry_and_quota():
+    """Test that each attempt, retry and quota update is reported with its measurements."""
+    responses.add(responses.POST, MESSAGES_URL, body=requests.ConnectTimeout("connection timed out"))
+    responses.add(responses.POST, MESSAGES_URL, status=503, body="Service Unavailable")
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback)
+    instrumentation = RecordingInstrumentation()
+    api = PushoverAPI(TEST_TOKEN, retry=RetryPolicy(backoff_base=0), instrumentation=instrumentation)
+
+    api.send_message(TEST_USER, TEST_MESSAGE, image=TEST_IMAGE_BYTES)
+
+    failed, unavailable, sent = instrumentation.requests
+    assert {metrics.endpoint for metrics in instrumentation.requests} == {"messages.json"}
+    assert isinstance(failed.error, requests.ConnectionError)
+    assert failed.status_code is None
+    assert unavailable.status_code == 503  # noqa: PLR2004
+    assert sent.status_code == 200  # noqa: PLR2004
+    assert sent.bytes_sent > len(TEST_IMAGE_BYTES)
+    assert sent.bytes_received == len(responses.calls[-1].response.content)
+    assert sent.headers["X-Request-Id"]
+    assert all(metrics.duration >= 0 for metrics in instrumentation.requests)
+    assert [retry[2] for retry in instrumentation.retries] == [1, 2]
+    assert instrumentation.quotas == [RateLimit(TEST_APP_LIMIT, TEST_APP_REMAINING, TEST_APP_RESET)]
+
+
+@responses.activate
+def test_Instrumentation_receives_failed_requests():
+    """Test that a response reporting an error is reported with its status code, and the default methods do nothing."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback)
+    instrumentation = RecordingInstrumentation()
+    api = PushoverAPI(TEST_TOKEN, instrumentation=instrumentation)
+
+    with pytest.raises(BadAPIRequestError):
+        api.send_message(TEST_BAD_GENERAL_ID, TEST_MESSAGE)
+    assert instrumentation.requests[0].status_code == 400  # noqa: PLR2004
+
+    api.instrumentation = Instrumentation()
+    api.send_message(TEST_USER, TEST_MESSAGE)
+
+
+def test_Instrumentation_receives_async_requests(AsyncPushoverAPI):
+    """Test that the requests of the asyncio client are reported too."""
+    instrumentation = RecordingInstrumentation()
+    AsyncPushoverAPI.instrumentation = instrumentation
+
+    async def send():
+        """Send a message and check a receipt."""
+        async with AsyncPushoverAPI:
+            await AsyncPushoverAPI.send_message(TEST_USER, TEST_MESSAGE)
+            await AsyncPushoverAPI.check_receipt(TEST_RECEIPT_ID)
+
+    asyncio.run(send())
+
+    assert [metrics.endpoint for metrics in instrumentation.requests] == ["messages.json", "receipts/{}.json"]
+    assert instrumentation.requests[0].bytes_sent > 0
+    assert len(instrumentation.quotas) == 1
+
+
+@responses.activate
+def test_PrometheusInstrumentation_records_metrics():
+    """Test that requests and the quota are recorded as Prometheus metrics."""
+    prometheus_client = pytest.importorskip("prometheus_client")
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback)
+    registry = prometheus_client.CollectorRegistry()
+    api = PushoverAPI(TEST_TOKEN, instrumentation=PrometheusInstrumentation(registry=registry))
+
+    api.send_message(TEST_USER, TEST_MESSAGE)
+    api.send_message(TEST_USER, TEST_MESSAGE)
+
+    labels = {"endpoint": "messages.json", "method": "POST"}
+    assert registry.get_sample_value("pushover_requests_total", {**labels, "status": "200"}) == 2  # noqa: PLR2004
+    assert registry.get_sample_value("pushover_request_duration_seconds_count", labels) == 2  # noqa: PLR2004
+    assert registry.get_sample_value("pushover_request_bytes_sent_total", labels) > 0
+    assert registry.get_sample_value("pushover_quota_remaining") == TEST_APP_REMAINING
+
+
+@responses.activate
+def test_OpenTelemetryInstrumentation_records_metrics():
+    """Test that requests and the quota are recorded as OpenTelemetry metrics."""
+    sdk_metrics = pytest.importorskip("opentelemetry.sdk.metrics")
+    export = pytest.importorskip("opentelemetry.sdk.metrics.export")
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback)
+    reader = export.InMemoryMetricReader()
+    provider = sdk_metrics.MeterProvider(metric_readers=[reader])
+    api = PushoverAPI(TEST_TOKEN, instrumentation=OpenTelemetryInstrumentation(meter_provider=provider))
+
+    api.send_message(TEST_USER, TEST_MESSAGE)
+
+    collected = {
+        metric.name: metric.data.data_points
+        for resource_metrics in reader.get_metrics_data().resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+    (requests_point,) = collected["pushover.requests"]
+    assert requests_point.value == 1
+    assert requests_point.attributes["http.response.status_code"] == 200  # noqa: PLR2004
+    assert collected["pushover.request.duration"][0].count == 1
+    assert collected["pushover.quota.remaining"][0].value == TEST_APP_REMAINING
@@ -0,0 +1,150 @@
+"""Tests for the :mod:`pushover_complete.coalescing.MessageCoalescer` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import asyncio
+
+import httpx
+import pytest
+
+from pushover_complete.async_pushover_api import AsyncPushoverAPI
+from pushover_complete.coalescing import MessageCoalescer, summary_message
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.pushover_api import PushoverAPI
+from pushover_complete.testing import FakePushoverServer
+from tests.constants import TEST_DEVICES, TEST_MESSAGE, TEST_TITLE, TEST_TOKEN, TEST_USER
+
+
+def test_MessageCoalescer_drops_duplicates_within_window():
+    """Test that only the first of a message's duplicates is admitted until its window closes."""
+    coalescer = MessageCoalescer(window=10)
+    fields = {"user": TEST_USER, "message": TEST_MESSAGE, "title": TEST_TITLE}
+
+    assert coalescer.admit(fields, now=0)
+    assert not coalescer.admit(dict(fields), now=5)
+    assert coalescer.admit({**fields, "title": None}, now=5)
+    assert coalescer.admit({**fields, "user": "u" * 30}, now=5)
+    assert coalescer.admit(fields, now=10)
+    assert coalescer.pop_due(now=20) == []
+    assert len(coalescer) == 0
+
+
+def test_MessageCoalescer_merges_duplicates():
+    """Test that merged duplicates become a single summary once the window closes, or early when forgotten."""
+    coalescer = MessageCoalescer(window=10, merge=True, maxsize=2)
+    fields = {"user": TEST_USER, "message": TEST_MESSAGE, "attachment_base64": "aGk=", "attachment_type": "image/png"}
+
+    assert coalescer.admit(fields, now=0)
+    for now in (1, 2, 3):
+        assert not coalescer.admit({**fields, "timestamp": now}, now=now)
+    assert coalescer.pop_due(now=9) == []
+    assert coalescer.pop_due(now=10) == [
+        {"user": TEST_USER, "message": f"{TEST_MESSAGE} (3 more occurrences)", "timestamp": 3},
+    ]
+
+    assert coalescer.admit({"user": TEST_USER, "message": "a"}, now=20)
+    assert not coalescer.admit({"user": TEST_USER, "message": "a"}, now=21)
+    assert coalescer.admit({"user": TEST_USER, "message": "b"}, now=22)
+    assert coalescer.admit({"user": TEST_USER, "message": "c"}, now=23)
+    assert len(coalescer) == 2  # noqa: PLR2004 -- the first was forgotten to make room
+    assert coalescer.pop_due(now=23) == [{"user": TEST_USER, "message": "a (1 more occurrence)"}]
+    assert not coalescer.admit({"user": TEST_USER, "message": "b"}, now=24)
+    assert coalescer.drain() == [{"user": TEST_USER, "message": "b (1 more occurrence)"}]
+    assert len(coalescer) == 0
+
+
+def test_MessageCoalescer_forgets_messages_not_sent():
+    """Test that a message forgotten after failing to be sent is admitted again, and its duplicates still merged."""
+    coalescer = MessageCoalescer(window=10, merge=True)
+    fields = {"user": TEST_USER, "message": TEST_MESSAGE}
+
+    assert coalescer.admit(fields, now=0)
+    assert not coalescer.admit(dict(fields), now=1)
+    coalescer.forget(fields)
+    assert coalescer.admit(dict(fields), now=2)
+    assert coalescer.pop_due(now=2) == [{"user": TEST_USER, "message": f"{TEST_MESSAGE} (1 more occurrence)"}]
+
+    # a message from a window which has closed mustn't make the coalescer forget a later one
+    later = dict(fields)
+    assert coalescer.admit(later, now=20)
+    coalescer.forget(fields)
+    assert not coalescer.admit(dict(fields), now=21)
+
+
+def test_summary_message_fits_limit():
+    """Test that the summary of a long message is cut short to stay within the Pushover API's limit."""
+    summary = summary_message("x" * 1024, 12)
+
+    assert len(summary) == 1024  # noqa: PLR2004 -- the longest message allowed
+    assert summary.endswith("x... (12 more occurrences)")
+
+
+def test_PushoverAPI_coalesces_messages():
+    """Test that duplicates aren't sent, and their summary is sent when the API is closed."""
+    with FakePushoverServer(token=TEST_TOKEN, users={TEST_USER: TEST_DEVICES}) as server:
+        with PushoverAPI(TEST_TOKEN, api_url=server.url, coalescer=MessageCoalescer(merge=True)) as api:
+            api.session.trust_env = False
+            resps = api.send_messages(
+                [{"user": TEST_USER, "message": TEST_MESSAGE}] * 3 + [{"user": TEST_USER, "message": "other"}],
+                max_workers=1,
+            )
+
+            assert resps[0]["status"] == 1
+            assert resps[1:3] == [None, None]
+            assert [message["message"] for message in server.messages] == [TEST_MESSAGE, "other"]
+            assert api.send_coalesced() == []
+
+        assert server.messages[-1]["message"] == f"{TEST_MESSAGE} (2 more occurrences)"
+
+
+def test_AsyncPushoverAPI_coalesces_messages():
+    """Test that the asyncio client holds back duplicates, and sends their summary when closed."""
+    with FakePushoverServer(token=TEST_TOKEN, users={TEST_USER: TEST_DEVICES}) as server:
+
+        async def send():
+            """Send a message twice to the fake server."""
+            async with httpx.AsyncClient(trust_env=False) as client:
+                api = AsyncPushoverAPI(
+                    TEST_TOKEN, client=client, api_url=server.url, coalescer=MessageCoalescer(merge=True)
+                )
+                async with api:
+                    return await api.send_messages([{"user": TEST_USER, "message": TEST_MESSAGE}] * 2)
+
+        resps = asyncio.run(send())
+
+    assert resps[0]["status"] == 1
+    assert resps[1] is None
+    assert [message["message"] for message in server.messages] == [TEST_MESSAGE, f"{TEST_MESSAGE} (1 more occurrence)"]
+
+
+def test_PushoverAPI_sends_retried_message_after_failure():
+    """Test that a message which failed to be sent isn't held back as a duplicate when retried."""
+    with FakePushoverServer(token=TEST_TOKEN, users={TEST_USER: TEST_DEVICES}, error_rate=1) as server:
+        with PushoverAPI(TEST_TOKEN, api_url=server.url, coalescer=MessageCoalescer()) as api:
+            api.session.trust_env = False
+            with pytest.raises(BadAPIRequestError):
+                api.send_message(TEST_USER, TEST_MESSAGE)
+
+            server.error_rate = 0
+            assert api.send_message(TEST_USER, TEST_MESSAGE)["status"] == 1
+            assert api.send_message(TEST_USER, TEST_MESSAGE) is None
+
+        assert [message["message"] for message in server.messages] == [TEST_MESSAGE]
+
+
+def test_AsyncPushoverAPI_sends_retried_message_after_failure():
+    """Test that the asyncio client doesn't hold back a retry of a message which failed to be sent."""
+    with FakePushoverServer(token=TEST_TOKEN, users={TEST_USER: TEST_DEVICES}, error_rate=1) as server:
+
+        async def send():
+            """Send a message while the server fails, then retry it."""
+            async with httpx.AsyncClient(trust_env=False) as client:
+                api = AsyncPushoverAPI(TEST_TOKEN, client=client, api_url=server.url, coalescer=MessageCoalescer())
+                async with api:
+                    with pytest.raises(BadAPIRequestError):
+                        await api.send_message(TEST_USER, TEST_MESSAGE)
+                    server.error_rate = 0
+                    return await api.send_message(TEST_USER, TEST_MESSAGE)
+
+        resp = asyncio.run(send())
+
+    assert resp["status"] == 1
+    assert [message["message"] for message in server.messages] == [TEST_MESSAGE]
@@ -0,0 +1 @@
+"""Tests for the MessageResult class and the other compact results."""
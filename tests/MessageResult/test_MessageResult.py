@@ -0,0 +1,102 @@
+"""Tests for the :mod:`pushover_complete.results.MessageResult` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import copy
+import json
+import pickle
+import re
+from urllib.parse import urljoin
+
+import pytest
+import responses
+
+from pushover_complete.pushover_api import PushoverAPI
+from pushover_complete.rate_limit import RateLimit
+from pushover_complete.results import GroupInfo, MessageResult, ReceiptStatus, ValidationResult
+from tests.constants import (
+    PUSHOVER_API_URL,
+    TEST_APP_LIMIT,
+    TEST_APP_REMAINING,
+    TEST_APP_RESET,
+    TEST_DEVICES,
+    TEST_GROUP,
+    TEST_GROUP_NAME,
+    TEST_MESSAGE,
+    TEST_RECEIPT_ID,
+    TEST_REQUEST_ID,
+    TEST_TOKEN,
+    TEST_USER,
+)
+from tests.responses_callbacks import groups_callback, messages_callback, receipt_callback, validate_callback
+
+
+def message_result(body):
+    """Build a :class:`MessageResult` from a response body."""
+    return MessageResult(json.dumps(body).encode(), body)
+
+
+def test_MessageResult_behaves_like_its_dict():
+    """Test that a result exposes its fields as attributes and the rest of the body like a dict."""
+    body = {"status": 1, "request": TEST_REQUEST_ID, "receipt": TEST_RECEIPT_ID}
+    result = message_result(body)
+
+    assert result.request == TEST_REQUEST_ID
+    assert result.receipt == TEST_RECEIPT_ID
+    assert result.rate_limit is None
+    assert result == body
+    assert result == message_result(body)
+    assert result != {"status": 1}
+    assert result["status"] == 1
+    assert "receipt" in result
+    assert result.get("missing", "default") == "default"
+    assert result.as_dict() == body
+    assert message_result({"status": 1, "request": TEST_REQUEST_ID}).receipt is None
+
+
+def test_MessageResult_is_compact_and_copyable():
+    """Test that a result has no instance dict and survives copying and pickling."""
+    result = message_result({"status": 1, "request": TEST_REQUEST_ID})
+
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.extra = 1
+    assert copy.deepcopy(result) == result
+    assert pickle.loads(pickle.dumps(result)) == result  # noqa: S301 -- our own data
+    with pytest.raises(TypeError):
+        hash(result)
+
+
+@responses.activate
+def test_PushoverAPI_returns_compact_results():
+    """Test that an instance created with compact_results returns result objects that equal the dicts."""
+    url_re = re.compile(r"https://api\.pushover\.net/1/(receipts/r|groups/g)[a-zA-Z0-9]*\.json")
+    responses.add_callback(responses.POST, urljoin(PUSHOVER_API_URL, "messages.json"), callback=messages_callback)
+    responses.add_callback(responses.POST, urljoin(PUSHOVER_API_URL, "users/validate.json"), callback=validate_callback)
+    responses.add_callback(
+        responses.GET,
+        url_re,
+        callback=lambda request: (receipt_callback if "/receipts/" in request.url else groups_callback)(request),
+    )
+    api = PushoverAPI(TEST_TOKEN, compact_results=True)
+
+    sent = api.send_message(TEST_USER, TEST_MESSAGE)
+    assert isinstance(sent, MessageResult)
+    assert sent == {"status": 1, "request": TEST_REQUEST_ID}
+    assert sent.rate_limit == RateLimit(TEST_APP_LIMIT, TEST_APP_REMAINING, TEST_APP_RESET)
+
+    status = api.check_receipt(TEST_RECEIPT_ID)
+    assert isinstance(status, ReceiptStatus)
+    assert status.acknowledged is True
+    assert status.called_back is False
+    assert status.acknowledged_by == TEST_USER
+    assert status["acknowledged"] == 1
+
+    group = api.group_info(TEST_GROUP)
+    assert isinstance(group, GroupInfo)
+    assert group.name == TEST_GROUP_NAME
+    assert [member["device"] for member in group.users] == TEST_DEVICES[:2]
+
+    validation = api.validate(TEST_USER)
+    assert isinstance(validation, ValidationResult)
+    assert validation.devices == tuple(TEST_DEVICES)
+    assert validation.group is False
+    assert validation == {"status": 1, "request": TEST_REQUEST_ID, "group": 0, "devices": TEST_DEVICES}
@@ -0,0 +1,101 @@
+"""Tests for the :mod:`pushover_complete.validation.MessageValidator` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import asyncio
+from urllib.parse import urljoin
+
+import httpx
+import pytest
+import responses
+
+from pushover_complete.async_pushover_api import AsyncPushoverAPI
+from pushover_complete.error import BadAPIRequestError, MessageValidationError
+from pushover_complete.pushover_api import PushoverAPI
+from pushover_complete.validation import MessageValidator
+from tests.constants import PUSHOVER_API_URL, SOUNDS, TEST_MESSAGE, TEST_REQUEST_ID, TEST_TOKEN, TEST_USER
+from tests.httpx_transport import callback_transport
+from tests.responses_callbacks import messages_callback, sounds_callback
+
+
+def test_MessageValidator_reports_every_problem():
+    """Test that every problem with a message is reported at once."""
+    validator = MessageValidator()
+    problems = validator.check({"message": "x" * 1025, "title": "x" * 251, "priority": 2, "retry": 10})
+
+    assert problems == [
+        "message cannot be longer than 1024 characters",
+        "title cannot be longer than 250 characters",
+        "retry must be at least 30 seconds",
+        "expire must be supplied with priority=2",
+    ]
+    assert validator.check({"message": TEST_MESSAGE, "priority": 2, "retry": 30, "expire": 10800}) == []
+    assert validator.check({"message": " ", "priority": "loud"}) == [
+        "message cannot be blank",
+        "priority must be an integer",
+    ]
+    assert validator.check({"message": TEST_MESSAGE, "priority": 3}) == ["priority is invalid"]
+
+
+def test_MessageValidator_keeps_sounds_until_they_expire():
+    """Test that the sounds are only needed for messages with a sound, and again once they expire."""
+    validator = MessageValidator(check_sounds=True, sounds_ttl=10)
+
+    assert not validator.needs_sounds({"message": TEST_MESSAGE})
+    assert validator.needs_sounds({"message": TEST_MESSAGE, "sound": "bike"}, now=0)
+    validator.update_sounds(SOUNDS, now=0)
+    assert not validator.needs_sounds({"message": TEST_MESSAGE, "sound": "bike"}, now=5)
+    assert validator.needs_sounds({"message": TEST_MESSAGE, "sound": "bike"}, now=10)
+    assert validator.check({"message": TEST_MESSAGE, "sound": "nope"}) == ["sound is invalid"]
+    assert not MessageValidator().check({"message": TEST_MESSAGE, "sound": "nope"})
+
+
+@responses.activate
+def test_PushoverAPI_validates_messages_before_sending():
+    """Test that messages found invalid are not sent, and the sounds are fetched only once."""
+    responses.add_callback(responses.POST, urljoin(PUSHOVER_API_URL, "messages.json"), callback=messages_callback)
+    responses.add_callback(responses.GET, urljoin(PUSHOVER_API_URL, "sounds.json"), callback=sounds_callback)
+    api = PushoverAPI(TEST_TOKEN, validator=MessageValidator(check_sounds=True))
+
+    with pytest.raises(MessageValidationError) as exc_info:
+        api.send_message(TEST_USER, "x" * 1025, priority=2)
+    assert exc_info.value.problems == (
+        "message cannot be longer than 1024 characters",
+        "retry must be supplied with priority=2",
+        "expire must be supplied with priority=2",
+    )
+    assert exc_info.value.status_code is None
+    assert len(responses.calls) == 0
+
+    results = api.send_messages(
+        [
+            {"user": TEST_USER, "message": TEST_MESSAGE, "sound": "bike"},
+            {"user": TEST_USER, "message": TEST_MESSAGE, "sound": "nope"},
+        ],
+        return_exceptions=True,
+    )
+    assert results[0]["request"] == TEST_REQUEST_ID
+    assert isinstance(results[1], BadAPIRequestError)
+    assert [call.request.url.rsplit("/", 1)[1] for call in responses.calls] == ["sounds.json", "messages.json"]
+
+
+def test_AsyncPushoverAPI_validates_messages_before_sending():
+    """Test that the asyncio client checks messages, fetching the sounds when needed."""
+    transport = callback_transport(
+        [
+            ("POST", r"https://api\.pushover\.net/1/messages\.json", messages_callback),
+            ("GET", r"https://api\.pushover\.net/1/sounds\.json", sounds_callback),
+        ]
+    )
+    api = AsyncPushoverAPI(
+        TEST_TOKEN,
+        client=httpx.AsyncClient(transport=transport),
+        validator=MessageValidator(check_sounds=True),
+    )
+
+    async def send():
+        """Send a message with an invalid sound, then a valid one."""
+        async with api:
+            with pytest.raises(MessageValidationError, match="sound is invalid"):
+                await api.send_message(TEST_USER, TEST_MESSAGE, sound="nope")
+            return await api.send_message(TEST_USER, TEST_MESSAGE, sound="bike")
+
+    assert asyncio.run(send()) == {"status": 1, "request": TEST_REQUEST_ID}
@@ -0,0 +1,143 @@
+"""Tests for the :mod:`pushover_complete.outbox.Outbox` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import sqlite3
+import time
+from io import BytesIO
+from urllib.parse import urljoin
+
+import pytest
+import responses
+
+from pushover_complete.outbox import Outbox
+from pushover_complete.retry import RetryPolicy
+from pushover_complete.validation import MessageValidator
+from tests.constants import PUSHOVER_API_URL, TEST_BAD_GENERAL_ID, TEST_MESSAGE, TEST_TITLE, TEST_USER
+from tests.fixtures import PushoverAPI  # noqa: F401 -- needs to be imported for pytest to find it
+from tests.responses_callbacks import messages_callback
+
+MESSAGES_URL = urljoin(PUSHOVER_API_URL, "messages.json")
+
+
+@responses.activate
+def test_Outbox_sends_enqueued_messages(PushoverAPI, tmp_path):
+    """Test that enqueued messages are sent and removed by drain."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    outbox = Outbox(PushoverAPI, tmp_path / "outbox.db", max_workers=2)
+    for _ in range(3):
+        outbox.enqueue(TEST_USER, TEST_MESSAGE, title=TEST_TITLE)
+
+    assert outbox.pending() == 3  # noqa: PLR2004 -- the number enqueued
+    assert outbox.drain() == 3  # noqa: PLR2004 -- the number enqueued
+    assert outbox.pending() == 0
+    assert len(responses.calls) == 3  # noqa: PLR2004 -- the number enqueued
+    outbox.close()
+
+
+@responses.activate
+def test_Outbox_survives_restart(PushoverAPI, tmp_path):
+    """Test that messages enqueued before the outbox is closed are sent after it is reopened."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    outbox = Outbox(PushoverAPI, tmp_path / "outbox.db")
+    outbox.enqueue(TEST_USER, TEST_MESSAGE)
+    outbox.close()
+
+    reopened = Outbox(PushoverAPI, tmp_path / "outbox.db")
+    assert reopened.drain() == 1
+    reopened.close()
+
+
+@responses.activate
+def test_Outbox_marks_invalid_messages_failed(PushoverAPI, tmp_path):
+    """Test that a message rejected by the API is not retried and is kept with its error."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    outbox = Outbox(PushoverAPI, tmp_path / "outbox.db")
+    message_id = outbox.enqueue(TEST_BAD_GENERAL_ID, TEST_MESSAGE)
+
+    assert outbox.drain() == 0
+    assert outbox.pending() == 0
+    [(failed_id, message, error)] = outbox.failed()
+    assert failed_id == message_id
+    assert message == {"user": TEST_BAD_GENERAL_ID, "message": TEST_MESSAGE}
+    assert "BadAPIRequestError" in error
+    outbox.close()
+
+
+@responses.activate
+def test_Outbox_marks_messages_failing_validation_failed(PushoverAPI, tmp_path):
+    """Test that a message rejected by the API instance's validator is not retried and no request is made."""
+    PushoverAPI.validator = MessageValidator()
+    outbox = Outbox(PushoverAPI, tmp_path / "outbox.db")
+    outbox.enqueue(TEST_USER, "")
+
+    assert outbox.drain() == 0
+    assert outbox.pending() == 0
+    [(_, _, error)] = outbox.failed()
+    assert "MessageValidationError" in error
+    assert len(responses.calls) == 0
+    outbox.close()
+
+
+@responses.activate
+def test_Outbox_retries_transient_failures_later(PushoverAPI, tmp_path):
+    """Test that a message failing for a transient reason is retried once its backoff has passed."""
+    responses.add(responses.POST, MESSAGES_URL, status=503, body="Service Unavailable")
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    outbox = Outbox(
+        PushoverAPI, tmp_path / "outbox.db", retry=RetryPolicy(backoff_base=60, backoff_max=60, jitter=False)
+    )
+    outbox.enqueue(TEST_USER, TEST_MESSAGE)
+    now = time.time()
+
+    assert outbox.drain(now=now) == 0
+    assert outbox.drain(now=now + 30) == 0
+    assert outbox.pending() == 1
+    assert outbox.drain(now=now + 60) == 1
+    outbox.close()
+
+
+@responses.activate
+def test_Outbox_worker_sends_in_background(PushoverAPI, tmp_path):
+    """Test that the worker thread started by the context manager sends enqueued messages."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    with Outbox(PushoverAPI, tmp_path / "outbox.db") as outbox:
+        outbox.enqueue(TEST_USER, TEST_MESSAGE)
+        deadline = time.monotonic() + 5
+        while outbox.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert outbox.pending() == 0
+
+
+@responses.activate
+def test_Outbox_worker_survives_errors(PushoverAPI, tmp_path, monkeypatch, caplog):
+    """Test that the worker thread logs an error draining the outbox, then carries on sending messages."""
+    responses.add_callback(responses.POST, MESSAGES_URL, callback=messages_callback, content_type="application/json")
+    outbox = Outbox(PushoverAPI, tmp_path / "outbox.db", retry=RetryPolicy(backoff_base=0.01, jitter=False))
+    drain = outbox.drain
+    calls = []
+
+    def drain_once_locked():
+        """Fail the first drain as if the database were locked."""
+        calls.append(None)
+        if len(calls) == 1:
+            msg = "database is locked"
+            raise sqlite3.OperationalError(msg)
+        return drain()
+
+    monkeypatch.setattr(outbox, "drain", drain_once_locked)
+    with outbox:
+        outbox.enqueue(TEST_USER, TEST_MESSAGE)
+        deadline = time.monotonic() + 5
+        while outbox.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert outbox.pending() == 0
+    assert "database is locked" in caplog.text
+
+
+def test_Outbox_rejects_file_like_images(PushoverAPI, tmp_path):
+    """Test that only images given as paths can be enqueued."""
+    outbox = Outbox(PushoverAPI, tmp_path / "outbox.db")
+    with pytest.raises(TypeError):
+        outbox.enqueue(TEST_USER, TEST_MESSAGE, image=BytesIO(b""))
+    outbox.close()
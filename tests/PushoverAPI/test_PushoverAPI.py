@@ -1,6 +1,10 @@
 """Tests for the :mod:`pushover_complete.pushover_api.PushoverAPI` class."""  # noqa: N999 -- weird name for tests module is okay
 
+import base64
+import json
+import mmap
 import re
+import time
 from io import BytesIO
 
 try:
@@ -9,17 +13,26 @@ except ImportError:
     from pathlib2 import Path
 
 try:
-    from urllib.parse import urljoin
+    from urllib.parse import parse_qs, urljoin
 except ImportError:
-    from urlparse import urljoin
+    from urlparse import parse_qs, urljoin
 
 import pytest
+import requests
 import responses
+from requests.adapters import DEFAULT_POOLSIZE
+from urllib3.exceptions import MaxRetryError, NewConnectionError
 
-from pushover_complete.error import BadAPIRequestError
+from pushover_complete import pushover_api
+from pushover_complete.error import BadAPIRequestError, QuotaExceededError
+from pushover_complete.rate_limit import QuotaThrottle, RateLimit
+from pushover_complete.retry import RetryPolicy
 from tests.constants import (
     PUSHOVER_API_URL,
     SOUNDS,
+    TEST_APP_LIMIT,
+    TEST_APP_REMAINING,
+    TEST_APP_RESET,
     TEST_BAD_GENERAL_ID,
     TEST_DEVICES,
     TEST_GROUP,
@@ -31,6 +44,7 @@ from tests.constants import (
     TEST_SUBSCRIBED_USER_KEY,
     TEST_SUBSCRIPTION_CODE,
     TEST_TITLE,
+    TEST_TOKEN,
     TEST_URL,
     TEST_URL_TITLE,
     TEST_USER,
@@ -49,6 +63,7 @@ from tests.responses_callbacks import (
     groups_enable_user_callback,
     groups_rename_callback,
     licenses_assign_callback,
+    limits_callback,
     messages_callback,
     receipt_callback,
     receipt_cancel_callback,
@@ -86,6 +101,160 @@ def test_generic_post_without_payload(PushoverAPI):
     assert resp == {"status": 1, "payload-test": False}
 
 
+@responses.activate
+def test_PushoverAPI_reuses_its_session(PushoverAPI):
+    """Test that every call made via an instance goes through the same pooled session."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    session = PushoverAPI.session
+    PushoverAPI.send_message(TEST_USER, TEST_MESSAGE)
+    PushoverAPI.send_messages([{"user": TEST_USER, "message": TEST_MESSAGE}] * 2)
+
+    assert PushoverAPI.session is session
+    assert session.get_adapter(PUSHOVER_API_URL)._pool_maxsize == DEFAULT_POOLSIZE  # noqa: SLF001 -- no public accessor
+
+
+def test_PushoverAPI_configures_connection_pool():
+    """Test that the connection pool of the owned session is configurable."""
+    api = pushover_api.PushoverAPI(TEST_TOKEN, pool_connections=2, pool_maxsize=32, pool_block=True)
+    adapter = api.session.get_adapter(PUSHOVER_API_URL)
+
+    assert adapter._pool_connections == 2  # noqa: SLF001, PLR2004 -- no public accessor
+    assert adapter._pool_maxsize == 32  # noqa: SLF001, PLR2004 -- no public accessor
+    assert adapter._pool_block is True  # noqa: SLF001 -- no public accessor
+
+
+@responses.activate
+def test_PushoverAPI_sends_to_given_api_url():
+    """Test that requests go to the base URL given to the constructor, through the pooled adapter."""
+    api_url = "http://127.0.0.1:8080/1/"
+    responses.add_callback(
+        responses.POST,
+        urljoin(api_url, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    api = pushover_api.PushoverAPI(TEST_TOKEN, pool_maxsize=32, api_url=api_url)
+    resp = api.send_message(TEST_USER, TEST_MESSAGE)
+
+    assert resp["request"] == TEST_REQUEST_ID
+    assert api.session.get_adapter(api_url)._pool_maxsize == 32  # noqa: SLF001, PLR2004 -- no public accessor
+
+
+def test_PushoverAPI_takes_options_by_keyword_only():
+    """Test that the options after the session can't be given by position, so their order can change."""
+    with pytest.raises(TypeError):
+        pushover_api.PushoverAPI(TEST_TOKEN, None, 32)
+
+
+def test_PushoverAPI_closes_owned_session_on_exit():
+    """Test that the context manager closes a session owned by the instance and a new one is made on next use."""
+    with pushover_api.PushoverAPI(TEST_TOKEN) as api:
+        session = api.session
+
+    assert api._session is None  # noqa: SLF001 -- checking the private state on purpose
+    assert api.session is not session
+
+
+def test_PushoverAPI_does_not_close_provided_session():
+    """Test that a session passed in by the caller is used but left open."""
+    session = requests.Session()
+    with pushover_api.PushoverAPI(TEST_TOKEN, session=session) as api:
+        assert api.session is session
+
+    assert api.session is session
+
+
+@responses.activate
+def test_PushoverAPI_retries_transient_failures():
+    """Test that failures to connect and 5xx responses are retried, rewinding attachments in between."""
+    url = urljoin(PUSHOVER_API_URL, "messages.json")
+    refused = NewConnectionError(None, "connection refused")
+    responses.add(responses.POST, url, body=requests.ConnectionError(MaxRetryError(None, url, refused)))
+    responses.add(responses.POST, url, body=requests.ConnectTimeout())
+    responses.add(responses.POST, url, status=503, body="<html>Service Unavailable</html>")
+    responses.add_callback(responses.POST, url, callback=messages_callback, content_type="application/json")
+    api = pushover_api.PushoverAPI(TEST_TOKEN, retry=RetryPolicy(max_attempts=4, backoff_base=0, jitter=False))
+
+    resp = api.send_message(TEST_USER, TEST_MESSAGE, image=BytesIO(TEST_IMAGE_BYTES))
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+    assert len(responses.calls) == 4  # noqa: PLR2004 -- three failures and a success
+    assert TEST_IMAGE_BYTES in responses.calls[3].request.body
+
+
+@pytest.mark.parametrize("error", [requests.ReadTimeout(), requests.ConnectionError("connection reset by peer")])
+@responses.activate
+def test_PushoverAPI_does_not_retry_messages_which_may_have_been_sent(error):
+    """Test that a message isn't sent again after failing once it may have reached the Pushover servers."""
+    responses.add(responses.POST, urljoin(PUSHOVER_API_URL, "messages.json"), body=error)
+    responses.add(responses.GET, urljoin(PUSHOVER_API_URL, "sounds.json"), body=requests.ReadTimeout())
+    responses.add_callback(responses.GET, urljoin(PUSHOVER_API_URL, "sounds.json"), callback=sounds_callback)
+    api = pushover_api.PushoverAPI(TEST_TOKEN, retry=RetryPolicy(backoff_base=0))
+
+    with pytest.raises(type(error)):
+        api.send_message(TEST_USER, TEST_MESSAGE)
+    assert len(responses.calls) == 1
+    # a GET can be repeated safely
+    assert api.get_sounds() == SOUNDS
+
+
+@responses.activate
+def test_PushoverAPI_gives_up_after_max_attempts():
+    """Test that a request is attempted at most max_attempts times and a non-JSON error body still raises cleanly."""
+    responses.add(responses.GET, urljoin(PUSHOVER_API_URL, "sounds.json"), status=502, body="Bad Gateway")
+    api = pushover_api.PushoverAPI(TEST_TOKEN, retry=RetryPolicy(max_attempts=2, backoff_base=0))
+
+    with pytest.raises(BadAPIRequestError, match="502"):
+        api.get_sounds()
+    assert len(responses.calls) == 2  # noqa: PLR2004 -- max_attempts
+
+
+@pytest.mark.parametrize("loads", [json.loads, None])
+@responses.activate
+def test_PushoverAPI_decodes_responses_with_given_decoder(loads):
+    """Test that response bodies are decoded from their raw bytes by the chosen decoder, or the default one."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    decoded = []
+
+    def json_loads(content):
+        """Decode a response, noting what was given."""
+        decoded.append(content)
+        return (loads or pushover_api.loads)(content)
+
+    api = pushover_api.PushoverAPI(TEST_TOKEN, json_loads=json_loads)
+
+    assert api.send_message(TEST_USER, TEST_MESSAGE) == {"status": 1, "request": TEST_REQUEST_ID}
+    assert isinstance(decoded[0], bytes)
+    with pytest.raises(BadAPIRequestError):
+        api.send_message(TEST_BAD_GENERAL_ID, TEST_MESSAGE)
+
+
+@responses.activate
+def test_PushoverAPI_does_not_retry_invalid_requests():
+    """Test that 4xx responses other than 429 are not retried."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    api = pushover_api.PushoverAPI(TEST_TOKEN, retry=RetryPolicy(backoff_base=0))
+
+    with pytest.raises(BadAPIRequestError):
+        api.send_message(TEST_BAD_GENERAL_ID, TEST_MESSAGE)
+    assert len(responses.calls) == 1
+
+
 @responses.activate
 def test_PushoverAPI_sends_simple_message(PushoverAPI):
     """Test the sending of a simple message."""
@@ -139,6 +308,61 @@ def test_PushoverAPI_sends_message_with_image(PushoverAPI):
     assert resp == {"status": 1, "request": TEST_REQUEST_ID}
 
 
+@responses.activate
+@pytest.mark.parametrize("image_type", [bytes, bytearray, memoryview])
+def test_PushoverAPI_sends_message_with_image_from_buffer(PushoverAPI, image_type):
+    """Test the sending of an image attachment from bytes in memory."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    resp = PushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=image_type(TEST_IMAGE_BYTES))
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+    assert TEST_IMAGE_BYTES in responses.calls[0].request.body
+
+
+@responses.activate
+def test_PushoverAPI_sends_message_with_image_from_mmap(PushoverAPI, tmp_path):
+    """Test the sending of an image attachment from a memory-mapped file."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    img_path = tmp_path / "pushover.png"
+    img_path.write_bytes(TEST_IMAGE_BYTES)
+    with img_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as image:
+        resp = PushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=image)
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+    assert TEST_IMAGE_BYTES in responses.calls[0].request.body
+
+
+@responses.activate
+def test_PushoverAPI_sends_message_with_base64_attachment(PushoverAPI):
+    """Test the sending of a base64-encoded image attachment."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    encoded = base64.b64encode(TEST_IMAGE_BYTES).decode("ascii")
+    resp = PushoverAPI.send_message(TEST_USER, TEST_MESSAGE, attachment_base64=encoded, attachment_type="image/png")
+
+    assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+    sent = parse_qs(responses.calls[0].request.body)
+    assert sent["attachment_base64"] == [encoded]
+    assert sent["attachment_type"] == ["image/png"]
+
+    with pytest.raises(ValueError, match="only one"):
+        PushoverAPI.send_message(TEST_USER, TEST_MESSAGE, image=TEST_IMAGE_BYTES, attachment_base64=encoded)
+
+
 @responses.activate
 def test_PushoverAPI_sends_message_with_image_from_path_str(PushoverAPI, tmpdir):
     """Test the sending of an image attachment from a filesystem path string."""
@@ -196,8 +420,9 @@ def test_PushoverAPI_raises_error_on_bad_message(PushoverAPI):
         callback=messages_callback,
         content_type="application/json",
     )
-    with pytest.raises(BadAPIRequestError):
+    with pytest.raises(BadAPIRequestError) as excinfo:
         PushoverAPI.send_message(TEST_MESSAGE, TEST_BAD_GENERAL_ID)
+    assert excinfo.value.status_code == 400  # noqa: PLR2004 -- HTTP Bad Request
 
 
 @responses.activate
@@ -244,6 +469,91 @@ def test_PushoverAPI_sends_multiple_complex_messages(PushoverAPI):
     assert all(resp == {"status": 1, "request": TEST_REQUEST_ID} for resp in resps)
 
 
+@responses.activate
+def test_PushoverAPI_sends_multiple_messages_concurrently(PushoverAPI):
+    """Test sending multiple messages from a pool of threads, keeping the results in order."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+
+    messages = [{"user": TEST_USER, "message": TEST_MESSAGE}] * 20
+    resps = PushoverAPI.send_messages(messages, max_workers=4)
+
+    assert resps == [{"status": 1, "request": TEST_REQUEST_ID}] * 20
+
+
+@responses.activate
+def test_PushoverAPI_raises_first_error_sending_multiple_messages(PushoverAPI):
+    """Test that a failed message raises by default when sending multiple messages."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+
+    messages = [{"user": TEST_USER, "message": TEST_MESSAGE}, {"user": TEST_BAD_GENERAL_ID, "message": TEST_MESSAGE}]
+    with pytest.raises(BadAPIRequestError):
+        PushoverAPI.send_messages(messages, max_workers=2)
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+@responses.activate
+def test_PushoverAPI_collects_errors_sending_multiple_messages(PushoverAPI, max_workers):
+    """Test that failed messages are returned in place when sending multiple messages with return_exceptions."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+
+    messages = [
+        {"user": TEST_USER, "message": TEST_MESSAGE},
+        {"user": TEST_BAD_GENERAL_ID, "message": TEST_MESSAGE},
+        {"user": TEST_USER, "message": TEST_MESSAGE},
+    ]
+    resps = PushoverAPI.send_messages(messages, max_workers=max_workers, return_exceptions=True)
+
+    assert resps[0] == resps[2] == {"status": 1, "request": TEST_REQUEST_ID}
+    assert isinstance(resps[1], BadAPIRequestError)
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+@responses.activate
+def test_PushoverAPI_streams_multiple_messages(PushoverAPI, max_workers):
+    """Test that a stream of messages is consumed lazily and each message is yielded with its outcome."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    taken = []
+
+    def messages():
+        """Yield messages, some of them to an invalid user, noting each one taken."""
+        for i in range(100):
+            taken.append(i)
+            yield {"user": TEST_BAD_GENERAL_ID if i % 10 == 0 else TEST_USER, "message": f"{TEST_MESSAGE} {i}"}
+
+    outcomes = PushoverAPI.iter_send_messages(messages(), max_workers=max_workers)
+    message, resp = next(outcomes)
+    # at most twice max_workers in flight, plus the finished messages waiting to be yielded
+    assert len(taken) <= 4 * (max_workers or 1)
+
+    outcomes = [(message, resp), *outcomes]
+    assert sorted(int(message["message"].rsplit(" ", 1)[1]) for message, _ in outcomes) == list(range(100))
+    for message, resp in outcomes:
+        if message["user"] == TEST_BAD_GENERAL_ID:
+            assert isinstance(resp, BadAPIRequestError)
+        else:
+            assert resp == {"status": 1, "request": TEST_REQUEST_ID}
+
+
 @responses.activate
 def test_PushoverAPI_gets_sounds(PushoverAPI):
     """Test the retrieval of sounds."""
@@ -272,6 +582,54 @@ def test_PushoverAPI_raises_error_on_getting_sounds_with_bad_token(BadTokenPusho
         BadTokenPushoverAPI.get_sounds()
 
 
+@responses.activate
+def test_PushoverAPI_tracks_rate_limit(PushoverAPI):
+    """Test that the quota reported in the headers of a sent message is recorded."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    assert PushoverAPI.rate_limit is None
+
+    PushoverAPI.send_message(TEST_USER, TEST_MESSAGE)
+
+    assert PushoverAPI.rate_limit == RateLimit(TEST_APP_LIMIT, TEST_APP_REMAINING, TEST_APP_RESET)
+
+
+@responses.activate
+def test_PushoverAPI_gets_limits(PushoverAPI):
+    """Test the retrieval of the application's quota."""
+    responses.add_callback(
+        responses.GET,
+        urljoin(PUSHOVER_API_URL, "apps/limits.json"),
+        callback=limits_callback,
+        content_type="application/json",
+    )
+    rate_limit = PushoverAPI.get_limits()
+
+    assert rate_limit == RateLimit(TEST_APP_LIMIT, TEST_APP_REMAINING, TEST_APP_RESET)
+    assert PushoverAPI.rate_limit == rate_limit
+
+
+@responses.activate
+def test_PushoverAPI_throttle_refuses_to_send_into_reserve():
+    """Test that a throttled instance refuses to send once only the reserved messages remain."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "messages.json"),
+        callback=messages_callback,
+        content_type="application/json",
+    )
+    api = pushover_api.PushoverAPI(TEST_TOKEN, throttle=QuotaThrottle(reserve=10))
+    api.rate_limit = RateLimit(TEST_APP_LIMIT, 10, time.time() + 3600)
+
+    with pytest.raises(QuotaExceededError):
+        api.send_message(TEST_USER, TEST_MESSAGE)
+    assert len(responses.calls) == 0
+
+
 @responses.activate
 def test_PushoverAPI_validates_user(PushoverAPI):
     """Test validation of a user token."""
@@ -443,6 +801,59 @@ def test_PushoverAPI_migrates_multiple_subscriptions(PushoverAPI):
     )
 
 
+@responses.activate
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_PushoverAPI_resumes_migration_from_checkpoint(PushoverAPI, tmp_path, max_workers):
+    """Test that users recorded in the checkpoint aren't migrated again, while failed ones are retried."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "subscriptions/migrate.json"),
+        callback=subscription_migrate_callback,
+        content_type="application/json",
+    )
+    checkpoint = tmp_path / "migration.jsonl"
+    users = [{"user": TEST_USER, "device": "phone"}, {"user": TEST_BAD_GENERAL_ID}, {"user": TEST_USER}]
+    migrated = {"status": 1, "request": TEST_REQUEST_ID, "subscribed_user_key": TEST_SUBSCRIBED_USER_KEY}
+
+    resps = PushoverAPI.migrate_multiple_to_subscription(
+        users, TEST_SUBSCRIPTION_CODE, max_workers=max_workers, return_exceptions=True, checkpoint=checkpoint
+    )
+    assert resps[0] == resps[2] == migrated
+    assert isinstance(resps[1], BadAPIRequestError)
+    assert len(checkpoint.read_text().splitlines()) == 2  # noqa: PLR2004
+
+    # a record cut off by a crash is ignored
+    with checkpoint.open("a") as f:
+        f.write('{"item": {"subscription_code": ')
+    calls = len(responses.calls)
+    resps = PushoverAPI.migrate_multiple_to_subscription(
+        users, TEST_SUBSCRIPTION_CODE, max_workers=max_workers, return_exceptions=True, checkpoint=checkpoint
+    )
+    assert resps[0] == resps[2] == migrated
+    assert isinstance(resps[1], BadAPIRequestError)
+    assert len(responses.calls) == calls + 1
+
+
+@responses.activate
+def test_PushoverAPI_resumes_migration_from_checkpoint_cut_off_by_crash(PushoverAPI, tmp_path):
+    """Test that a record cut off by a crash doesn't swallow the next one, which would migrate its user again."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "subscriptions/migrate.json"),
+        callback=subscription_migrate_callback,
+        content_type="application/json",
+    )
+    checkpoint = tmp_path / "migration.jsonl"
+    checkpoint.write_text('{"item": {"subscription_code": ')
+    users = [{"user": TEST_USER}]
+
+    PushoverAPI.migrate_multiple_to_subscription(users, TEST_SUBSCRIPTION_CODE, checkpoint=checkpoint)
+    PushoverAPI.migrate_multiple_to_subscription(users, TEST_SUBSCRIPTION_CODE, checkpoint=checkpoint)
+
+    assert len(responses.calls) == 1
+    assert len(checkpoint.read_text().splitlines()) == 1
+
+
 @responses.activate
 def test_PushoverAPI_gets_group_info(PushoverAPI):
     """Test getting group info."""
@@ -472,6 +883,37 @@ def test_PushoverAPI_gets_group_info(PushoverAPI):
     }
 
 
+@responses.activate
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_PushoverAPI_reconciles_group(PushoverAPI, max_workers):
+    """Test reconciling a group's membership, with a report of the changes made and the errors for each user."""
+    responses.add_callback(
+        responses.GET,
+        re.compile(r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*\.json"),
+        callback=groups_callback,
+        content_type="application/json",
+    )
+    for action, callback in (
+        ("add_user", groups_add_user_callback),
+        ("delete_user", groups_delete_user_callback),
+    ):
+        responses.add_callback(
+            responses.POST,
+            re.compile(rf"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*/{action}\.json"),
+            callback=callback,
+            content_type="application/json",
+        )
+
+    changes = PushoverAPI.reconcile_group(TEST_GROUP, [TEST_BAD_GENERAL_ID], max_workers=max_workers)
+
+    assert [(change.user, change.actions) for change in changes] == [
+        (TEST_BAD_GENERAL_ID, ()),
+        (TEST_USER, ("delete",)),
+    ]
+    assert isinstance(changes[0].error, BadAPIRequestError)
+    assert changes[1].error is None
+
+
 @responses.activate
 def test_PushoverAPI_adds_user_to_group(PushoverAPI):
     """Test adding a user to a group."""
@@ -573,3 +1015,28 @@ def test_PushoverAPI_assigns_license_to_email(PushoverAPI):
     resp = PushoverAPI.assign_license(TEST_USER_EMAIL)
 
     assert resp == {"status": 1, "request": TEST_REQUEST_ID, "credits": 0}
+
+
+@responses.activate
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_PushoverAPI_assigns_multiple_licenses(PushoverAPI, max_workers):
+    """Test assigning licenses to a stream of users, collecting the error for each failed assignment."""
+    responses.add_callback(
+        responses.POST,
+        urljoin(PUSHOVER_API_URL, "licenses/assign.json"),
+        callback=licenses_assign_callback,
+        content_type="application/json",
+    )
+    identifiers = (identifier for identifier in [TEST_USER, TEST_BAD_GENERAL_ID, TEST_USER_EMAIL] * 5)
+
+    resps = PushoverAPI.assign_licenses(identifiers, max_workers=max_workers, return_exceptions=True)
+
+    assert len(resps) == 15  # noqa: PLR2004
+    for i, resp in enumerate(resps):
+        if i % 3 == 1:
+            assert isinstance(resp, BadAPIRequestError)
+        else:
+            assert resp == {"status": 1, "request": TEST_REQUEST_ID, "credits": 0}
+
+    with pytest.raises(BadAPIRequestError):
+        PushoverAPI.assign_licenses([TEST_USER, TEST_BAD_GENERAL_ID], max_workers=max_workers)
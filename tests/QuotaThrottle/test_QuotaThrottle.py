@@ -0,0 +1,56 @@
+"""Tests for the :mod:`pushover_complete.rate_limit.QuotaThrottle` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import pytest
+
+from pushover_complete.error import QuotaExceededError
+from pushover_complete.rate_limit import QuotaThrottle, RateLimit
+
+NOW = 1000.0
+
+
+def test_QuotaThrottle_allows_unknown_quota():
+    """Test that messages are not held back before any quota has been reported."""
+    assert QuotaThrottle(reserve=10, spread=True).delay(None, now=NOW) == 0
+
+
+def test_QuotaThrottle_allows_after_reset():
+    """Test that an exhausted quota no longer applies once its reset time has passed."""
+    assert QuotaThrottle().delay(RateLimit(100, 0, NOW - 1), now=NOW) == 0
+
+
+def test_QuotaThrottle_refuses_to_use_reserve():
+    """Test that the reserved messages are not used."""
+    throttle = QuotaThrottle(reserve=5)
+
+    assert throttle.delay(RateLimit(100, 6, NOW + 100), now=NOW) == 0
+    with pytest.raises(QuotaExceededError):
+        throttle.delay(RateLimit(100, 5, NOW + 100), now=NOW)
+
+
+def test_QuotaThrottle_spreads_messages_until_reset():
+    """Test that messages are spaced evenly over the time until the quota resets."""
+    throttle = QuotaThrottle(spread=True)
+    rate_limit = RateLimit(100, 10, NOW + 100)
+
+    assert [throttle.delay(rate_limit, now=NOW) for _ in range(3)] == [0, 10, 20]
+
+
+def test_QuotaThrottle_refuses_to_delay_beyond_max_delay():
+    """Test that a message which would wait longer than max_delay is refused without taking up a slot."""
+    throttle = QuotaThrottle(spread=True, max_delay=15)
+    rate_limit = RateLimit(100, 10, NOW + 100)
+
+    assert [throttle.delay(rate_limit, now=NOW) for _ in range(2)] == [0, 10]
+    with pytest.raises(QuotaExceededError) as exc_info:
+        throttle.delay(rate_limit, now=NOW)
+    assert exc_info.value.retry_at == NOW + 20
+    assert throttle.delay(rate_limit, now=NOW + 20) == 0
+
+    unbounded = QuotaThrottle(spread=True, max_delay=None)
+    rate_limit = RateLimit(100, 2, NOW + 10**6)
+    assert [unbounded.delay(rate_limit, now=NOW) for _ in range(2)] == [0, 5 * 10**5]
+
+
+def test_RateLimit_from_headers_without_headers():
+    """Test that a response without quota headers yields no rate limit."""
+    assert RateLimit.from_headers({"X-Request-Id": "abc"}) is None
@@ -0,0 +1 @@
+"""Tests for the ReceiptTracker class."""
@@ -0,0 +1,119 @@
+"""Tests for the :mod:`pushover_complete.receipts.ReceiptTracker` class."""  # noqa: N999 -- weird name for tests module is okay
+
+import json
+import re
+import threading
+
+import pytest
+import responses
+
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.receipts import ReceiptTracker
+from tests.constants import TEST_RECEIPT_ID, TEST_REQUEST_ID
+from tests.fixtures import PushoverAPI  # noqa: F401 -- needs to be imported for pytest to find it
+from tests.responses_callbacks import receipt_callback
+
+RECEIPT_URL_RE = re.compile(r"https://api\.pushover\.net/1/receipts/r[a-zA-Z0-9]*\.json")
+
+
+def pending_receipt_callback(request):  # noqa: ARG001 -- signature required by responses
+    """Mock the /receipts/{receipt}.json endpoint for a receipt that hasn't been acknowledged yet."""
+    resp_body = {
+        "status": 1,
+        "request": TEST_REQUEST_ID,
+        "acknowledged": 0,
+        "expired": 0,
+        "expires_at": 1000,
+    }
+    return 200, {}, json.dumps(resp_body)
+
+
+@responses.activate
+def test_ReceiptTracker_resolves_acknowledged_receipt(PushoverAPI):
+    """Test that polling resolves the future of an acknowledged receipt and calls its callback."""
+    responses.add_callback(responses.GET, RECEIPT_URL_RE, callback=receipt_callback, content_type="application/json")
+    tracker = ReceiptTracker(PushoverAPI, min_interval=5)
+    statuses = []
+
+    future = tracker.track({"status": 1, "receipt": TEST_RECEIPT_ID}, callback=statuses.append, now=0)
+    assert len(tracker) == 1
+    assert tracker.poll(now=4) == 0
+    assert tracker.poll(now=5) == 1
+
+    assert future.result(0)["acknowledged"] == 1
+    assert statuses == [future.result(0)]
+    assert len(tracker) == 0
+    assert tracker.next_poll_at() is None
+
+
+@responses.activate
+def test_ReceiptTracker_backs_off_pending_receipt(PushoverAPI):
+    """Test that a pending receipt is polled less and less often, but no later than when it expires."""
+    responses.add_callback(
+        responses.GET, RECEIPT_URL_RE, callback=pending_receipt_callback, content_type="application/json"
+    )
+    tracker = ReceiptTracker(PushoverAPI, min_interval=10, max_interval=40, backoff=2, jitter=0)
+
+    future = tracker.track(TEST_RECEIPT_ID, now=0)
+    assert tracker.next_poll_at() == 10  # noqa: PLR2004
+    expected = [30, 70, 110, 150]  # intervals of 20, 40 then capped at 40
+    now = 10
+    for poll_at in expected:
+        tracker.poll(now=now)
+        assert tracker.next_poll_at() == poll_at
+        now = poll_at
+    assert not future.done()
+
+    now = 990
+    tracker.poll(now=now)
+    assert tracker.next_poll_at() == 1000  # capped at expires_at  # noqa: PLR2004
+
+
+@responses.activate
+def test_ReceiptTracker_fails_invalid_receipt(PushoverAPI):
+    """Test that a receipt rejected by the API stops being tracked and its future raises."""
+    responses.add_callback(responses.GET, RECEIPT_URL_RE, callback=receipt_callback, content_type="application/json")
+    tracker = ReceiptTracker(PushoverAPI)
+
+    future = tracker.track("rBadReceipt", now=0)
+    tracker.poll(now=tracker.min_interval)
+
+    with pytest.raises(BadAPIRequestError):
+        future.result(0)
+    assert len(tracker) == 0
+
+
+def test_ReceiptTracker_untrack_and_resolve(PushoverAPI):
+    """Test that receipts can stop being tracked without being polled."""
+    tracker = ReceiptTracker(PushoverAPI)
+
+    untracked = tracker.track("rUntracked", now=0)
+    tracker.untrack("rUntracked")
+    assert untracked.cancelled()
+
+    resolved = tracker.track(TEST_RECEIPT_ID, now=0)
+    assert tracker.track(TEST_RECEIPT_ID, now=0) is resolved
+    assert tracker.resolve(TEST_RECEIPT_ID, {"acknowledged": 1})
+    assert resolved.result(0) == {"acknowledged": 1}
+    assert not tracker.resolve(TEST_RECEIPT_ID, {"acknowledged": 1})
+
+    assert tracker.poll(now=1000) == 0
+
+
+def test_ReceiptTracker_rejects_response_without_receipt(PushoverAPI):
+    """Test that tracking the response to a message without a receipt raises a ValueError."""
+    tracker = ReceiptTracker(PushoverAPI)
+    with pytest.raises(ValueError, match="no receipt"):
+        tracker.track({"status": 1, "request": TEST_REQUEST_ID})
+
+
+@responses.activate
+def test_ReceiptTracker_polls_in_background(PushoverAPI):
+    """Test that the background thread polls receipts when they are due."""
+    responses.add_callback(responses.GET, RECEIPT_URL_RE, callback=receipt_callback, content_type="application/json")
+    done = threading.Event()
+
+    with ReceiptTracker(PushoverAPI, min_interval=0.01) as tracker:
+        future = tracker.track(TEST_RECEIPT_ID, callback=lambda _: done.set())
+        assert done.wait(5)
+    assert future.result(0)["acknowledged"] == 1
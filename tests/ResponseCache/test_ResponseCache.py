@@ -0,0 +1,96 @@
+"""Tests for the :mod:`pushover_complete.response_cache.ResponseCache` class."""  # noqa: N999 -- weird name for tests module is okay
+
+from urllib.parse import urljoin
+
+import pytest
+import responses
+
+from pushover_complete.error import BadAPIRequestError
+from pushover_complete.pushover_api import PushoverAPI
+from pushover_complete.response_cache import ResponseCache
+from tests.constants import PUSHOVER_API_URL, SOUNDS, TEST_BAD_GENERAL_ID, TEST_GROUP, TEST_TOKEN, TEST_USER
+from tests.responses_callbacks import sounds_callback, validate_callback
+
+VALIDATE_URL = urljoin(PUSHOVER_API_URL, "users/validate.json")
+
+
+def test_ResponseCache_expires_responses_per_endpoint():
+    """Test that responses expire after the time-to-live of their endpoint."""
+    cache = ResponseCache(sounds_ttl=100, validate_ttl=10, invalid_ttl=1)
+    cache.store(("sounds",), {"sounds": SOUNDS}, now=0)
+    cache.store(("validate", TEST_USER, None), {"status": 1}, now=0)
+    cache.store(("validate", TEST_BAD_GENERAL_ID, None), BadAPIRequestError("400: invalid", 400), now=0)
+
+    assert cache.lookup(("validate", TEST_BAD_GENERAL_ID, None), now=0.5)[0]
+    assert cache.lookup(("validate", TEST_BAD_GENERAL_ID, None), now=1) == (False, None)
+    assert cache.lookup(("validate", TEST_USER, None), now=5) == (True, {"status": 1})
+    assert cache.lookup(("validate", TEST_USER, None), now=10) == (False, None)
+    assert cache.lookup(("sounds",), now=50) == (True, {"sounds": SOUNDS})
+    assert len(cache) == 1
+
+
+def test_ResponseCache_evicts_least_recently_used():
+    """Test that the least recently used response is evicted when the cache is full."""
+    cache = ResponseCache(maxsize=2)
+    cache.store(("validate", "a", None), {"status": 1}, now=0)
+    cache.store(("validate", "b", None), {"status": 1}, now=0)
+    cache.lookup(("validate", "a", None), now=0)
+    cache.store(("validate", "c", None), {"status": 1}, now=0)
+
+    assert cache.lookup(("validate", "a", None), now=0)[0]
+    assert not cache.lookup(("validate", "b", None), now=0)[0]
+    assert cache.lookup(("validate", "c", None), now=0)[0]
+
+
+def test_ResponseCache_invalidates_by_endpoint_and_user():
+    """Test that responses can be forgotten selectively."""
+    cache = ResponseCache()
+    cache.store(("sounds",), {"sounds": SOUNDS})
+    cache.store(("validate", TEST_USER, None), {"status": 1})
+    cache.store(("validate", TEST_USER, "phone"), {"status": 1})
+    cache.store(("validate", TEST_GROUP, None), {"status": 1})
+
+    cache.invalidate(user=TEST_USER)
+    assert len(cache) == 2  # noqa: PLR2004
+    cache.invalidate("sounds")
+    assert not cache.lookup(("sounds",))[0]
+    assert cache.lookup(("validate", TEST_GROUP, None))[0]
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_ResponseCache_returns_copies():
+    """Test that modifying a response doesn't modify the cached response."""
+    cache = ResponseCache()
+    response = {"status": 1, "devices": ["phone"]}
+    cache.store(("validate", TEST_USER, None), response)
+    response["devices"].append("tablet")
+    cache.lookup(("validate", TEST_USER, None))[1]["devices"].append("watch")
+
+    assert cache.lookup(("validate", TEST_USER, None))[1]["devices"] == ["phone"]
+
+
+@responses.activate
+def test_PushoverAPI_caches_sounds_and_validation():
+    """Test that PushoverAPI answers repeated calls from its response cache, including invalid users."""
+    responses.add_callback(
+        responses.GET,
+        urljoin(PUSHOVER_API_URL, "sounds.json"),
+        callback=sounds_callback,
+        content_type="application/json",
+    )
+    responses.add_callback(responses.POST, VALIDATE_URL, callback=validate_callback, content_type="application/json")
+    cache = ResponseCache()
+    api = PushoverAPI(TEST_TOKEN, response_cache=cache)
+
+    assert api.get_sounds() == api.get_sounds() == SOUNDS
+    assert api.validate(TEST_USER) == api.validate(TEST_USER)
+    for _ in range(2):
+        with pytest.raises(BadAPIRequestError) as exc_info:
+            api.validate(TEST_BAD_GENERAL_ID)
+        assert exc_info.value.status_code == 400  # noqa: PLR2004
+    assert len(responses.calls) == 3  # noqa: PLR2004
+
+    cache.invalidate(user=TEST_USER)
+    api.validate(TEST_USER)
+    assert len(responses.calls) == 4  # noqa: PLR2004
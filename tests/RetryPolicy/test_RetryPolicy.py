@@ -0,0 +1,76 @@
+"""Tests for the :mod:`pushover_complete.retry.RetryPolicy` class."""  # noqa: N999 -- weird name for tests module is okay
+
+from email.utils import formatdate
+
+import pytest
+
+from pushover_complete.retry import RetryPolicy, parse_retry_after
+
+
+@pytest.mark.parametrize(
+    ("status_code", "expected"),
+    [(None, True), (429, True), (500, True), (503, True), (400, False), (404, False), (200, False)],
+)
+def test_RetryPolicy_retries_only_transient_failures(status_code, expected):
+    """Test which failures are considered transient."""
+    assert RetryPolicy().should_retry(1, status_code) is expected
+
+
+def test_RetryPolicy_limits_attempts():
+    """Test that no retry is allowed once max_attempts is reached."""
+    policy = RetryPolicy(max_attempts=3)
+
+    assert [policy.should_retry(attempt) for attempt in (1, 2, 3)] == [True, True, False]
+
+
+def test_RetryPolicy_backs_off_exponentially():
+    """Test the exponential backoff delays without jitter."""
+    policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=False)
+
+    assert [policy.delay(attempt) for attempt in (1, 2, 3, 4)] == [1, 2, 4, 5]
+
+
+def test_RetryPolicy_jitters_within_backoff():
+    """Test that jittered delays stay between zero and the backoff delay."""
+    policy = RetryPolicy(backoff_base=1)
+
+    assert all(0 <= policy.delay(3) <= 4 for _ in range(100))  # noqa: PLR2004 -- 1 * 2 ** 2
+
+
+def test_RetryPolicy_respects_retry_after():
+    """Test that a Retry-After header overrides the computed delay."""
+    assert RetryPolicy(backoff_base=1).delay(1, retry_after="7") == 7  # noqa: PLR2004 -- the header value
+
+
+def test_RetryPolicy_caps_retry_after():
+    """Test that a Retry-After header can't make the delay longer than backoff_max."""
+    assert RetryPolicy(backoff_max=5).delay(1, retry_after="86400") == 5  # noqa: PLR2004 -- backoff_max
+
+
+def test_RetryPolicy_budget_limits_retries():
+    """Test that retries are limited to the budgeted fraction of requests."""
+    policy = RetryPolicy(max_attempts=10, budget=0.5, budget_min=1)
+
+    assert policy.should_retry(1)
+    assert not policy.should_retry(1)
+
+    policy.record_request()
+    policy.record_request()
+    assert policy.should_retry(1)
+    assert not policy.should_retry(1)
+
+
+def test_RetryPolicy_budget_counts_recent_requests_only():
+    """Test that a long run of requests doesn't save up more retries than the budget allows over its window."""
+    policy = RetryPolicy(max_attempts=10, budget=0.5, budget_min=1, budget_window=4)
+    for _ in range(1000):
+        policy.record_request()
+
+    assert [policy.should_retry(1) for _ in range(4)] == [True, True, True, False]
+
+
+def test_parse_retry_after_http_date():
+    """Test parsing an HTTP date in a Retry-After header."""
+    assert parse_retry_after(formatdate(0, usegmt=True)) == 0
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after(None) is None
@@ -15,6 +15,9 @@ TEST_URL = "twitter://direct_message?screen_name=someuser"
 TEST_URL_TITLE = "Reply to @someuser"
 TEST_SUBSCRIPTION_CODE = "Forum-f504h08fhlasdfj"
 TEST_SUBSCRIBED_USER_KEY = "sPfjsD2fGzEd9TR52DU31Hv4A61Vvk"
+TEST_APP_LIMIT = 10000
+TEST_APP_REMAINING = 7496
+TEST_APP_RESET = 1393653600
 # a single black pixel
 TEST_IMAGE_BYTES = (
     b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x01\x00\x00\x00\x007n\xf9$"
@@ -0,0 +1,55 @@
+"""Fixtures used for testing pushover_complete's asyncio client."""  # noqa: N999 -- weird name for fixture module is okay
+
+import httpx
+import pytest
+
+from pushover_complete import async_pushover_api
+from tests.constants import TEST_BAD_GENERAL_ID, TEST_TOKEN
+from tests.httpx_transport import callback_transport
+from tests.responses_callbacks import (
+    groups_add_user_callback,
+    groups_callback,
+    groups_delete_user_callback,
+    groups_disable_user_callback,
+    groups_enable_user_callback,
+    groups_rename_callback,
+    licenses_assign_callback,
+    limits_callback,
+    messages_callback,
+    receipt_callback,
+    receipt_cancel_callback,
+    sounds_callback,
+    subscription_migrate_callback,
+    validate_callback,
+)
+
+API_ROUTES = [
+    ("POST", r"https://api\.pushover\.net/1/messages\.json", messages_callback),
+    ("GET", r"https://api\.pushover\.net/1/sounds\.json", sounds_callback),
+    ("GET", r"https://api\.pushover\.net/1/apps/limits\.json", limits_callback),
+    ("POST", r"https://api\.pushover\.net/1/users/validate\.json", validate_callback),
+    ("GET", r"https://api\.pushover\.net/1/receipts/r[a-zA-Z0-9]*\.json", receipt_callback),
+    ("POST", r"https://api\.pushover\.net/1/receipts/r[a-zA-Z0-9]*/cancel\.json", receipt_cancel_callback),
+    ("POST", r"https://api\.pushover\.net/1/subscriptions/migrate\.json", subscription_migrate_callback),
+    ("GET", r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*\.json", groups_callback),
+    ("POST", r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*/add_user\.json", groups_add_user_callback),
+    ("POST", r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*/delete_user\.json", groups_delete_user_callback),
+    ("POST", r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*/disable_user\.json", groups_disable_user_callback),
+    ("POST", r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*/enable_user\.json", groups_enable_user_callback),
+    ("POST", r"https://api\.pushover\.net/1/groups/g[a-zA-Z0-9]*/rename\.json", groups_rename_callback),
+    ("POST", r"https://api\.pushover\.net/1/licenses/assign\.json", licenses_assign_callback),
+]
+
+
+@pytest.fixture
+def AsyncPushoverAPI():
+    """Fixture for :class:`pushover_complete.async_pushover_api.AsyncPushoverAPI` with a "good" token and mocked API."""
+    client = httpx.AsyncClient(transport=callback_transport(API_ROUTES))
+    return async_pushover_api.AsyncPushoverAPI(TEST_TOKEN, client=client)
+
+
+@pytest.fixture
+def BadTokenAsyncPushoverAPI():
+    """Fixture for :class:`pushover_complete.async_pushover_api.AsyncPushoverAPI` with a "bad" token and mocked API."""
+    client = httpx.AsyncClient(transport=callback_transport(API_ROUTES))
+    return async_pushover_api.AsyncPushoverAPI(TEST_BAD_GENERAL_ID, client=client)
@@ -1,8 +1,11 @@
 """Py.test fixtures for testing :mod:`pushover_complete`."""
 
+from .AsyncPushoverAPI import AsyncPushoverAPI, BadTokenAsyncPushoverAPI
 from .PushoverAPI import BadTokenPushoverAPI, PushoverAPI
 
 __all__ = [
+    "AsyncPushoverAPI",
+    "BadTokenAsyncPushoverAPI",
     "BadTokenPushoverAPI",
     "PushoverAPI",
 ]
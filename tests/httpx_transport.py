@@ -0,0 +1,42 @@
+"""Helpers for driving the :mod:`responses` callbacks from an :class:`httpx.MockTransport`."""
+
+import re
+
+import httpx
+
+
+class CallbackRequest:
+    """Adapt an :class:`httpx.Request` to the attributes the callbacks in :mod:`tests.responses_callbacks` expect."""
+
+    def __init__(self, request):
+        self.headers = request.headers
+        self.path_url = request.url.raw_path.decode("ascii")
+        content = request.read()
+        # responses hands form-encoded bodies to callbacks as str and multipart bodies as bytes
+        if request.headers.get("content-type") == "application/x-www-form-urlencoded":
+            self.body = content.decode("utf-8")
+        else:
+            self.body = content
+
+
+def callback_transport(routes):
+    """
+    Build an :class:`httpx.MockTransport` that dispatches requests to :mod:`responses`-style callbacks.
+
+    :param routes: A list of ``(method, url_regex, callback)`` tuples. The first route matching a request is used.
+    :type routes: list[tuple(str, str, callable)]
+
+    :returns: A transport to be passed to :class:`httpx.AsyncClient`
+    :rtype: httpx.MockTransport
+    """
+    compiled_routes = [(method, re.compile(url_regex), callback) for method, url_regex, callback in routes]
+
+    def handler(request):
+        """Answer a request with the callback of the first route matching it."""
+        for method, url_re, callback in compiled_routes:
+            if request.method == method and url_re.fullmatch(str(request.url).split("?")[0]):
+                status, headers, body = callback(CallbackRequest(request))
+                return httpx.Response(status, headers=dict(headers), content=body)
+        return httpx.Response(404, json={"status": 0, "errors": ["not found"]})
+
+    return httpx.MockTransport(handler)
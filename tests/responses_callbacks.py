@@ -11,6 +11,9 @@ from requests_toolbelt.multipart import decoder
 
 from tests.constants import (
     SOUNDS,
+    TEST_APP_LIMIT,
+    TEST_APP_REMAINING,
+    TEST_APP_RESET,
     TEST_DEVICES,
     TEST_GROUP,
     TEST_GROUP_NAME,
@@ -51,7 +54,12 @@ def generic_callback(request):
 def messages_callback(request):  # noqa: PLR0912 -- it's hard to reduce the number of branches in this mock
     """Mock the `/messages.json` endpoint."""
     resp_body = {"request": TEST_REQUEST_ID}
-    headers = {"X-Request-Id": TEST_REQUEST_ID}
+    headers = {
+        "X-Request-Id": TEST_REQUEST_ID,
+        "X-Limit-App-Limit": str(TEST_APP_LIMIT),
+        "X-Limit-App-Remaining": str(TEST_APP_REMAINING),
+        "X-Limit-App-Reset": str(TEST_APP_RESET),
+    }
 
     if getattr(request, "headers", {}).get("content-type") == "application/x-www-form-urlencoded":
         req_body = getattr(request, "body", None)
@@ -117,6 +125,28 @@ def sounds_callback(request):
     return 200 if resp_body["status"] == 1 else 400, headers, json.dumps(resp_body)
 
 
+def limits_callback(request):
+    """Mock the `/apps/limits.json` endpoint."""
+    resp_body = {"request": TEST_REQUEST_ID}
+    headers = {"X-Request-Id": TEST_REQUEST_ID}
+
+    req_body = getattr(request, "body", None)
+    qs = parse_qs(req_body)
+    qs = {k: v[0] for k, v in qs.items()}
+
+    if qs.get("token") != TEST_TOKEN:
+        resp_body["token"] = "invalid"  # noqa: S105 -- not a real secret
+        resp_body["status"] = 0
+        resp_body["errors"] = ["application token is invalid"]
+    else:
+        resp_body["status"] = 1
+        resp_body["limit"] = TEST_APP_LIMIT
+        resp_body["remaining"] = TEST_APP_REMAINING
+        resp_body["reset"] = TEST_APP_RESET
+
+    return 200 if resp_body["status"] == 1 else 400, headers, json.dumps(resp_body)
+
+
 def validate_callback(request):
     """Mock the `/users/validate.json` endpoint."""
     resp_body = {"request": TEST_REQUEST_ID}